@@ -0,0 +1,38 @@
+import quest
+
+from .common import SCALES, SERVICE, BBOX, make_providers, setup_quest
+
+
+class SearchCatalog(object):
+    params = SCALES
+    param_names = ['n']
+    timeout = 600
+
+    def setup_cache(self):
+        return make_providers('providers')
+
+    def setup(self, providers, n):
+        self.base_dir = setup_quest(providers[n])
+        # build the catalog cache so only the search itself is timed
+        quest.api.search_catalog(SERVICE)
+
+    def teardown(self, providers, n):
+        self.base_dir.cleanup()
+
+    def time_search_catalog(self, providers, n):
+        quest.api.search_catalog(SERVICE)
+
+    def time_search_catalog_as_dataframe(self, providers, n):
+        quest.api.search_catalog(SERVICE, as_dataframe=True)
+
+    def time_search_catalog_bbox(self, providers, n):
+        quest.api.search_catalog(SERVICE, filters={'bbox': BBOX})
+
+    def time_search_catalog_tag(self, providers, n):
+        quest.api.search_catalog(SERVICE, filters={'state': 'TX'})
+
+    def time_search_catalog_update_cache(self, providers, n):
+        quest.api.search_catalog(SERVICE, update_cache=True)
+
+    def time_get_tags(self, providers, n):
+        quest.api.get_tags(SERVICE)
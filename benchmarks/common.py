@@ -0,0 +1,117 @@
+"""Synthetic local providers used by the benchmarks.
+
+Each provider is a `UserProvider` backed by local files: a GeoJSON catalog with `n` point features (with `state`
+and `huc` tags) and a single timeseries file with `n` rows that every dataset is "downloaded" from.
+"""
+import json
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+import yaml
+
+import quest
+
+SCALES = [1000, 10000, 100000]
+PROVIDER = 'benchmark'
+SERVICE = 'svc://user-{}:points'.format(PROVIDER)
+COLLECTION = 'benchmark'
+PARAMETER = 'streamflow'
+STATES = ['TX', 'MS', 'LA', 'AL', 'FL', 'GA', 'OK', 'AR']
+BBOX = [-95, 30, -90, 35]
+TIMESERIES_FILE = 'timeseries.h5'
+
+
+def make_provider(path, n, seed=0):
+    """Write a synthetic user provider with `n` catalog entries (and `n` timeseries rows) to `path`.
+
+    Returns:
+        path
+    """
+    os.makedirs(path, exist_ok=True)
+    rng = np.random.RandomState(seed)
+
+    lons = rng.uniform(-110, -80, n)
+    lats = rng.uniform(25, 45, n)
+    features = [
+        {
+            'type': 'Feature',
+            'id': '{:08d}'.format(i),
+            'geometry': {'type': 'Point', 'coordinates': [lon, lat]},
+            'properties': {
+                'display_name': 'Station {}'.format(i),
+                'parameters': PARAMETER,
+                'state': STATES[i % len(STATES)],
+                'huc': '{:02d}'.format(i % 100),
+            },
+        }
+        for i, (lon, lat) in enumerate(zip(lons, lats))
+    ]
+    with open(os.path.join(path, 'points.geojson'), 'w') as f:
+        json.dump({'type': 'FeatureCollection', 'features': features}, f)
+
+    index = pd.date_range('2000-01-01', periods=n, freq='h')
+    data = pd.DataFrame({PARAMETER: rng.uniform(0, 100, n)}, index=index)
+    io = quest.plugins.load_plugins('io', 'timeseries-hdf5')['timeseries-hdf5']
+    io.write(os.path.join(path, TIMESERIES_FILE), data, {'parameter': PARAMETER, 'unit': 'cfs'})
+
+    config = {
+        'name': PROVIDER,
+        'metadata': {
+            'display_name': 'Benchmark Provider',
+            'description': 'Synthetic provider used for benchmarks',
+            'organization': {'abbr': None, 'name': None},
+        },
+        'services': {
+            'points': {
+                'service_folder': './',
+                'metadata': {
+                    'display_name': 'Benchmark Points',
+                    'description': 'Synthetic point catalog',
+                    'service_type': 'geo-discrete',
+                    'geom_type': 'Point',
+                    'datatype': 'timeseries',
+                    'parameters': [PARAMETER],
+                    'unmapped_parameters_available': False,
+                    'file_format': 'timeseries-hdf5',
+                },
+                'features': {'file': 'points.geojson', 'format': 'geojson'},
+                'datasets': {'mapping': TIMESERIES_FILE, 'save_folder': None},
+            },
+        },
+    }
+    with open(os.path.join(path, 'quest.yml'), 'w') as f:
+        yaml.safe_dump(config, f)
+
+    return path
+
+
+def make_providers(path):
+    """Write a synthetic provider for each of the `SCALES` under `path`.
+
+    Returns:
+        dict of provider paths keyed on scale.
+    """
+    path = os.path.abspath(path)
+    return {n: make_provider(os.path.join(path, 'provider-{}'.format(n)), n) for n in SCALES}
+
+
+def setup_quest(provider_path):
+    """Point quest at a new temporary base directory with the provider at `provider_path` and an active project
+    with an empty `COLLECTION`.
+
+    Returns:
+        the TemporaryDirectory object (keep a reference to it for the lifetime of the benchmark).
+    """
+    base_dir = tempfile.TemporaryDirectory()
+    quest.api.update_settings({
+        'BASE_DIR': base_dir.name,
+        'CACHE_DIR': os.path.join(base_dir.name, 'cache'),
+        'USER_SERVICES': [provider_path],
+    })
+    quest.api.new_project('benchmark')
+    quest.api.set_active_project('benchmark')
+    quest.api.new_collection(COLLECTION)
+
+    return base_dir
@@ -0,0 +1,79 @@
+import quest
+
+from .common import SCALES, SERVICE, COLLECTION, PARAMETER, make_providers, setup_quest
+
+
+class AddDatasets(object):
+    params = SCALES
+    param_names = ['n']
+    timeout = 600
+    # each call adds n more datasets, so start from an empty collection every time
+    number = 1
+    repeat = 3
+
+    def setup_cache(self):
+        return make_providers('providers')
+
+    def setup(self, providers, n):
+        self.base_dir = setup_quest(providers[n])
+        self.catalog_entries = quest.api.search_catalog(SERVICE, as_dataframe=True)
+
+    def teardown(self, providers, n):
+        self.base_dir.cleanup()
+
+    def time_add_datasets(self, providers, n):
+        quest.api.add_datasets(COLLECTION, self.catalog_entries)
+
+
+class DatasetMetadata(object):
+    params = SCALES
+    param_names = ['n']
+    timeout = 600
+
+    def setup_cache(self):
+        return make_providers('providers')
+
+    def setup(self, providers, n):
+        self.base_dir = setup_quest(providers[n])
+        catalog_entries = quest.api.search_catalog(SERVICE, as_dataframe=True)
+        self.datasets = quest.api.add_datasets(COLLECTION, catalog_entries)
+
+    def teardown(self, providers, n):
+        self.base_dir.cleanup()
+
+    def time_stage_for_download(self, providers, n):
+        quest.api.stage_for_download(self.datasets, options={'parameter': PARAMETER})
+
+    def time_get_metadata(self, providers, n):
+        quest.api.get_metadata(self.datasets)
+
+    def time_get_datasets(self, providers, n):
+        quest.api.get_datasets(filters={'collection': COLLECTION})
+
+    def time_update_metadata(self, providers, n):
+        quest.api.update_metadata(self.datasets, quest_metadata={'message': 'benchmark'}, return_metadata=False)
+
+
+class OpenDataset(object):
+    params = SCALES
+    param_names = ['n']
+    timeout = 600
+
+    def setup_cache(self):
+        return make_providers('providers')
+
+    def setup(self, providers, n):
+        self.base_dir = setup_quest(providers[n])
+        catalog_entry = quest.api.search_catalog(SERVICE)[0]
+        self.dataset = quest.api.add_datasets(COLLECTION, catalog_entry)[0]
+        quest.api.stage_for_download(self.dataset, options={'parameter': PARAMETER})
+        quest.api.download_datasets(self.dataset, raise_on_error=True)
+
+    def teardown(self, providers, n):
+        self.base_dir.cleanup()
+
+    def time_open_dataset(self, providers, n):
+        quest.api.open_dataset(self.dataset)
+
+    def time_open_dataset_as_dict(self, providers, n):
+        quest.api.open_dataset(self.dataset, fmt='dict')
@@ -0,0 +1,31 @@
+import quest
+
+from .common import SCALES, SERVICE, COLLECTION, PARAMETER, make_providers, setup_quest
+
+
+class RunTimeseriesTools(object):
+    params = SCALES
+    param_names = ['n']
+    timeout = 600
+
+    def setup_cache(self):
+        return make_providers('providers')
+
+    def setup(self, providers, n):
+        self.base_dir = setup_quest(providers[n])
+        catalog_entry = quest.api.search_catalog(SERVICE)[0]
+        self.dataset = quest.api.add_datasets(COLLECTION, catalog_entry)[0]
+        quest.api.stage_for_download(self.dataset, options={'parameter': PARAMETER})
+        quest.api.download_datasets(self.dataset, raise_on_error=True)
+
+    def teardown(self, providers, n):
+        self.base_dir.cleanup()
+
+    def time_ts_resample(self, providers, n):
+        quest.api.run_tool('ts-resample', options={'dataset': self.dataset, 'period': 'daily', 'method': 'mean'})
+
+    def time_ts_remove_outliers(self, providers, n):
+        quest.api.run_tool('ts-remove-outliers', options={'dataset': self.dataset, 'sigma': 2})
+
+    def time_ts_flow_duration(self, providers, n):
+        quest.api.run_tool('flow-duration', options={'dataset': self.dataset})
@@ -4,7 +4,6 @@
     A library for environmental data providers.
     Part of the Environmental Simulator project.
 """
-import pbr.version
 import warnings
 import logging
 
@@ -16,5 +15,12 @@ from . import tools  # NOQA
 
 
 
-# set version number
-__version__ = pbr.version.VersionInfo('erdc-quest').version_string_with_vcs()
+def __getattr__(name):
+    # the version number is looked up on first use since pbr is slow to import
+    if name == '__version__':
+        global __version__
+        import pbr.version
+        __version__ = pbr.version.VersionInfo('erdc-quest').version_string_with_vcs()
+        return __version__
+
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
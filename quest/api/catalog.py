@@ -1,24 +1,33 @@
 import json
+import time
 import itertools
+import concurrent.futures
 
 import pandas as pd
 import numpy as np
 import geojson
+import shapely
 from shapely.geometry import shape
 
 from .tasks import add_async
 from .metadata import get_metadata
-from .datasets import new_dataset
+from .collections import get_collections
 from .. import util
 from ..plugins import load_providers
-from ..static import DatasetSource, UriType
+from ..static import DatasetSource, DatasetStatus, UriType
 from ..database.database import get_db, db_session, select_datasets
 
+DEFAULT_SEARCH_CONCURRENCY = 4
+STREAM_BATCH_SIZE = 1000
+STREAM_FORMATS = ['geojson', 'ndjson']
+
 
 @add_async
 def add_datasets(collection, catalog_entries):
     """
 
+    All of the datasets are created in a single database transaction.
+
     Args:
         collection (string, Required):
             name of collection
@@ -29,25 +38,47 @@ def add_datasets(collection, catalog_entries):
         uris (list):
             uris of ?
     """
+    if collection not in get_collections():
+        raise ValueError("Collection {} does not exist".format(collection))
+
     if not isinstance(catalog_entries, pd.DataFrame):
-        entries = get_metadata(catalog_entries, as_dataframe=True)
+        catalog_entries = get_metadata(catalog_entries, as_dataframe=True)
+
+    if catalog_entries.empty:
+        return []
 
-    uris = []
-    for _, data in entries.iterrows():
-        source = DatasetSource.WEB_SERVICE
-        if 'quest' in data['service']:
-            source = DatasetSource.DERIVED
-        uri = new_dataset(collection=collection, catalog_entry=data.to_frame().transpose(), source=source)
-        uris.append(uri)
+    is_derived = catalog_entries['service'].astype(str).str.contains('quest', regex=False)
+    sources = np.where(is_derived, DatasetSource.DERIVED, DatasetSource.WEB_SERVICE)
+    uris = [util.uuid('dataset') for _ in range(len(catalog_entries))]
+
+    db = get_db()
+    with db_session:
+        for uri, catalog_entry, source in zip(uris, catalog_entries['name'], sources):
+            quest_metadata = {
+                'name': uri,
+                'collection': collection,
+                'catalog_entry': catalog_entry,
+                'source': source,
+                'display_name': uri,
+                'metadata': {},
+            }
+            if source == DatasetSource.WEB_SERVICE:
+                quest_metadata.update({'status': DatasetStatus.NOT_STAGED})
+
+            db.Dataset(**quest_metadata)
 
     return uris
 
 
 @add_async
 def search_catalog(uris=None, expand=False, as_dataframe=False, as_geojson=False,
-                   update_cache=False, filters=None, queries=None):
+                   update_cache=False, filters=None, queries=None, timeout=None, raise_on_error=False,
+                   return_errors=False, sort_by=None, limit=None, offset=0, cursor=None, as_stream=None):
     """Retrieve list of catalog entries from resources.
 
+    Services are searched concurrently in a pool of `SEARCH_CONCURRENCY` threads. If a service fails or doesn't
+    respond within `timeout` then the catalog entries from the other services are still returned.
+
     Args:
         uris (string or list, Required):
             uris of service_uris
@@ -69,16 +100,43 @@ def search_catalog(uris=None, expand=False, as_dataframe=False, as_geojson=False
                     display_name (string, optional):  filter catalog_entries by display_name
                     description (string, optional): filter catalog_entries by description
                     search_terms (list, optional): filter catalog_entries by search_terms
+                        (catalog entries that contain any of the terms). Cached catalogs are searched with a
+                        full-text index, and the matches from each service get a `search_rank` column with their
+                        rank among that service's matches (1 is the most relevant). Ranks are only comparable
+                        within a service, i.e. `sort_by=['service', 'search_rank']`
 
             catalog_entries can also be filtered by any other metadata fields
         queries(list, Optional, Default=None):
             list of string arguments to pass to pandas.DataFrame.query to filter the catalog_entries
+        timeout (float or dict, Optional, Default=None):
+            seconds to wait for each service (or a dict of seconds for each provider).
+            Defaults to the `SEARCH_TIMEOUT` setting (no timeout if not set).
+        raise_on_error (bool, Optional, Default=False):
+            if True, raise the exception of the first service that fails rather than returning partial results
+        return_errors (bool, Optional, Default=False):
+            if True, return a tuple of the catalog entries and a dict of the errors keyed by service uri
+        sort_by (string or list, Optional, Default=None):
+            column(s) to sort the catalog entries by (ties, and the default order, are sorted by uri)
+        limit (int, Optional, Default=None):
+            maximum number of catalog entries to return
+        offset (int, Optional, Default=0):
+            number of catalog entries to skip (after `cursor` if it is given)
+        cursor (string, Optional, Default=None):
+            uri of the last catalog entry of the previous page, only the catalog entries after it are returned
+        as_stream (string, Optional, Default=None):
+            'geojson' or 'ndjson' to return a generator of strings that make up a GeoJSON FeatureCollection or
+            newline delimited GeoJSON Features, serialized `STREAM_BATCH_SIZE` catalog entries at a time.
+            The services are still searched, filtered and sorted before the first string is returned, streaming
+            only avoids serializing all of the catalog entries into a single GeoJSON document
 
     Returns:
         datasets (list, geo-json dict or pandas.DataFrame, Default=list):
              datasets of specified service(s), collection(s) or catalog_entry(s)
 
     """
+    if as_stream is not None and as_stream not in STREAM_FORMATS:
+        raise ValueError('{} is not a valid stream format, use one of {}'.format(as_stream, STREAM_FORMATS))
+
     uris = list(itertools.chain(util.listify(uris) or []))
 
     grouped_uris = util.classify_uris(uris, as_dataframe=False, exclude=[UriType.DATASET],
@@ -92,14 +150,22 @@ def search_catalog(uris=None, expand=False, as_dataframe=False, as_geojson=False
     all_catalog_entries = list()
 
     filters = filters or dict()
+
+    # when only uris are returned just read the columns that are needed to apply the filters
+    columns = None
+    if not (expand or as_dataframe or as_geojson or queries):
+        columns = _get_filter_columns(filters)
+
+    service_uris = []
     for name in services:
-        provider, service, catalog_entry = util.parse_service_uri(name)
-        if catalog_entry is not None:
+        if util.parse_service_uri(name)[2] is not None:
             catalog_entries.append(name)
-            continue
-        provider_plugin = load_providers()[provider]
-        tmp_catalog_entries = provider_plugin.search_catalog(service, update_cache=update_cache, **filters)
-        all_catalog_entries.append(tmp_catalog_entries)
+        else:
+            service_uris.append(name)
+
+    results, errors = _search_services(service_uris, update_cache=update_cache, columns=columns, filters=filters,
+                                       timeout=timeout, raise_on_error=raise_on_error)
+    all_catalog_entries.extend(results[name] for name in service_uris if name in results)
 
     if catalog_entries:
         all_catalog_entries.append(get_metadata(catalog_entries, as_dataframe=True))
@@ -137,13 +203,14 @@ def search_catalog(uris=None, expand=False, as_dataframe=False, as_geojson=False
                 catalog_entries = catalog_entries[idx]
 
             elif k == 'description':
-                idx = catalog_entries.display_name.str.contains(v)
+                idx = catalog_entries.description.str.contains(v, na=False)
                 catalog_entries = catalog_entries[idx]
 
             elif k == 'search_terms':
+                search_columns = [col for col in catalog_entries.columns if col != 'search_rank']
                 idx = np.column_stack([
                     catalog_entries[col].apply(str).str.contains(search_term, na=False)
-                    for col, search_term in itertools.product(catalog_entries.columns, v)
+                    for col, search_term in itertools.product(search_columns, v)
                 ]).any(axis=1)
                 catalog_entries = catalog_entries[idx]
 
@@ -155,21 +222,205 @@ def search_catalog(uris=None, expand=False, as_dataframe=False, as_geojson=False
         for query in queries:
             catalog_entries = catalog_entries.query(query)
 
-    if not (expand or as_dataframe or as_geojson):
-        return catalog_entries.index.astype('unicode').tolist()
+    catalog_entries = _paginate(catalog_entries, sort_by=sort_by, limit=limit, offset=offset, cursor=cursor)
+
+    if as_stream is not None:
+        catalog_entries = _stream_features(catalog_entries, as_stream)
+
+    elif not (expand or as_dataframe or as_geojson):
+        catalog_entries = catalog_entries.index.astype('unicode').tolist()
 
-    if as_geojson:
+    elif as_geojson:
         if catalog_entries.empty:
-            return geojson.FeatureCollection([])
+            catalog_entries = geojson.FeatureCollection([])
         else:
-            return json.loads(catalog_entries.to_json(default=util.to_json_default_handler))
+            catalog_entries = json.loads(catalog_entries.to_json(default=util.to_json_default_handler))
 
-    if not as_dataframe:
+    elif not as_dataframe:
         catalog_entries = catalog_entries.to_dict(orient='index')
 
+    if return_errors:
+        return catalog_entries, errors
+
     return catalog_entries
 
 
+def _paginate(catalog_entries, sort_by=None, limit=None, offset=0, cursor=None):
+    """Helper function for `search_catalog` to sort catalog_entries and return a page of them.
+
+    catalog_entries are expected to already be sorted by uri.
+    """
+    if catalog_entries.empty:
+        return catalog_entries
+
+    if sort_by is not None:
+        catalog_entries = catalog_entries.sort_values(by=sort_by, kind='stable')
+
+    start = offset or 0
+    if cursor is not None:
+        positions = np.flatnonzero(catalog_entries.index == cursor)
+        if len(positions):
+            start += positions[0] + 1
+        elif sort_by is None:
+            # the catalog entry may have been removed since the previous page, so continue from where it would be
+            start += catalog_entries.index.searchsorted(cursor, side='right')
+        else:
+            raise ValueError('cursor {} is not in the catalog entries'.format(cursor))
+
+    stop = None if limit is None else start + limit
+    if start == 0 and stop is None:
+        return catalog_entries
+    return catalog_entries.iloc[start:stop]
+
+
+def _stream_features(catalog_entries, fmt):
+    """Helper function for `search_catalog` to serialize catalog_entries as GeoJSON features in batches.
+
+    Yields:
+        strings that together are a GeoJSON FeatureCollection (fmt='geojson') or newline delimited GeoJSON
+        features (fmt='ndjson').
+    """
+    def features():
+        for start in range(0, len(catalog_entries), STREAM_BATCH_SIZE):
+            yield _to_features(catalog_entries.iloc[start:start + STREAM_BATCH_SIZE])
+
+    if fmt == 'ndjson':
+        for batch in features():
+            yield ''.join(feature + '\n' for feature in batch)
+        return
+
+    yield '{"type": "FeatureCollection", "features": ['
+    separator = ''
+    for batch in features():
+        yield separator + ', '.join(batch)
+        separator = ', '
+    yield ']}'
+
+
+def _to_features(catalog_entries):
+    """Helper function for `_stream_features` to serialize each catalog entry as a GeoJSON feature string.
+    """
+    if 'geometry' in catalog_entries.columns:
+        geometries = shapely.to_geojson(np.array([g if isinstance(g, shapely.Geometry) else None
+                                                  for g in catalog_entries['geometry']], dtype=object))
+        properties = catalog_entries.drop(columns='geometry')
+    else:
+        geometries = [None] * len(catalog_entries)
+        properties = catalog_entries
+
+    # change NaN to None so that it is serialized as null
+    properties = properties.astype(object).where(properties.notna(), None).to_dict(orient='records')
+
+    return [
+        '{{"id": {}, "type": "Feature", "properties": {}, "geometry": {}}}'.format(
+            json.dumps(str(uri)), json.dumps(props, default=util.to_json_default_handler), geometry or 'null')
+        for uri, props, geometry in zip(catalog_entries.index, properties, geometries)
+    ]
+
+
+def _search_services(service_uris, update_cache, columns, filters, timeout=None, raise_on_error=False):
+    """Helper function for `search_catalog` to search services concurrently.
+
+    Each service gets `timeout` seconds from when its search starts. Searches that time out are abandoned (the
+    thread can't be interrupted, so it finishes in the background).
+
+    Returns:
+        A dict of catalog entries and a dict of error messages, both keyed by service uri.
+    """
+    results, errors = {}, {}
+    if not service_uris:
+        return results, errors
+
+    def fail(uri, e):
+        if raise_on_error:
+            raise e
+        errors[uri] = '{}: {}'.format(type(e).__name__, e)
+        util.logger.warning('searching {} failed, {}'.format(uri, errors[uri]))
+
+    providers = {}
+    for uri in service_uris:
+        provider = util.parse_service_uri(uri)[0]
+        try:
+            providers[uri] = load_providers(names=provider)[provider]
+        except Exception as e:
+            fail(uri, e)
+
+    started = {}
+
+    def search(uri):
+        started[uri] = time.monotonic()
+        service = util.parse_service_uri(uri)[1]
+        return providers[uri].search_catalog(service, update_cache=update_cache, columns=columns, **filters)
+
+    timeouts = {uri: _get_search_timeout(timeout, util.parse_service_uri(uri)[0]) for uri in providers}
+    concurrency = int(util.get_settings().get('SEARCH_CONCURRENCY', DEFAULT_SEARCH_CONCURRENCY))
+    executor = concurrent.futures.ThreadPoolExecutor(max_workers=max(min(concurrency, len(providers)), 1),
+                                                     thread_name_prefix='quest-search')
+    futures = {executor.submit(search, uri): uri for uri in providers}
+    pending = set(futures)
+    try:
+        while pending:
+            # wake up when the next search that has started is due to time out
+            deadlines = [started[futures[f]] + timeouts[futures[f]] for f in pending
+                         if futures[f] in started and timeouts[futures[f]] is not None]
+            wait_time = None
+            if any(timeouts[futures[f]] is not None for f in pending):
+                wait_time = 0.1 if not deadlines else max(min(deadlines) - time.monotonic(), 0)
+            done, pending = concurrent.futures.wait(pending, timeout=wait_time,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+
+            for future in done:
+                uri = futures[future]
+                try:
+                    results[uri] = future.result()
+                except Exception as e:
+                    fail(uri, e)
+
+            now = time.monotonic()
+            for future in list(pending):
+                uri = futures[future]
+                if uri in started and timeouts[uri] is not None and now - started[uri] >= timeouts[uri]:
+                    pending.discard(future)
+                    fail(uri, TimeoutError('no response after {} seconds'.format(timeouts[uri])))
+    finally:
+        # cancel the searches that haven't started (`shutdown(cancel_futures=True)` needs python 3.9)
+        for future in futures:
+            future.cancel()
+        executor.shutdown(wait=False)
+
+    return results, errors
+
+
+def _get_search_timeout(timeout, provider):
+    """Helper function for `search_catalog` to get the timeout (in seconds) for searching a service of `provider`.
+    """
+    if timeout is None:
+        timeout = util.get_settings().get('SEARCH_TIMEOUT')
+    if isinstance(timeout, dict):
+        timeout = timeout.get(provider)
+    return float(timeout) if timeout else None
+
+
+_filter_columns = {
+    'bbox': 'geometry',
+    'geom_type': 'geometry',
+    'parameter': 'parameters',
+    'display_name': 'display_name',
+    'description': 'description',
+}
+
+
+def _get_filter_columns(filters):
+    """Helper function for `search_catalog` to get the catalog columns needed to apply `filters`.
+
+    Returns None (i.e. all columns) if any of the filters can match on arbitrary columns or metadata.
+    """
+    if not set(filters).issubset(_filter_columns):
+        return None
+
+    return sorted({_filter_columns[k] for k in filters})
+
+
 def _multi_index(d, index):
     """Helper function for `search_catalog` filters to index multi-index tags (see `get_tags`)
     """
@@ -202,6 +453,7 @@ def get_tags(service_uris, update_cache=False, filter=None, as_count=False):
          dict keyed by tag name and list of possible values
 
          Note: nested dicts are parsed out as a multi-index tag where keys for nested dicts are joined with ':'.
+         The items of list values are listed as separate values of the tag.
     """
     # group uris by type
     grouped_uris = util.classify_uris(
@@ -215,7 +467,7 @@ def get_tags(service_uris, update_cache=False, filter=None, as_count=False):
 
     for service in services:
         provider, service, _ = util.parse_service_uri(service)
-        provider_plugin = load_providers()[provider]
+        provider_plugin = load_providers(names=provider)[provider]
         service_tags = provider_plugin.get_tags(service, update_cache=update_cache)
         tags.update(service_tags)
 
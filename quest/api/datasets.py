@@ -1,4 +1,6 @@
 import os
+import time
+import concurrent.futures
 
 import param
 import pandas as pd
@@ -10,7 +12,7 @@ from .metadata import get_metadata, update_metadata
 from .. import util
 from .. import static
 from ..plugins import load_providers, load_plugins, list_plugins
-from ..database.database import get_db, db_session, select_datasets
+from ..database.database import get_db, db_session, select_datasets, dataset_filter_fields
 
 
 @add_async
@@ -40,7 +42,7 @@ def download(catalog_entry, file_path, dataset=None, **kwargs):
         pass
 
     provider, service, catalog_id = util.parse_service_uri(service_uri)
-    provider_plugin = load_providers()[provider]
+    provider_plugin = load_providers(names=provider)[provider]
     data = provider_plugin.download(service=service, catalog_id=catalog_id,
                                     file_path=file_path, dataset=dataset, **kwargs)
     return data
@@ -53,7 +55,7 @@ def publish(publisher_uri, options=None, **kwargs):
     options = options or dict()
     options.update(kwargs)
     provider, publisher, _ = util.parse_service_uri(publisher_uri)
-    provider_plugin = load_providers()[provider]
+    provider_plugin = load_providers(names=provider)[provider]
     data = provider_plugin.publish(publisher=publisher, **options)
     return data
 
@@ -61,6 +63,10 @@ def publish(publisher_uri, options=None, **kwargs):
 def download_datasets(datasets, raise_on_error=False):
     """Download datasets that have been staged with stage_for_download.
 
+    Datasets are downloaded concurrently. Each provider gets its own pool of threads, sized by the provider's
+    `download_concurrency` (see the `DOWNLOAD_CONCURRENCY` setting), and downloads that fail with a connection
+    error are retried up to `DOWNLOAD_RETRIES` times.
+
     Args:
         datasets (string or list, Required):
             datasets to download
@@ -80,46 +86,105 @@ def download_datasets(datasets, raise_on_error=False):
 
     # filter out non download datasets
     datasets = datasets[datasets['source'] == static.DatasetSource.WEB_SERVICE]
+    if datasets.empty:
+        return {}
 
     db = get_db()
     project_path = _get_project_dir()
+    providers = load_providers(names=sorted({util.parse_service_uri(c)[0] for c in datasets['catalog_entry']}))
+    retries = util.sessions.get_retries()
+    original_status = datasets['status'].to_dict()
+    with db_session:
+        for idx in datasets.index:
+            db.Dataset[idx].set(status=static.DatasetStatus.PENDING)
+
     status = {}
-    for idx, dataset in datasets.iterrows():
-        collection_path = os.path.join(project_path, dataset['collection'])
-        catalog_entry = dataset["catalog_entry"]
-        try:
-            update_metadata(idx, quest_metadata={'status': static.DatasetStatus.PENDING})
+    executors = {}
+    futures = {}
+    try:
+        for idx, dataset in datasets.iterrows():
+            collection_path = os.path.join(project_path, dataset['collection'])
+            catalog_entry = dataset['catalog_entry']
             kwargs = dataset['options'] or dict()
-            all_metadata = download(catalog_entry,
-                                    file_path=collection_path,
-                                    dataset=idx, **kwargs)
-
-            metadata = all_metadata.pop('metadata', None)
-            quest_metadata = all_metadata
-            quest_metadata.update({
-                'status': static.DatasetStatus.DOWNLOADED,
-                'message': 'success',
-                })
-        except Exception as e:
-            if raise_on_error:
-                raise
+            executor = _get_download_executor(executors, providers, catalog_entry)
+            future = executor.submit(_download_with_retries, catalog_entry, collection_path, idx, retries, **kwargs)
+            futures[future] = idx
+
+        # results are written to the database from this thread as each download finishes
+        for future in concurrent.futures.as_completed(futures):
+            idx = futures[future]
+            try:
+                all_metadata = future.result()
+
+                metadata = all_metadata.pop('metadata', None)
+                quest_metadata = all_metadata
+                quest_metadata.update({
+                    'status': static.DatasetStatus.DOWNLOADED,
+                    'message': 'success',
+                    })
+            except Exception as e:
+                if raise_on_error:
+                    raise
+
+                quest_metadata = {
+                    'status': static.DatasetStatus.FAILED_DOWNLOAD,
+                    'message': str(e),
+                    }
+
+                metadata = None
+
+            quest_metadata.update({'metadata': metadata})
+
+            with db_session:
+                dataset = db.Dataset[idx]
+                dataset.set(**quest_metadata)
+
+            status[idx] = quest_metadata['status']
+    except Exception:
+        for future in futures:
+            future.cancel()
+        # put back the status of any datasets that weren't downloaded
+        with db_session:
+            for idx in datasets.index:
+                if idx not in status:
+                    db.Dataset[idx].set(status=original_status[idx])
+        raise
+    finally:
+        for executor in executors.values():
+            executor.shutdown(wait=True)
 
-            quest_metadata = {
-                'status': static.DatasetStatus.FAILED_DOWNLOAD,
-                'message': str(e),
-                }
+    return status
 
-            metadata = None
 
-        status[idx] = quest_metadata['status']
+def _get_download_executor(executors, providers, catalog_entry):
+    """Get the thread pool that downloads for `catalog_entry` are submitted to.
 
-        quest_metadata.update({'metadata': metadata})
+    There is one pool per provider, except for services that aren't thread safe which get their own single
+    threaded pool.
+    """
+    provider, service, _ = util.parse_service_uri(catalog_entry)
+    provider_plugin = providers[provider]
+    key = provider
+    max_workers = provider_plugin.download_concurrency
+    if not provider_plugin.services[service].thread_safe:
+        key = (provider, service)
+        max_workers = 1
 
-        with db_session:
-            dataset = db.Dataset[idx]
-            dataset.set(**quest_metadata)
+    if key not in executors:
+        executors[key] = concurrent.futures.ThreadPoolExecutor(max_workers=max_workers)
 
-    return status
+    return executors[key]
+
+
+def _download_with_retries(catalog_entry, file_path, dataset, retries, **kwargs):
+    for attempt in range(retries + 1):
+        try:
+            return download(catalog_entry, file_path=file_path, dataset=dataset, **kwargs)
+        except util.sessions.TRANSIENT_ERRORS as e:
+            if attempt == retries:
+                raise
+            util.logger.info('retrying download of %s after error: %s' % (catalog_entry, e))
+            time.sleep(util.sessions.RETRY_BACKOFF_FACTOR * 2 ** attempt)
 
 
 def get_download_options(uris, fmt='json'):
@@ -149,7 +214,7 @@ def get_download_options(uris, fmt='json'):
     options = {}
     for uri, service_uri in service_uris.items():
         provider, service, _ = util.parse_service_uri(service_uri)
-        provider_plugin = load_providers()[provider]
+        provider_plugin = load_providers(names=provider)[provider]
         options[uri] = provider_plugin.get_download_options(service, fmt)
 
     return options
@@ -161,7 +226,7 @@ def get_publish_options(publish_uri, fmt='json'):
     for uri in uris:
         publish_uri = uri
         provider, publisher, _ = util.parse_service_uri(publish_uri)
-        provider_plugin = load_providers()[provider]
+        provider_plugin = load_providers(names=provider)[provider]
         options[uri] = provider_plugin.publish_options(publisher, fmt)
 
     return options
@@ -185,7 +250,12 @@ def get_datasets(expand=None, filters=None, queries=None, as_dataframe=None):
             staged dataset uids
 
     """
-    datasets = select_datasets()
+    # simple equality filters are applied in the database so only matching datasets are loaded
+    filters = dict(filters or {})
+    db_filters = {k: filters.pop(k) for k in list(filters)
+                  if k in dataset_filter_fields and isinstance(filters[k], str)}
+
+    datasets = select_datasets(filters=db_filters)
     datasets = pd.DataFrame(datasets)
     if not datasets.empty:
         datasets.set_index('name', inplace=True, drop=False)
@@ -197,7 +267,7 @@ def get_datasets(expand=None, filters=None, queries=None, as_dataframe=None):
             datasets = {}
         return datasets
 
-    if filters is not None:
+    if filters:
         for k, v in filters.items():
             if k not in datasets.keys():
                 util.logger.warning('filter field {} not found, continuing'.format(k))
@@ -365,6 +435,10 @@ def open_dataset(dataset, fmt=None, **kwargs):
         fmt (string, Optional, Default=None)
              format in which dataset should be returned
              will raise NotImplementedError if format requested is not possible
+        kwargs:
+            optional arguments passed to the reader for the file format to read a subset of the dataset
+            (i.e. `start`, `end` and `columns` for timeseries, or `window`, `bbox`, `bands` and `out_shape`
+            for rasters)
 
     Returns:
         data (pandas dataframe, json, or dict, Default=dataframe):
@@ -431,7 +505,7 @@ def visualize_dataset(dataset, update_cache=False, **kwargs):
     else:
         visualization_path = io.visualize(path, **kwargs)
     quest_metadata = {'visualization_path': visualization_path}
-    update_metadata(dataset, quest_metadata=quest_metadata)
+    update_metadata(dataset, quest_metadata=quest_metadata, return_metadata=False)
 
     return visualization_path
 
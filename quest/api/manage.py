@@ -173,4 +173,4 @@ def _update_dataset_file_location(func, dataset_metadata, collection_path, desti
         os.makedirs(os.path.split(new_file_path)[0], exist_ok=True)
         func(file_path, new_file_path)
 
-    update_metadata(dataset_metadata['name'], quest_metadata=quest_metadata)
+    update_metadata(dataset_metadata['name'], quest_metadata=quest_metadata, return_metadata=False)
@@ -5,6 +5,9 @@ from ..plugins import load_providers
 from ..util import classify_uris, construct_service_uri, parse_service_uri
 from ..database import get_db, db_session, select_collections, select_datasets
 
+# number of primary keys to select at once (SQLite limits the number of variables in a query)
+_SELECT_CHUNK_SIZE = 500
+
 
 def get_metadata(uris, as_dataframe=False):
     """Get metadata for uris.
@@ -20,9 +23,9 @@ def get_metadata(uris, as_dataframe=False):
             metadata at each uri keyed on uris
     """
     # group uris by type
-    grouped_uris = classify_uris(uris)
+    grouped_uris = classify_uris(uris, as_dataframe=False)
     # handle case when no uris are passed in
-    if not any(grouped_uris):
+    if not grouped_uris:
         metadata = pd.DataFrame()
         if not as_dataframe:
             metadata = metadata.to_dict(orient='index')
@@ -31,47 +34,48 @@ def get_metadata(uris, as_dataframe=False):
     metadata = []
 
     # get metadata for service type uris
-    if UriType.SERVICE in grouped_uris.groups.keys():
-        svc_df = grouped_uris.get_group(UriType.SERVICE)
-        svc_df[['provider', 'service', 'catalog_id']] = svc_df['uri'].apply(parse_service_uri).apply(pd.Series)
+    if UriType.SERVICE in grouped_uris:
+        svc_uris = {}
+        for uri in grouped_uris[UriType.SERVICE]:
+            provider, service, catalog_id = parse_service_uri(uri)
+            svc_uris.setdefault((provider, service), []).append((uri, catalog_id))
 
-        for (provider, service), grp in svc_df.groupby(['provider', 'service']):
+        for (provider, service), grp in sorted(svc_uris.items()):
 
-            provider_plugin = load_providers()[provider]
+            provider_plugin = load_providers(names=provider)[provider]
 
-            if not grp.query('catalog_id != catalog_id').empty:
+            if any(catalog_id is None for _, catalog_id in grp):
                 service_metadata = provider_plugin.get_services()[service]
                 index = construct_service_uri(provider, service)
                 metadata.append(pd.DataFrame(service_metadata, index=[index]))
 
-            selected_catalog_entries = grp.query('catalog_id == catalog_id').uri.tolist()
+            selected_catalog_entries = [uri for uri, catalog_id in grp if catalog_id is not None]
             if selected_catalog_entries:
                 catalog_entries = provider_plugin.search_catalog(service)
                 catalog_entries = catalog_entries.loc[selected_catalog_entries]
                 metadata.append(catalog_entries)
 
-    if UriType.PUBLISHER in grouped_uris.groups.keys():
-        svc_df = grouped_uris.get_group(UriType.PUBLISHER)
-        svc_df[['provider', 'publish', 'catalog_id']] = svc_df['uri'].apply(parse_service_uri).apply(pd.Series)
+    if UriType.PUBLISHER in grouped_uris:
+        publishers = sorted({parse_service_uri(uri)[:2] for uri in grouped_uris[UriType.PUBLISHER]})
 
-        for (provider, publisher), grp in svc_df.groupby(['provider', 'publish']):
-            provider_plugin = load_providers()[provider]
+        for provider, publisher in publishers:
+            provider_plugin = load_providers(names=provider)[provider]
             publisher_metadata = provider_plugin.get_publishers()[publisher]
             index = construct_service_uri(provider, publisher)
             metadata.append(pd.DataFrame(publisher_metadata, index=[index]))
 
-    if UriType.COLLECTION in grouped_uris.groups.keys():
+    if UriType.COLLECTION in grouped_uris:
         # get metadata for collections
-        tmp_df = grouped_uris.get_group(UriType.COLLECTION)
-        collections = select_collections(lambda c: c.name in tmp_df['uri'].tolist())
+        names = grouped_uris[UriType.COLLECTION]
+        collections = select_collections(lambda c: c.name in names)
         collections = pd.DataFrame(collections)
         collections.set_index('name', inplace=True, drop=False)
 
         metadata.append(collections)
 
-    if UriType.DATASET in grouped_uris.groups.keys():
-        tmp_df = grouped_uris.get_group(UriType.DATASET)
-        datasets = select_datasets(lambda c: c.name in tmp_df['uri'].tolist())
+    if UriType.DATASET in grouped_uris:
+        names = grouped_uris[UriType.DATASET]
+        datasets = select_datasets(lambda c: c.name in names)
         datasets = pd.DataFrame(datasets)
         datasets.set_index('name', inplace=True, drop=False)
         metadata.append(datasets)
@@ -85,9 +89,11 @@ def get_metadata(uris, as_dataframe=False):
 
 
 def update_metadata(uris, display_name=None, description=None,
-                    metadata=None, quest_metadata=None):
+                    metadata=None, quest_metadata=None, return_metadata=True):
     """Update metadata for resource(s)
 
+    All of the updates are applied in a single database transaction.
+
     Args:
         uris (string, comma separated string, or list of strings, Required):
             list of uris to update metadata for.
@@ -99,29 +105,30 @@ def update_metadata(uris, display_name=None, description=None,
             user defiend metadata
         quest_metadata (dict or list of dicts, Optional, Default=None):
             metadata used by QUEST
+        return_metadata (bool, Optional, Default=True):
+            if False, the updated metadata is not read back and the list of updated uris is returned instead
     Returns:
         metadata (dict):
             metadata at each uri keyed on uris
     """
     db = get_db()
-    get_db_entity_funcs = {
-        UriType.COLLECTION: lambda x: db.Collection[x],
-        UriType.DATASET: lambda x: db.Dataset[x],
-        UriType.SERVICE: lambda x: db.QuestCatalog[x.split('/')[-1]],
+    db_entities = {
+        UriType.COLLECTION: (db.Collection, 'name', lambda x: x),
+        UriType.DATASET: (db.Dataset, 'name', lambda x: x),
+        UriType.SERVICE: (db.QuestCatalog, 'service_id', lambda x: x.split('/')[-1]),
     }
 
     # group uris by type
-    grouped_uris = classify_uris(uris, as_dataframe=True, exclude=[UriType.PUBLISHER], require_same_type=True)
-    resource = list(grouped_uris.groups.keys())[0]
-    uris = grouped_uris.get_group(resource)
-    get_db_entity = get_db_entity_funcs[resource]
+    grouped_uris = classify_uris(uris, as_dataframe=False, exclude=[UriType.PUBLISHER], require_same_type=True)
+    resource = list(grouped_uris)[0]
+    uris = grouped_uris[resource]
+    entity, pk, get_key = db_entities[resource]
 
     if resource == UriType.SERVICE:
         # then make sure there are only quest catalog entries
-        if not uris.uri.apply(lambda x: 'quest' in x).all():
+        if not all('quest' in uri for uri in uris):
             raise ValueError('Metadata on service catalog entries cannot be changed.')
 
-    uris = uris.uri.tolist()
     n = len(uris)
     if n > 1:
         if display_name is None:
@@ -145,19 +152,27 @@ def update_metadata(uris, display_name=None, description=None,
         metadata = [metadata]
         quest_metadata = [quest_metadata]
 
-    for uri, name, desc, meta, quest_meta in zip(uris, display_name, description, metadata, quest_metadata):
-        if quest_meta is None:
-            quest_meta = {}
+    with db_session:
+        # load all of the entities up front with a few queries rather than one query per uri
+        keys = [get_key(uri) for uri in uris]
+        for i in range(0, n, _SELECT_CHUNK_SIZE):
+            chunk = keys[i:i + _SELECT_CHUNK_SIZE]
+            entity.select(lambda e: getattr(e, pk) in chunk)[:]
+
+        for key, name, desc, meta, quest_meta in zip(keys, display_name, description, metadata, quest_metadata):
+            # copy so that a quest_metadata dict shared between uris isn't modified
+            quest_meta = dict(quest_meta or {})
+
+            if name:
+                quest_meta.update({'display_name': name})
+            if desc:
+                quest_meta.update({'description': desc})
+            if meta:
+                quest_meta.update({'metadata': meta})
 
-        if name:
-            quest_meta.update({'display_name': name})
-        if desc:
-            quest_meta.update({'description': desc})
-        if meta:
-            quest_meta.update({'metadata': meta})
+            entity[key].set(**quest_meta)
 
-        with db_session:
-            entity = get_db_entity(uri)
-            entity.set(**quest_meta)
+    if not return_metadata:
+        return uris
 
     return get_metadata(uris)
@@ -77,7 +77,7 @@ def _read_cached_parameters(provider, service, update_cache=False):
 
 
 def _get_parameters(provider, service, cache_file):
-    driver = load_providers()[provider]
+    driver = load_providers(names=provider)[provider]
     parameters = driver.get_parameters(service)
     os.makedirs(os.path.split(cache_file)[0], exist_ok=True)
     if isinstance(parameters, pd.DataFrame):
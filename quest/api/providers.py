@@ -1,7 +1,8 @@
 import os
 import requests
 
-from ..plugins import load_providers
+from ..plugins import load_providers, load_user_providers, get_plugin_manifest
+from ..static import PluginType
 from ..database.database import get_db, db_session
 from ..util import save_settings, get_settings, update_settings, parse_service_uri
 
@@ -19,8 +20,10 @@ def get_providers(expand=None, update_cache=False):
             list of all available providers
 
     """
-    providers = load_providers(update_cache=update_cache)
-    p = {k: v.metadata for k, v in providers.items()}
+    # providers are listed from the plugin manifest so that they don't have to be imported
+    manifest = get_plugin_manifest(PluginType.PROVIDER, update_cache=update_cache)
+    p = {k: v['metadata'] for k, v in manifest.items()}
+    p.update({k: v.metadata for k, v in load_user_providers(update_cache=update_cache).items()})
     if not expand:
         p = sorted(p.keys())
 
@@ -124,7 +127,7 @@ def add_user_provider(uri):
             update_settings({'USER_SERVICES': user_services})
             save_settings()
             msg = 'service added'
-            load_providers(update_cache=True)
+            load_user_providers(update_cache=True)
         else:
             msg = 'service already present'
     else:
@@ -157,7 +160,7 @@ def delete_user_provider(uri):
         update_settings({'USER_SERVICES': user_services})
         save_settings()
         msg = 'service removed'
-        load_providers(update_cache=True)
+        load_user_providers(update_cache=True)
     else:
         msg = 'service not found'
 
@@ -195,7 +198,7 @@ def authenticate_provider(uri, **kwargs):
 
 
     """
-    provider_plugin = load_providers()[uri]
+    provider_plugin = load_providers(names=uri)[uri]
     provider_plugin.authenticate_me(**kwargs)
 
 
@@ -209,7 +212,7 @@ def unauthenticate_provider(uri):
 
 
     """
-    driver = load_providers()[uri]
+    driver = load_providers(names=uri)[uri]
     driver.unauthenticate_me()
 
 
@@ -1,14 +1,11 @@
 import sys
-import psutil
 
 import pandas as pd
-from tornado import gen
 from functools import wraps
-from distributed import Client, LocalCluster
 from concurrent.futures import CancelledError
 
 from ..static import DatasetStatus
-from ..util import listify, logger
+from ..util import listify, logger, get_settings
 
 _cluster = None
 tasks = {}
@@ -16,14 +13,47 @@ futures = {}
 
 
 class StartCluster():
-    def __init__(self, n_cores=None):
+    """Start (or connect to) the dask cluster that async tasks are run on.
+
+    If a scheduler address is given (or set with the `DASK_SCHEDULER_ADDRESS` setting) the client is attached to
+    that existing scheduler. Otherwise a LocalCluster is started with the number of workers, threads per worker
+    and memory limit per worker from the `DASK_N_WORKERS`, `DASK_THREADS_PER_WORKER` and `DASK_MEMORY_LIMIT`
+    settings.
+    """
+    def __init__(self, n_cores=None, threads_per_worker=None, memory_limit=None, scheduler_address=None):
+        # distributed is slow to import, so it is only imported when a cluster is needed
+        import psutil
+        from distributed import Client, LocalCluster
+
+        settings = get_settings()
+        scheduler_address = scheduler_address or settings.get('DASK_SCHEDULER_ADDRESS')
+        self.cluster = None
+
+        if scheduler_address:
+            self.client = Client(scheduler_address)
+            return
+
         if n_cores is None:
-            n_cores = psutil.cpu_count()-2
-        self.cluster = LocalCluster(processes=True, n_workers=1)
+            n_cores = settings.get('DASK_N_WORKERS') or max(psutil.cpu_count() - 2, 1)
+        if threads_per_worker is None:
+            threads_per_worker = settings.get('DASK_THREADS_PER_WORKER', 1)
+        if memory_limit is None:
+            memory_limit = settings.get('DASK_MEMORY_LIMIT', 'auto')
+
+        self.cluster = LocalCluster(processes=True, n_workers=n_cores,
+                                    threads_per_worker=threads_per_worker, memory_limit=memory_limit)
         self.client = Client(self.cluster)
 
+    def close(self):
+        self.client.close()
+        if self.cluster is not None:
+            self.cluster.close()
+
+    def __enter__(self):
+        return self
+
     def __exit__(self, type, value, traceback):
-        self.cluster.close()
+        self.close()
 
 
 def _get_client():
@@ -183,10 +213,9 @@ def remove_tasks(task_ids=None, status=None):
     return
 
 
-@gen.coroutine
-def add_result_when_done(future):
+async def add_result_when_done(future):
     try:
-        result = yield future._result()
+        result = await future._result()
         tasks[future.key]['result'] = result
     except CancelledError as e:
         tasks[future.key]['result'] = {'error_message': 'task cancelled'}
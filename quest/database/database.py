@@ -4,8 +4,27 @@ from pony import orm
 from pony.orm import db_session
 import shapely.wkt
 
+from . import migrations
+
 _connection = None  # global var to hold persistant db connection
 
+# pragmas set on every connection. WAL lets readers (e.g. other async tasks) run while a dataset status is
+# being written and busy_timeout makes writers wait for the lock rather than fail immediately.
+sqlite_pragmas = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'busy_timeout': 30000,  # milliseconds
+    'cache_size': -64000,  # negative values are in KiB
+    'mmap_size': 268435456,  # bytes
+    'temp_store': 'MEMORY',
+}
+
+# Dataset attributes that equality filters can be applied to in the database (see `select_datasets`)
+dataset_filter_fields = [
+    'name', 'display_name', 'description', 'unit', 'datatype', 'file_format', 'source', 'status', 'message',
+    'file_path', 'visualization_path', 'collection', 'catalog_entry',
+]
+
 
 def define_models(db):
 
@@ -38,18 +57,18 @@ def define_models(db):
         # dataset - metadata
         parameter = orm.Optional(orm.Json)
         unit = orm.Optional(str)
-        datatype = orm.Optional(str)
+        datatype = orm.Optional(str, index=True)
         file_format = orm.Optional(str)
-        source = orm.Optional(str)
+        source = orm.Optional(str, index=True)
         options = orm.Optional(orm.Json)
-        status = orm.Optional(str)
+        status = orm.Optional(str, index=True)
         message = orm.Optional(str)
         file_path = orm.Optional(str, nullable=True)
         visualization_path = orm.Optional(str)
 
         # setup relationships
-        collection = orm.Required(Collection)
-        catalog_entry = orm.Required(str)
+        collection = orm.Required(Collection, index=True)
+        catalog_entry = orm.Required(str, index=True)
 
     class Providers(db.Entity):
         provider = orm.PrimaryKey(str)
@@ -101,14 +120,37 @@ def init_db(dbpath):
     Args:
     Returns:
     """
+    previous_version = migrations.migrate(dbpath)  # bring the schema of an existing database up to date
+
     db = orm.Database()  # create new database object
     define_models(db)  # define entities for this database
+    db.on_connect(provider='sqlite')(_set_sqlite_pragmas)
     db.bind('sqlite', dbpath, create_db=True)  # bind this database
     db.generate_mapping(create_tables=True)
 
+    if previous_version is None:
+        migrations.stamp(dbpath)
+
     return db
 
 
+def get_sqlite_pragmas():
+    """Get the pragmas that are set on each connection to a project database.
+
+    The defaults in `sqlite_pragmas` can be overridden with the `DATABASE_PRAGMAS` setting.
+    """
+    from ..util.config import get_settings
+    pragmas = dict(sqlite_pragmas)
+    pragmas.update(get_settings().get('DATABASE_PRAGMAS') or {})
+    return pragmas
+
+
+def _set_sqlite_pragmas(db, connection):
+    cursor = connection.cursor()
+    for name, value in get_sqlite_pragmas().items():
+        cursor.execute('PRAGMA {} = {}'.format(name, value))
+
+
 def select_collections(select_func=None):
     """
     Args:
@@ -126,9 +168,12 @@ def select_collections(select_func=None):
                      ) for c in collections]
 
 
-def select_datasets(select_func=None):
+def select_datasets(select_func=None, filters=None):
     """
     Args:
+        select_func (function, Optional): Pony query function (e.g. `lambda d: d.status == 'downloaded'`)
+        filters (dict, Optional): equality filters on the fields in `dataset_filter_fields` that are
+            applied in the database (`collection` is the name of a collection)
     Returns:
     """
     db = get_db()
@@ -138,6 +183,14 @@ def select_datasets(select_func=None):
         else:
             datasets = db.Dataset.select(select_func)
 
+        if filters:
+            filters = dict(filters)
+            if 'collection' in filters:
+                filters['collection'] = db.Collection.get(name=filters['collection'])
+                if filters['collection'] is None:
+                    return []
+            datasets = datasets.filter(**filters)
+
         return [dict(d.to_dict(), **{'collection': d.collection.name,
                                      'options': _convert_to_dict(d.options),
                                      'metadata': _convert_to_dict(d.metadata),
@@ -0,0 +1,90 @@
+"""Versioned schema migrations for project databases.
+
+The schema version is stored in the SQLite `user_version` pragma. Databases created before versioning was added
+have a version of 0 and are treated as version 1 (the original schema).
+
+To change the schema of existing projects add a function to `migrations` that takes an open `sqlite3` connection
+and upgrades the schema from the previous version. Migrations are applied in order, each in its own transaction,
+before Pony generates the mapping. New databases are created by Pony from the models in `define_models` and are
+stamped with the latest version without running any migrations.
+"""
+import logging
+import sqlite3
+
+log = logging.getLogger('quest')
+
+# version of the original (unversioned) schema
+BASE_SCHEMA_VERSION = 1
+
+
+def _add_dataset_indexes(connection):
+    """Index the Dataset columns that datasets are commonly filtered on."""
+    for column in ['status', 'collection', 'catalog_entry', 'datatype', 'source']:
+        connection.execute('CREATE INDEX IF NOT EXISTS "idx_dataset__{0}" ON "Dataset" ("{0}")'.format(column))
+
+
+# migrations[i] upgrades the schema from version BASE_SCHEMA_VERSION + i to BASE_SCHEMA_VERSION + i + 1
+migrations = [
+    _add_dataset_indexes,
+]
+
+SCHEMA_VERSION = BASE_SCHEMA_VERSION + len(migrations)
+
+
+def get_schema_version(connection):
+    return connection.execute('PRAGMA user_version').fetchone()[0]
+
+
+def set_schema_version(connection, version):
+    connection.execute('PRAGMA user_version = {:d}'.format(version))
+
+
+def _has_tables(connection):
+    return connection.execute("SELECT count(*) FROM sqlite_master WHERE type = 'table'").fetchone()[0] > 0
+
+
+def migrate(dbpath):
+    """Apply any migrations that the database at `dbpath` hasn't had yet.
+
+    Args:
+        dbpath (string): path to the SQLite database.
+
+    Returns:
+        The schema version of the database before it was migrated (None if it is a new database).
+    """
+    connection = sqlite3.connect(dbpath, isolation_level=None)
+    try:
+        if not _has_tables(connection):
+            return None
+
+        version = get_schema_version(connection) or BASE_SCHEMA_VERSION
+        if version > SCHEMA_VERSION:
+            log.warning('The database at {} has schema version {}, which is newer than the latest version ({}) '
+                        'supported by this version of quest.'.format(dbpath, version, SCHEMA_VERSION))
+            return version
+
+        for i, migration in enumerate(migrations[version - BASE_SCHEMA_VERSION:], start=version):
+            log.info('migrating database {} to schema version {}'.format(dbpath, i + 1))
+            connection.execute('BEGIN')
+            try:
+                migration(connection)
+                set_schema_version(connection, i + 1)
+                connection.execute('COMMIT')
+            except Exception:
+                connection.execute('ROLLBACK')
+                raise
+
+        return version
+    finally:
+        connection.close()
+
+
+def stamp(dbpath, version=SCHEMA_VERSION):
+    """Record `version` as the schema version of the database at `dbpath` if it doesn't have a version yet.
+    """
+    connection = sqlite3.connect(dbpath, isolation_level=None)
+    try:
+        if get_schema_version(connection) == 0:
+            set_schema_version(connection, version)
+    finally:
+        connection.close()
@@ -1,6 +1,7 @@
 import abc
 
 from ...database import get_db, db_session
+from ...util import get_settings, get_session
 
 
 class ProviderBase(metaclass=abc.ABCMeta):
@@ -14,6 +15,7 @@ class ProviderBase(metaclass=abc.ABCMeta):
     organization_name = None
     organization_abbr = None
     use_cache = True
+    max_concurrent_downloads = 4
 
     @property
     def services(self):
@@ -33,6 +35,22 @@ class ProviderBase(metaclass=abc.ABCMeta):
 
         return self._publishers
 
+    @property
+    def download_concurrency(self):
+        """Maximum number of datasets from this provider that are downloaded at the same time.
+
+        Set per provider with the `DOWNLOAD_CONCURRENCY` setting (e.g. {'usgs-nwis': 8}), otherwise
+        `max_concurrent_downloads` is used.
+        """
+        limits = get_settings().get('DOWNLOAD_CONCURRENCY') or {}
+        return max(int(limits.get(self.name, self.max_concurrent_downloads)), 1)
+
+    @property
+    def session(self):
+        """Keep-alive HTTP session shared by all downloads from this provider.
+        """
+        return get_session(self.name, pool_size=self.download_concurrency)
+
     @property
     def metadata(self):
         return {
@@ -57,10 +75,10 @@ class ProviderBase(metaclass=abc.ABCMeta):
 
         return self._credentials
 
-    def __init__(self, name=None, use_cache=None, update_frequency='M'):
+    def __init__(self, name=None, use_cache=None, update_frequency=None):
         self.name = name or self.name
         self.use_cache = use_cache or self.use_cache
-        self.update_frequency = update_frequency  # not implemented
+        self.update_frequency = update_frequency  # default time to live of the cached service catalogs (None never expires)
         self._services = None
         self._publishers = None
         self._credentials = None
@@ -1,12 +1,12 @@
 import json
 import os
-import pickle
+import re
+import sqlite3
 
-import ulmo
+import numpy as np
 import param
 import pandas as pd
-import geopandas as gpd
-from shapely.geometry import box, Point
+import shapely
 
 from quest import util
 
@@ -34,6 +34,18 @@ reserved_geometry_fields = [
 
 reserved_catalog_entry_fields.extend(reserved_geometry_fields)
 
+# `search_catalog` filters that aren't matched against the catalog entry metadata
+reserved_catalog_filters = [
+    'bbox',
+    'geom_type',
+    'parameter',
+    'display_name',
+    'description',
+    'search_terms',
+]
+
+DOWNLOAD_CHUNK_SIZE = 1024 * 1024
+
 
 class ServiceBase(param.Parameterized):  # TODO can I make this an abc and have it be a Paramitarized?
     """Base class for data providers
@@ -48,11 +60,16 @@ class ServiceBase(param.Parameterized):  # TODO can I make this an abc and have
     geographical_areas = None
     bounding_boxes = None
     _parameter_map = None
+    # set to False if `download` keeps per request state on the service so downloads are run one at a time
+    thread_safe = True
 
     # name = param.String(default='Service', precedence=-1)
 
     def __init__(self, provider, **kwargs):
         self.provider = provider
+        self._spatial_index = None
+        self._tag_index = None
+        self._text_index = None
         super(ServiceBase, self).__init__(**kwargs)
 
     @property
@@ -125,40 +142,85 @@ class ServiceBase(param.Parameterized):  # TODO can I make this an abc and have
     def download(self, catalog_id, file_path, dataset, **kwargs):
         raise NotImplementedError()
 
-    def search_catalog_wrapper(self, update_cache=False, **kwargs):
+    def search_catalog_wrapper(self, update_cache=False, columns=None, **kwargs):
         """Get catalog_entries associated with service.
 
         Take a series of query parameters and return a list of
         locations as a geojson python dictionary
+
+        If a `bbox` is passed in then only catalog_entries that intersect it are returned, and any metadata filters
+        (i.e. `state='TX'`) that the tag index can answer are applied. When the catalog is read from a columnar
+        cache, the `bbox` and `parameter` filters are pushed down to the reader and only `columns` (if specified)
+        are read.
+
+        If `update_cache` is True, or the cached catalog is older than its time to live (see `catalog_ttl`), then the
+        cached catalog is refreshed with `refresh_catalog`.
         """
-        cache_file = os.path.join(util.get_cache_dir(self.provider.name), self.name + '_catalog.p')
+        bbox = kwargs.get('bbox')
+        loaded_catalogs = util.catalog_cache.loaded_catalogs
+        if self.use_cache and not update_cache and self.catalog_cache_expired:
+            util.logger.info('cached catalog for {}/{} has expired, refreshing it'.format(*self._catalog_key))
+            update_cache = True
+
+        if update_cache:
+            loaded_catalogs.invalidate(self._catalog_key)
+
         if self.use_cache and not update_cache:
+            # reuse a catalog that is already loaded in this process if the cache file hasn't changed
+            catalog_entries = loaded_catalogs.get(self._catalog_key, self.catalog_cache_file)
+            if catalog_entries is not None:
+                return self._filter_catalog_entries(catalog_entries, **kwargs)
+
+            # only whole catalogs are kept in memory (the pickle cache is always read whole)
+            is_partial = self.cache_format == 'parquet' and (
+                columns is not None or bbox is not None or kwargs.get('parameter') is not None
+            )
             try:
-                catalog_entries = pd.read_pickle(cache_file)
+                catalog_entries = self._read_catalog_cache(columns=columns, bbox=bbox,
+                                                           parameter=kwargs.get('parameter'))
                 self._label_catalog_entries(catalog_entries)
 
                 # convert to GeoPandas GeoDataFrame
-                catalog_entries = gpd.GeoDataFrame(catalog_entries, geometry='geometry')
-
-                return catalog_entries
+                catalog_entries = self._to_geodataframe(catalog_entries)
             except Exception as e:
                 util.logger.info(e)
                 util.logger.info('updating cache')
+            else:
+                if not is_partial:
+                    loaded_catalogs.put(self._catalog_key, self.catalog_cache_file, catalog_entries)
+                    catalog_entries = catalog_entries.copy(deep=False)
+                return self._filter_catalog_entries(catalog_entries, **kwargs)
 
-        catalog_entries = self.search_catalog(**kwargs)
+        if self.use_cache:
+            catalog_entries = self.refresh_catalog(**kwargs)
+        else:
+            catalog_entries = self._normalize_catalog_entries(self.search_catalog(**kwargs))
+
+        self._label_catalog_entries(catalog_entries)
+
+        # convert to GeoPandas GeoDataFrame
+        catalog_entries = self._to_geodataframe(catalog_entries)
+
+        if self.use_cache:
+            loaded_catalogs.put(self._catalog_key, self.catalog_cache_file, catalog_entries)
+            catalog_entries = catalog_entries.copy(deep=False)
+
+        return self._filter_catalog_entries(catalog_entries, **kwargs)
 
+    def _normalize_catalog_entries(self, catalog_entries):
+        """Convert the catalog_entries returned by `search_catalog` into the format that is cached.
+        """
         # convert geometry into shapely objects
         if 'bbox' in catalog_entries.columns:
-            catalog_entries['geometry'] = catalog_entries['bbox'].apply(lambda row: box(*[float(x) for x in row]))
+            bounds = np.asarray(catalog_entries['bbox'].tolist(), dtype=float).reshape(-1, 4)
+            catalog_entries['geometry'] = shapely.box(*bounds.T)
             del catalog_entries['bbox']
 
         if {'latitude', 'longitude'}.issubset(catalog_entries.columns):
-            def fn(row):
-                return Point((
-                    float(row['longitude']),
-                    float(row['latitude'])
-                ))
-            catalog_entries['geometry'] = catalog_entries.apply(fn, axis=1)
+            catalog_entries['geometry'] = shapely.points(
+                catalog_entries['longitude'].to_numpy(dtype=float),
+                catalog_entries['latitude'].to_numpy(dtype=float),
+            )
             del catalog_entries['latitude']
             del catalog_entries['longitude']
 
@@ -169,11 +231,6 @@ class ServiceBase(param.Parameterized):  # TODO can I make this an abc and have
             # del catalog_entries['latitude']
             # del catalog_entries['longitude']
 
-        if 'geometry' in catalog_entries.columns:
-            pass
-            # The following line doesn't have any effect (except perhaps to validate the geometry)
-            # catalog_entries['geometry'].apply(shape)
-
         if 'geometry' not in catalog_entries.columns:
             catalog_entries['geometry'] = None
 
@@ -186,34 +243,375 @@ class ServiceBase(param.Parameterized):  # TODO can I make this an abc and have
 
         # merge extra data columns/fields into metadata as a dictionary
         extra_fields = list(set(catalog_entries.columns.tolist()) - set(reserved_catalog_entry_fields))
-        # change NaN to None so it can be JSON serialized properly
-        catalog_entries['metadata'] = [
-            {k: None if v != v else v for k, v in record.items()}
-            for record in catalog_entries[extra_fields].to_dict(orient='records')
-        ]
+        catalog_entries['metadata'] = self._metadata_records(catalog_entries, extra_fields)
         catalog_entries.drop(extra_fields, axis=1, inplace=True)
         columns = list(set(catalog_entries.columns.tolist()).intersection(reserved_geometry_fields))
         catalog_entries.drop(columns, axis=1, inplace=True)
 
         params = self.get_parameters(catalog_ids=catalog_entries)
         if isinstance(params, pd.DataFrame):
-            groups = params.groupby('service_id').groups
-            catalog_entries['parameters'] = catalog_entries.index.map(
-                lambda x: ','.join(filter(None, params.loc[groups[x]]['parameter'].tolist()))
-                if x in groups.keys() else ''
-            )
+            parameters = params.groupby('service_id')['parameter'].agg(lambda x: ','.join(filter(None, x.tolist())))
+            catalog_entries['parameters'] = catalog_entries.index.map(parameters).fillna('')
         else:
             catalog_entries['parameters'] = ','.join(params['parameters'])
 
+        return catalog_entries
+
+    @staticmethod
+    def _metadata_records(catalog_entries, fields):
+        """Build the metadata dict of each catalog entry from the `fields` columns.
+
+        NaN values are changed to None (so they can be JSON serialized) one column at a time rather than value by
+        value, and the dicts are only built if there are fields to put in them.
+
+        Notes:
+            The dicts are still built for every row when the catalog is refreshed, since the cache, the tag and text
+            indexes and the `search_catalog` filters all read the `metadata` column.
+        """
+        if not fields:
+            return [{} for _ in range(len(catalog_entries))]
+
+        values = np.empty((len(catalog_entries), len(fields)), dtype=object)
+        for i, field in enumerate(fields):
+            column = catalog_entries[field].to_numpy(dtype=object)
+            values[:, i] = np.where(pd.isna(column), None, column)
+
+        return [dict(zip(fields, row)) for row in values.tolist()]
+
+    def search_catalog_changes(self, since=None, etag=None, **kwargs):
+        """Get the catalog entries that were added, changed or deleted since the catalog was last refreshed.
+
+        Override this to let `refresh_catalog` patch the cached catalog rather than fetching the whole catalog again.
+
+        Args:
+            since: the `watermark` returned by the last refresh (an ISO 8601 UTC timestamp of when the last refresh
+                started if it didn't return one).
+            etag (string): the `etag` returned by the last refresh (None if it didn't return one).
+            kwargs: the query parameters passed to `search_catalog`.
+
+        Returns:
+            None if the changes can't be determined (the whole catalog is fetched instead), otherwise a dict with:
+                catalog_entries: new and changed entries in the format returned by `search_catalog` (None or an
+                    empty DataFrame if nothing changed).
+                deleted (optional): list of the ids of deleted entries.
+                watermark (optional): value passed as `since` in the next refresh.
+                etag (optional): value passed as `etag` in the next refresh.
+        """
+        raise NotImplementedError()
+
+    @property
+    def supports_incremental_refresh(self):
+        return type(self).search_catalog_changes is not ServiceBase.search_catalog_changes
+
+    def refresh_catalog(self, full=False, **kwargs):
+        """Refresh the cached catalog.
+
+        If the service implements `search_catalog_changes` and the catalog is already cached, then only the entries
+        that changed since the last refresh are fetched and the cached catalog is patched with them. Otherwise the
+        whole catalog is fetched with `search_catalog`.
+
+        Args:
+            full (bool, optional, default=False): fetch the whole catalog even if the service supports incremental
+                refreshes.
+            kwargs: query parameters passed to `search_catalog`/`search_catalog_changes`.
+
+        Returns:
+            The refreshed catalog_entries (in the row order they were cached in).
+        """
+        started = pd.Timestamp.now(tz='UTC').isoformat()
+        state = self._read_catalog_state()
+        catalog_entries = None
+
+        if not full and state is not None and self.use_cache and self.supports_incremental_refresh:
+            try:
+                cached = self._read_catalog_cache()
+                changes = self.search_catalog_changes(since=state.get('watermark'), etag=state.get('etag'), **kwargs)
+            except NotImplementedError:
+                changes = None
+            except Exception as e:
+                util.logger.info('incremental refresh of {}/{} failed: {}'.format(*self._catalog_key, e))
+                changes = None
+
+            if changes is not None:
+                catalog_entries = self._apply_catalog_changes(cached, changes)
+                state = {'watermark': changes.get('watermark') or started, 'etag': changes.get('etag')}
+
+        if catalog_entries is None:
+            catalog_entries = self._normalize_catalog_entries(self.search_catalog(**kwargs))
+            state = {'watermark': started, 'etag': None}
+
         if self.use_cache:
-            # write to cache_file
-            os.makedirs(os.path.split(cache_file)[0], exist_ok=True)
+            catalog_entries = self._write_catalog_cache(catalog_entries)
+            state['updated'] = started
+            self._write_catalog_state(state)
+            util.catalog_cache.loaded_catalogs.invalidate(self._catalog_key)
+
+        return catalog_entries
+
+    def _apply_catalog_changes(self, catalog_entries, changes):
+        """Patch cached catalog_entries with the changes returned by `search_catalog_changes`.
+        """
+        changed = changes.get('catalog_entries')
+        if changed is not None and len(changed) > 0:
+            changed = self._normalize_catalog_entries(changed)
+        else:
+            changed = None
+
+        drop_ids = {str(x) for x in changes.get('deleted') or []}
+        if changed is not None:
+            drop_ids.update(changed.index.astype(str))
+
+        catalog_entries = catalog_entries[~catalog_entries.index.astype(str).isin(drop_ids)]
+        util.logger.info('patching cached catalog for {}/{}: {} changed and {} deleted entries'.format(
+            *self._catalog_key, 0 if changed is None else len(changed), len(changes.get('deleted') or [])))
+
+        if changed is not None:
+            catalog_entries = pd.concat([catalog_entries, changed])
+
+        return catalog_entries
+
+    @property
+    def catalog_ttl(self):
+        """Time to live of the cached catalog.
+
+        Set with the `CATALOG_CACHE_TTL` setting (or per provider e.g. {'usgs-nwis': 'W'}), otherwise the
+        `update_frequency` of the provider is used. Cached catalogs never expire if neither is set. See
+        `util.catalog_cache.parse_ttl` for the accepted values.
+        """
+        ttl = util.get_settings().get('CATALOG_CACHE_TTL')
+        if isinstance(ttl, dict):
+            ttl = ttl.get(self.provider.name)
+        if ttl is None:
+            ttl = getattr(self.provider, 'update_frequency', None)
+        return ttl
+
+    @property
+    def catalog_cache_expired(self):
+        """True if the cached catalog is older than its time to live.
+        """
+        ttl = util.catalog_cache.parse_ttl(self.catalog_ttl)
+        if ttl is None:
+            return False
+
+        state = self._read_catalog_state()
+        try:
+            if state is not None and state.get('updated'):
+                updated = pd.Timestamp(state['updated'])
+            else:
+                # catalogs cached by earlier versions don't have a state file
+                updated = pd.Timestamp(os.path.getmtime(self.catalog_cache_file), unit='s', tz='UTC')
+        except (OSError, ValueError):
+            return False
+
+        return updated + ttl <= pd.Timestamp.now(tz='UTC')
+
+    def _read_catalog_state(self):
+        try:
+            with open(self._cache_file('catalog_state.json')) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_catalog_state(self, state):
+        state_file = self._cache_file('catalog_state.json')
+        tmp_path = state_file + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f, default=util.to_json_default_handler)
+        os.replace(tmp_path, state_file)
+
+    @property
+    def _catalog_key(self):
+        return self.provider.name, self.name
+
+    @property
+    def cache_format(self):
+        default = 'parquet' if util.catalog_cache.has_columnar_support() else 'pickle'
+        fmt = util.get_settings().get('CATALOG_CACHE_FORMAT', default)
+        if fmt == 'parquet' and not util.catalog_cache.has_columnar_support():
+            util.logger.warning('pyarrow is required for the parquet catalog cache, falling back to pickle')
+            fmt = 'pickle'
+        return fmt
+
+    @property
+    def catalog_cache_file(self):
+        if self.cache_format == 'parquet':
+            return self._cache_file('catalog.parquet')
+        return self._cache_file('catalog.p')
+
+    def _cache_file(self, suffix):
+        return os.path.join(util.get_cache_dir(self.provider.name), '{}_{}'.format(self.name, suffix))
+
+    def _read_catalog_cache(self, columns=None, bbox=None, parameter=None):
+        if self.cache_format == 'pickle':
+            return pd.read_pickle(self.catalog_cache_file)
+
+        pickle_file = self._cache_file('catalog.p')
+        if not os.path.exists(self.catalog_cache_file) and os.path.exists(pickle_file):
+            # convert a catalog cached by an earlier version rather than fetching it again
+            util.logger.info('converting {} to {}'.format(pickle_file, self.catalog_cache_file))
+            self._write_catalog_cache(pd.read_pickle(pickle_file))
+
+        if bbox is not None:
+            bbox = util.bbox2poly(*[float(x) for x in util.listify(bbox)], as_shapely=True).bounds
+
+        # only push parameter filters down that match the literal substring semantics of the reader
+        if parameter is not None and re.escape(parameter) != parameter:
+            parameter = None
+
+        return util.catalog_cache.read_catalog_cache(self.catalog_cache_file, columns=columns,
+                                                     bbox=bbox, parameter=parameter)
+
+    def _write_catalog_cache(self, catalog_entries):
+        """Write catalog_entries to the cache and build its spatial and tag indexes.
+
+        Returns the catalog_entries in the row order they were cached in.
+        """
+        cache_file = self.catalog_cache_file
+        os.makedirs(os.path.split(cache_file)[0], exist_ok=True)
+        if self.cache_format == 'parquet':
+            catalog_entries = util.catalog_cache.write_catalog_cache(cache_file, catalog_entries)
+            # the tag and text indexes are built from the values as they are read back from the cache, since those
+            # are the values that searches are filtered on
+            cached_entries = util.catalog_cache.read_catalog_cache(cache_file)
+        else:
             catalog_entries.to_pickle(cache_file)
+            cached_entries = catalog_entries
 
-        self._label_catalog_entries(catalog_entries)
+        # build the spatial index from the same row order that was just written to the cache
+        spatial_index = util.CatalogSpatialIndex.from_geometries(catalog_entries['geometry'])
+        spatial_index.save(self._cache_file('sindex.npy'))
+        self._spatial_index = None
 
-        # convert to GeoPandas GeoDataFrame
-        catalog_entries = gpd.GeoDataFrame(catalog_entries, geometry='geometry')
+        tag_index = util.CatalogTagIndex.from_metadata(cached_entries['metadata'])
+        tag_index.save(self._cache_file('tags.npz'))
+        self._tag_index = None
+
+        if util.get_settings().get('CATALOG_TEXT_INDEX', True) and util.text_index.has_text_index_support():
+            # index the text of the columns that `search_catalog` matches `search_terms` against (i.e. the uris)
+            labeled_entries = cached_entries.copy(deep=False)
+            self._label_catalog_entries(labeled_entries)
+            util.CatalogTextIndex.build(self._cache_file('text.sqlite'), labeled_entries)
+            self._text_index = None
+
+        return catalog_entries
+
+    @staticmethod
+    def _to_geodataframe(catalog_entries):
+        import geopandas as gpd
+
+        if 'geometry' not in catalog_entries.columns:
+            return gpd.GeoDataFrame(catalog_entries)
+        return gpd.GeoDataFrame(catalog_entries, geometry='geometry')
+
+    def _get_spatial_index(self):
+        """Load the persisted spatial index for the cached catalog, reloading it only if the file has changed.
+        """
+        index_file = self._cache_file('sindex.npy')
+        try:
+            mtime = os.path.getmtime(index_file)
+            if mtime < os.path.getmtime(self.catalog_cache_file):
+                raise ValueError('index is older than the catalog cache')
+            if self._spatial_index is None or self._spatial_index[0] != (index_file, mtime):
+                self._spatial_index = (index_file, mtime), util.CatalogSpatialIndex.load(index_file)
+        except (OSError, ValueError) as e:
+            util.logger.info('spatial index not available: {}'.format(e))
+            self._spatial_index = None
+            return None
+
+        return self._spatial_index[1]
+
+    def _get_tag_index(self):
+        """Load the persisted tag index for the cached catalog, reloading it only if the file has changed.
+        """
+        index_file = self._cache_file('tags.npz')
+        try:
+            mtime = os.path.getmtime(index_file)
+            if mtime < os.path.getmtime(self.catalog_cache_file):
+                raise ValueError('index is older than the catalog cache')
+            if self._tag_index is None or self._tag_index[0] != (index_file, mtime):
+                self._tag_index = (index_file, mtime), util.CatalogTagIndex.load(index_file)
+        except (OSError, ValueError, KeyError) as e:
+            util.logger.info('tag index not available: {}'.format(e))
+            self._tag_index = None
+            return None
+
+        return self._tag_index[1]
+
+    def _get_text_index(self):
+        """Load the full-text index for the cached catalog if it is up to date.
+        """
+        index_file = self._cache_file('text.sqlite')
+        try:
+            mtime = os.path.getmtime(index_file)
+            if mtime < os.path.getmtime(self.catalog_cache_file):
+                raise ValueError('index is older than the catalog cache')
+            if self._text_index is None or self._text_index[0] != (index_file, mtime):
+                self._text_index = (index_file, mtime), util.CatalogTextIndex(index_file)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            util.logger.info('text index not available: {}'.format(e))
+            self._text_index = None
+            return None
+
+        return self._text_index[1]
+
+    def _filter_catalog_entries(self, catalog_entries, bbox=None, **kwargs):
+        """Filter catalog_entries by bbox and by the metadata and text filters in `kwargs` that the indexes can
+        answer.
+
+        The row positions matching the metadata filters (from the tag index), the text filters (from the full-text
+        index) and the candidates for the bbox (from the spatial index) are intersected, so only the candidate rows
+        are tested against the bbox. The indexes are only used when catalog_entries is the whole cached catalog.
+
+        The full-text index returns a superset of the catalog entries that `search_catalog` matches `search_terms`
+        against, so `search_catalog` still checks the remaining rows. Those rows get a `search_rank` column with
+        their rank (1 is the most relevant) among the matches from this service. Ranks from different services
+        can't be compared.
+        """
+        tag_filters = {k: v for k, v in kwargs.items() if k not in reserved_catalog_filters}
+        text_filters = {k: v for k, v in kwargs.items() if k in ['search_terms', 'display_name', 'description']}
+        if (bbox is None and not tag_filters and not text_filters) or catalog_entries.empty:
+            return catalog_entries
+
+        positions = None
+        if tag_filters:
+            tag_index = self._get_tag_index() if self.use_cache else None
+            if tag_index is not None and len(tag_index) == len(catalog_entries):
+                positions = tag_index.query_all(tag_filters)
+
+        ranks = None
+        if text_filters:
+            text_index = self._get_text_index() if self.use_cache else None
+            if text_index is not None and len(text_index) == len(catalog_entries):
+                for k, v in text_filters.items():
+                    matches = text_index.search(v, columns=None if k == 'search_terms' else [k])
+                    if matches is None:
+                        continue
+                    if k == 'search_terms':
+                        ranks = matches
+                    matches = matches.index.to_numpy()
+                    positions = matches if positions is None else np.intersect1d(positions, matches,
+                                                                                 assume_unique=True)
+
+        if bbox is not None:
+            bbox = util.bbox2poly(*[float(x) for x in util.listify(bbox)], as_shapely=True)
+            spatial_index = self._get_spatial_index() if self.use_cache else None
+            if spatial_index is not None and len(spatial_index) == len(catalog_entries):
+                candidates = spatial_index.query(bbox)
+                positions = candidates if positions is None else np.intersect1d(positions, candidates,
+                                                                                assume_unique=True)
+
+        if positions is not None:
+            catalog_entries = catalog_entries.iloc[positions]
+            if ranks is not None:
+                catalog_entries = catalog_entries.copy(deep=False)
+                catalog_entries['search_rank'] = ranks.loc[positions].to_numpy()
+
+        if bbox is not None:
+            catalog_entries = catalog_entries[catalog_entries.intersects(bbox)]
+
+        if 'search_rank' in catalog_entries.columns:
+            catalog_entries = catalog_entries.assign(
+                search_rank=catalog_entries['search_rank'].rank(method='first').astype(int))
 
         return catalog_entries
 
@@ -249,73 +647,24 @@ class ServiceBase(param.Parameterized):  # TODO can I make this an abc and have
         raise NotImplementedError()
 
     def get_tags(self, update_cache=False):
-        cache_file = os.path.join(util.get_cache_dir(self.provider.name), self.name + '_tags.p')
-        if self.use_cache and not update_cache:
-            try:
-                with open(cache_file, 'rb') as cache:
-                    tags = pickle.load(cache)
-                return tags
-            except:
-                util.logger.info('updating tag cache')
+        """Get the values of each metadata field (tag) of the catalog entries, from the tag index of the cache.
 
-        catalog_entries = self.search_catalog_wrapper(update_cache=update_cache)
-        metadata = pd.DataFrame(list(catalog_entries.metadata))
-
-        # drop metadata fields that are unusable as tag fields
-        metadata.drop(labels=['location', 'coverages'], axis=1, inplace=True, errors='ignore')
-
-        tags = {}
-        for tag in metadata.columns:
-            try:
-                tags[tag] = list(metadata[tag].unique())
-
-                # make sure datetime values are serialized (for RPC server)
-                tags[tag] = json.loads(json.dumps(tags[tag], default=util.to_json_default_handler))
-            except TypeError:
-                values = list(metadata[tag])
-                new_tags = dict()
-                new_tags[tag] = list()
-                for v in values:
-                    if isinstance(v, dict):
-                        self._combine_dicts(new_tags, self._get_tags_from_dict(tag, v))
-                    else:
-                        new_tags[tag].append(v)
-                if not new_tags[tag]:
-                    del new_tags[tag]
-                tags.update({k: list(set(v)) for k, v in new_tags.items()})
-
-        if self.use_cache:
-            # write to cache_file
-            with open(cache_file, 'wb') as cache:
-                pickle.dump(tags, cache)
-
-        return tags
-
-    def _get_tags_from_dict(self, tag, d):
-        """Helper function for `get_tags` to recursively parse dicts and add them as multi-indexed tags
+        Nested dicts are parsed out as multi-index tags where the keys are joined with ':'.
         """
-        tags = dict()
-        for k, v in d.items():
-            new_tag = '{}:{}'.format(tag, k)
-            if isinstance(v, dict):
-                self._combine_dicts(tags, self._get_tags_from_dict(new_tag, v))
-            else:
-                tags[new_tag] = v
+        catalog_entries = None
+        if update_cache or not self.use_cache:
+            catalog_entries = self.search_catalog_wrapper(update_cache=update_cache)
 
-        return tags
+        tag_index = self._get_tag_index() if self.use_cache else None
+        if tag_index is None:
+            if catalog_entries is None:
+                util.logger.info('updating tag cache')
+                catalog_entries = self.search_catalog_wrapper()
+            tag_index = util.CatalogTagIndex.from_metadata(catalog_entries['metadata'])
+            if self.use_cache:
+                tag_index.save(self._cache_file('tags.npz'))
 
-    def _combine_dicts(self, this, other):
-        """Helper function for `get_tags` to combine dictionaries by aggregating values rather than overwriting them.
-        """
-        for k, other_v in other.items():
-            other_v = util.listify(other_v)
-            if k in this:
-                this_v = this[k]
-                if isinstance(this_v, list):
-                    other_v.extend(this_v)
-                else:
-                    other_v.append(this_v)
-            this[k] = other_v
+        return tag_index.tags()
 
 
 class TimePeriodServiceBase(ServiceBase):
@@ -358,11 +707,35 @@ class SingleFileServiceBase(ServiceBase):
         util.logger.info('... downloading %s' % url)
 
         if tile_fmt == '':
-            ulmo.util.download_if_new(url, tile_path, check_modified=check_modified)
+            self._download_if_new(url, tile_path, check_modified=check_modified)
         else:
             zip_path = os.path.join(path, 'zip', filename)
-            ulmo.util.download_if_new(url, zip_path, check_modified=check_modified)
+            self._download_if_new(url, zip_path, check_modified=check_modified)
             util.logger.info('... ... zipfile saved at %s' % zip_path)
+            import ulmo
             tile_path = ulmo.util.extract_from_zip(zip_path, tile_path, tile_fmt)
 
-        return tile_path
\ No newline at end of file
+        return tile_path
+
+    def _download_if_new(self, url, path, check_modified=False):
+        """Download `url` to `path` unless `path` already exists.
+
+        http(s) downloads are streamed to disk in `DOWNLOAD_CHUNK_SIZE` chunks over the provider's keep-alive
+        session. ftp urls and last-modified checks (`check_modified=True`) are left to `ulmo.util.download_if_new`.
+        """
+        if check_modified or not url.lower().startswith(('http://', 'https://')):
+            import ulmo
+            ulmo.util.download_if_new(url, path, check_modified=check_modified)
+            return
+
+        if os.path.exists(path):
+            util.logger.info('file already exists, skipping download: %s' % path)
+            return
+
+        partial_path = path + '.part'
+        with self.provider.session.get(url, stream=True) as response:
+            response.raise_for_status()
+            with open(partial_path, 'wb') as f:
+                for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                    f.write(chunk)
+        os.replace(partial_path, path)
\ No newline at end of file
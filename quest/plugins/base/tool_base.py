@@ -74,11 +74,11 @@ class ToolBase(param.ParameterizedFunction):
         result = self._run_tool()
         datasets = listify(result.get('datasets', []))
         catalog_entries = listify(result.get('catalog_entries', []))
-        for dataset in datasets:
-            update_metadata(dataset, quest_metadata={
+        if datasets:
+            update_metadata(datasets, quest_metadata={
                 'options': self.set_options,
                 'status': DatasetStatus.DERIVED
-            })
+            }, return_metadata=False)
 
         result.update(datasets=datasets, catalog_entries=catalog_entries)
 
@@ -154,7 +154,7 @@ class ToolBase(param.ParameterizedFunction):
         )
 
         if dataset_metadata is not None:
-            update_metadata(dataset_name, quest_metadata=dataset_metadata)
+            update_metadata(dataset_name, quest_metadata=dataset_metadata, return_metadata=False)
 
         return dataset_name, file_path, catalog_entry
 
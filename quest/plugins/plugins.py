@@ -1,21 +1,40 @@
 import importlib
 import inspect
+import os
 import pkgutil
 import logging
 
 from .base import ProviderBase, IoBase, ToolBase
 from ..static import PluginType
-from ..util import listify, get_settings
+from ..util import listify, get_settings, read_yaml
 
 
 logger = logging.getLogger('quest')
 
-plugin_instances = {
+# name of the file in each plugin package that lists the plugins defined by each of its modules
+MANIFEST_FILE = 'plugins.yml'
+
+plugin_manifests = {
     PluginType.PROVIDER: None,
     PluginType.IO: None,
     PluginType.TOOL: None,
 }
 
+plugin_instances = {
+    PluginType.PROVIDER: {},
+    PluginType.IO: {},
+    PluginType.TOOL: {},
+}
+
+# names of plugins that failed to load (so they are only tried once)
+failed_plugins = {
+    PluginType.PROVIDER: set(),
+    PluginType.IO: set(),
+    PluginType.TOOL: set(),
+}
+
+user_provider_instances = None
+
 plugin_namespaces = {
     PluginType.PROVIDER: 'quest_provider_plugins',
     PluginType.IO: 'quest_io_plugins',
@@ -35,9 +54,83 @@ plugin_instantiate_funcs = {
 }
 
 
+def _log_load_error(namespace, modname, e):
+    logger.error('{} plugin, {} has failed to load, '
+                 'due to the following exception: \n{} {}.'
+                 .format(namespace, modname, e.__class__.__name__, str(e)))
+
+
+def _discover_plugins(namespace, modname):
+    """Import a plugin module that isn't in a manifest and instantiate all of the plugins defined in it.
+    """
+    plugin_dict = {}
+    try:
+        plugin_name = plugin_namespaces[namespace] + '.' + modname
+        plugin_module = importlib.import_module(plugin_name)
+        get_object = plugin_instantiate_funcs[namespace]
+        for name, cls in inspect.getmembers(plugin_module, inspect.isclass):
+            if issubclass(cls, plugin_base_classes[namespace]) and cls.__module__.startswith(plugin_name):
+                obj = get_object(cls)
+                plugin_dict[obj.name] = obj
+    except Exception as e:
+        _log_load_error(namespace, modname, e)
+
+    return plugin_dict
+
+
+def get_plugin_manifest(namespace, update_cache=False):
+    """Get the names, locations and metadata of the available plugins without importing them.
+
+    Notes:
+        Each plugin package lists the plugins defined by each of its modules in a `plugins.yml` file. Any
+        module in the package that isn't listed in a manifest is imported (and its plugins are instantiated)
+        to discover its plugins.
+
+    Args:
+        namespace (str): Key for what type of plugins that you want.
+        update_cache (bool, optional, default=False): If true re-read the manifests.
+
+    Returns:
+        A dictionary keyed on plugin name with the `module`, `class` and `metadata` of each plugin.
+
+    """
+    if update_cache or plugin_manifests[namespace] is None:
+        package = importlib.import_module(plugin_namespaces[namespace])
+
+        # namespace packages can span several directories, each with its own manifest
+        listed_modules = {}
+        for path in package.__path__:
+            listed_modules.update(read_yaml(os.path.join(path, MANIFEST_FILE)) or {})
+
+        manifest = {}
+        for _, modname, ispkg in pkgutil.iter_modules(package.__path__):
+            if modname in listed_modules:
+                for entry in listed_modules[modname] or []:
+                    manifest[entry['name']] = {
+                        'module': modname,
+                        'class': entry['class'],
+                        'metadata': entry.get('metadata') or {},
+                    }
+            else:
+                for name, obj in _discover_plugins(namespace, modname).items():
+                    plugin_instances[namespace][name] = obj
+                    manifest[name] = {
+                        'module': modname,
+                        'class': obj.__class__.__name__,
+                        'metadata': getattr(obj, 'metadata', {}),
+                    }
+
+        plugin_manifests[namespace] = manifest
+
+    return plugin_manifests[namespace]
+
+
 def list_plugins(namespace):
     """Get a specific list of avaliable plugins.
 
+    Notes:
+        Plugins are listed from their manifest, so none of them are imported.
+
     Args:
         namespace (str): Key for what type of plugins that you want.
 
@@ -45,79 +138,78 @@ def list_plugins(namespace):
         A list of plugin names.
 
     """
-    if plugin_instances[namespace] is None:
-        load_plugins(namespace)
+    return list(get_plugin_manifest(namespace))
 
-    return list(plugin_instances[namespace].keys())
+
+def _load_plugin(namespace, name):
+    """Import and instantiate a single plugin from the manifest.
+    """
+    entry = get_plugin_manifest(namespace)[name]
+    try:
+        plugin_module = importlib.import_module(plugin_namespaces[namespace] + '.' + entry['module'])
+        cls = getattr(plugin_module, entry['class'])
+        return plugin_instantiate_funcs[namespace](cls)
+    except Exception as e:
+        _log_load_error(namespace, entry['module'], e)
 
 
 def load_plugins(namespace, names=None, update_cache=False):
     """Loads a specific kind a of plugin.
 
     Notes:
-        Only key/value pairs that are provided are updated,
-        any other existing pairs are left unchanged or defaults
-        are used.
+        Only the modules of the requested plugins are imported. Plugins are only loaded once unless
+        `update_cache` is True.
 
     Args:
         namespace (str): Key for what type of plugins that you want.
-        names (list): A list of plugin names to load.
-        update_cache (bool, optional, default=False): If true used cached plugins
+        names (list): A list of plugin names to load. If None then all plugins are loaded.
+        update_cache (bool, optional, default=False): If true reload the manifest and the plugins.
 
     Returns:
         A dictionary of plugins with the name as the key, and the object as the value.
 
     """
-    global plugin_instances
+    if update_cache:
+        plugin_instances[namespace] = {}
+        failed_plugins[namespace] = set()
 
+    manifest = get_plugin_manifest(namespace, update_cache=update_cache)
     names = listify(names)
-    plugin_dict = {}
+    if names is None:
+        names = list(manifest)
 
-    if update_cache or plugin_instances[namespace] is None:
-        plugin_module = importlib.import_module(plugin_namespaces[namespace])
-        get_object = plugin_instantiate_funcs[namespace]
-        for _, modname, ispkg in pkgutil.iter_modules(plugin_module.__path__):
-            try:
-                plugin_name = plugin_namespaces[namespace] + '.' + modname
-                plugin_module = importlib.import_module(plugin_name)
-                for name, cls in inspect.getmembers(plugin_module, inspect.isclass):
-                    if issubclass(cls, plugin_base_classes[namespace]) and cls.__module__.startswith(plugin_name):
-                        obj = get_object(cls)
-                        plugin_dict[obj.name] = obj
-            except Exception as e:
-                logger.error('{} plugin, {} has failed to load, '
-                             'due to the following exception: \n{} {}.'
-                             .format(namespace, modname, e.__class__.__name__, str(e)))
-                continue
-
-        plugin_instances[namespace] = plugin_dict
-    else:
-        plugin_dict = plugin_instances[namespace]
-
-    if names is not None:
-        plugin_dict = {k: v for k, v in plugin_dict.items() if k in names}
-    return plugin_dict
+    loaded = plugin_instances[namespace]
+    for name in names:
+        if name in loaded or name not in manifest or name in failed_plugins[namespace]:
+            continue
+
+        obj = _load_plugin(namespace, name)
+        if obj is None:
+            failed_plugins[namespace].add(name)
+        else:
+            loaded[name] = obj
+
+    return {name: loaded[name] for name in names if name in loaded}
 
 
-def load_providers(update_cache=False):
-    """Get the settings currently being used by QUEST.
+def load_user_providers(update_cache=False):
+    """Load the user providers for the uris in the `USER_SERVICES` setting.
 
     Args:
-        update_cache (bool): A switch to update the plugins.
+        update_cache (bool): A switch to reload the user providers.
 
     Returns:
-        A dictionary of plugins with the name as the key, and the object as the value.
+        A dictionary of user providers with the name as the key, and the object as the value.
 
     """
-    global plugin_instances
-
-    settings = get_settings()
+    global user_provider_instances
 
-    if update_cache or plugin_instances[PluginType.PROVIDER] is None:
-        providers = load_plugins(PluginType.PROVIDER, update_cache=True)
-        if len(settings.get('USER_SERVICES', [])) > 0:
+    if update_cache or user_provider_instances is None:
+        providers = {}
+        user_services = get_settings().get('USER_SERVICES', [])
+        if len(user_services) > 0:
             from quest.plugins import user_provider
-            for uri in settings.get('USER_SERVICES', []):
+            for uri in user_services:
                 try:
                     plugin = user_provider.UserProvider(uri=uri)
                     providers[plugin.name] = plugin
@@ -126,8 +218,27 @@ def load_providers(update_cache=False):
                                  'due to the following exception: \n\t{} {}.'
                                  .format('user', uri, e.__class__.__name__, str(e)))
 
-        plugin_instances[PluginType.PROVIDER] = providers
-    else:
-        providers = plugin_instances[PluginType.PROVIDER]
+        user_provider_instances = providers
+
+    return user_provider_instances
+
+
+def load_providers(update_cache=False, names=None):
+    """Load provider plugins and user providers.
+
+    Args:
+        update_cache (bool): A switch to update the plugins.
+        names (list): A list of provider names to load. If None then all providers are loaded.
+
+    Returns:
+        A dictionary of plugins with the name as the key, and the object as the value.
+
+    """
+    providers = load_plugins(PluginType.PROVIDER, names=names, update_cache=update_cache)
+
+    names = listify(names)
+    if names is None or any(name not in providers for name in names):
+        user_providers = load_user_providers(update_cache=update_cache)
+        providers.update({k: v for k, v in user_providers.items() if names is None or k in names})
 
     return providers
@@ -188,7 +188,7 @@ class UserProvider(ProviderBase):
     organization_name = None
     organization_abbr = None
 
-    def __init__(self, uri, name=None, use_cache=True, update_frequency='M'):
+    def __init__(self, uri, name=None, use_cache=True, update_frequency=None):
         super(UserProvider, self).__init__(name=name, use_cache=use_cache, update_frequency=update_frequency)
         self.uri = uri
         self.is_remote = is_remote_uri(uri)
@@ -207,7 +207,7 @@ class UserProvider(ProviderBase):
 
         config_file = self._get_path('quest.yml')
         with uri_open(config_file, self.is_remote) as yml:
-            provider_data = yaml.load(yml)
+            provider_data = yaml.safe_load(yml)
         self.name = 'user-' + provider_data['name']
         self._metadata = provider_data['metadata']
         self._metadata['service_uri'] = self.uri
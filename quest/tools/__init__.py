@@ -1,17 +1,31 @@
 import sys
 
 from ..static import PluginType
-from ..plugins import load_plugins
-
-
-tools = load_plugins(PluginType.TOOL)
+from ..plugins import list_plugins, load_plugins
 
 
 def codify(name):
     return name.lower().replace('-', '_').replace(' ', '_')
 
 
-for tool_name, tool in tools.items():
+def __getattr__(name):
+    # tools are only loaded (and their dependencies imported) when they are first accessed
     this_module = sys.modules[__name__]
-    tool_code_name = codify(tool_name)
-    setattr(this_module, tool_code_name, tool)
+    if name == 'tools':
+        tools = load_plugins(PluginType.TOOL)
+        for tool_name, tool in tools.items():
+            setattr(this_module, codify(tool_name), tool)
+        return tools
+
+    tool_names = {codify(tool_name): tool_name for tool_name in list_plugins(PluginType.TOOL)}
+    if name in tool_names:
+        tool = load_plugins(PluginType.TOOL, tool_names[name]).get(tool_names[name])
+        if tool is not None:
+            setattr(this_module, name, tool)
+            return tool
+
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | {codify(tool_name) for tool_name in list_plugins(PluginType.TOOL)})
@@ -1,7 +1,30 @@
+import importlib
+
 from .misc import *
 from .io import read_yaml, write_yaml
 from .config import get_settings, save_settings, update_settings, update_settings_from_file
 from .log import logger, log_to_console, log_to_file
 from . import param_util as param
 from .param_util import format_json_options, ProviderSelector, ServiceSelector, PublisherSelector, ParameterSelector
-from .units import unit_registry, unit_list
\ No newline at end of file
+from .units import unit_registry, unit_list, convert_units, get_target_units
+from . import raster
+from .sessions import get_session
+
+# the catalog cache and index modules import pyarrow/shapely so they are only imported when they are first used
+_lazy_modules = ['spatial_index', 'tag_index', 'text_index', 'catalog_cache']
+_lazy_attributes = {
+    'CatalogSpatialIndex': 'spatial_index',
+    'CatalogTagIndex': 'tag_index',
+    'CatalogTextIndex': 'text_index',
+}
+
+
+def __getattr__(name):
+    if name in _lazy_modules:
+        return importlib.import_module('.' + name, __name__)
+    if name in _lazy_attributes:
+        value = getattr(importlib.import_module('.' + _lazy_attributes[name], __name__), name)
+        globals()[name] = value
+        return value
+
+    raise AttributeError("module '{}' has no attribute '{}'".format(__name__, name))
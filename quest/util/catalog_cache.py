@@ -0,0 +1,250 @@
+"""Columnar (GeoParquet) storage for cached service catalogs.
+
+Geometries are stored as WKB along with their bounds, and rows are ordered on a coarse lon/lat grid, so that the
+row group statistics of the bounds columns let a bbox query skip most of the file. Object columns holding values
+other than strings (i.e. the `metadata` and `reserved` dicts) are stored as pickled values, so they are read back
+with the same types (timestamps, numpy scalars, etc.) as the pickle cache.
+"""
+import json
+import os
+import pickle
+import re
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import shapely
+
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.dataset as ds
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+from .config import get_settings
+
+DEFAULT_MEMORY_CACHE_SIZE = 8
+INDEX_COLUMN = '__catalog_index__'
+BOUNDS_COLUMNS = ['_xmin', '_ymin', '_xmax', '_ymax']
+ROW_GROUP_SIZE = 10000
+PICKLE_COLUMNS_KEY = b'quest:pickle_columns'
+# columns of caches written by earlier versions that were stored as JSON strings
+JSON_COLUMNS_KEY = b'quest:json_columns'
+
+# calendar durations for the frequency aliases used by `ProviderBase.update_frequency`
+_TTL_ALIASES = {'D': 'days', 'W': 'weeks', 'M': 'months', 'Q': 'months', 'Y': 'years', 'A': 'years'}
+_TTL_ALIAS_MULTIPLIERS = {'Q': 3}
+_ttl_alias_re = re.compile(r'^(\d*)\s*([DWMQYA])$')
+
+
+def has_columnar_support():
+    """Check if the optional dependencies needed for the columnar catalog cache are installed.
+    """
+    return pa is not None
+
+
+def parse_ttl(ttl):
+    """Convert a catalog cache time to live into something that can be added to a `pandas.Timestamp`.
+
+    Args:
+        ttl (number, string or None): seconds (number), a frequency alias (e.g. 'D', 'W', 'M', '3M' or 'Y'), or a
+            timedelta string (e.g. '12h' or '7 days'). None or 0 means the cache never expires.
+
+    Returns:
+        A `pandas.DateOffset` or `pandas.Timedelta`, or None if the cache never expires.
+    """
+    if not ttl:
+        return None
+
+    if isinstance(ttl, (int, float)):
+        return pd.Timedelta(seconds=ttl)
+
+    match = _ttl_alias_re.match(ttl.strip().upper())
+    if match is not None:
+        n, alias = match.groups()
+        n = int(n or 1) * _TTL_ALIAS_MULTIPLIERS.get(alias, 1)
+        return pd.DateOffset(**{_TTL_ALIASES[alias]: n})
+
+    return pd.Timedelta(ttl)
+
+
+def write_catalog_cache(path, catalog_entries, row_group_size=ROW_GROUP_SIZE):
+    """Write a catalog to a GeoParquet file.
+
+    Args:
+        path (string): path of the parquet file to write.
+        catalog_entries (pandas.DataFrame): catalog with a `geometry` column of shapely objects (or None).
+        row_group_size (int): number of rows in each row group.
+
+    Returns:
+        catalog_entries reordered to match the order of the rows in the file.
+    """
+    geometry = np.array([g if isinstance(g, shapely.Geometry) else None for g in catalog_entries['geometry']],
+                        dtype=object)
+    bounds = shapely.bounds(geometry)
+
+    # order rows by the 1 degree grid cell of their bbox center (rows without a geometry go last)
+    center_x = (bounds[:, 0] + bounds[:, 2]) / 2
+    center_y = (bounds[:, 1] + bounds[:, 3]) / 2
+    order = np.argsort(np.floor(center_y + 90) * 360 + np.floor(center_x + 180), kind='stable')
+    catalog_entries = catalog_entries.iloc[order]
+    geometry = geometry[order]
+    bounds = bounds[order]
+
+    df = pd.DataFrame(catalog_entries.drop(columns='geometry'))
+    df.insert(0, INDEX_COLUMN, catalog_entries.index)
+
+    pickle_columns = []
+    for column in df.columns:
+        values = df[column]
+        if values.dtype == object and not values.map(lambda v: v is None or isinstance(v, str)).all():
+            df[column] = [None if v is None else pickle.dumps(v, protocol=pickle.HIGHEST_PROTOCOL) for v in values]
+            pickle_columns.append(column)
+
+    df['geometry'] = shapely.to_wkb(geometry)
+    for column, values in zip(BOUNDS_COLUMNS, bounds.T):
+        df[column] = values
+
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    metadata = dict(table.schema.metadata or {})
+    metadata[b'geo'] = json.dumps({
+        'version': '1.0.0',
+        'primary_column': 'geometry',
+        'columns': {'geometry': {'encoding': 'WKB', 'geometry_types': []}},
+    }).encode()
+    metadata[PICKLE_COLUMNS_KEY] = json.dumps(pickle_columns).encode()
+    table = table.replace_schema_metadata(metadata)
+
+    # write to a temporary file first so readers never see a partially written cache
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    pq.write_table(table, tmp_path, row_group_size=row_group_size)
+    os.replace(tmp_path, path)
+
+    return catalog_entries
+
+
+def read_catalog_cache(path, columns=None, bbox=None, parameter=None):
+    """Read a catalog that was written with `write_catalog_cache`.
+
+    Args:
+        path (string): path of the parquet file to read.
+        columns (list, optional): only read these columns (the index and `service_id` are always read).
+        bbox (tuple, optional): (xmin, ymin, xmax, ymax) only read rows whose bounds intersect the bbox.
+        parameter (string, optional): only read rows whose `parameters` contain this substring.
+
+    Returns:
+        A pandas DataFrame with the geometry column converted back into shapely objects.
+    """
+    dataset = ds.dataset(path, format='parquet')
+    schema = dataset.schema
+    pickle_columns = json.loads((schema.metadata or {}).get(PICKLE_COLUMNS_KEY, b'[]'))
+    json_columns = json.loads((schema.metadata or {}).get(JSON_COLUMNS_KEY, b'[]'))
+
+    if columns is None:
+        columns = [c for c in schema.names if c not in BOUNDS_COLUMNS]
+    else:
+        columns = set(columns) | {INDEX_COLUMN, 'service_id'}
+        columns = [c for c in schema.names if c in columns]
+
+    expression = None
+    if bbox is not None:
+        xmin, ymin, xmax, ymax = bbox
+        expression = ((ds.field('_xmax') >= xmin) & (ds.field('_xmin') <= xmax) &
+                      (ds.field('_ymax') >= ymin) & (ds.field('_ymin') <= ymax))
+
+    if parameter is not None and 'parameters' in schema.names and 'parameters' not in pickle_columns:
+        parameter_expression = pc.match_substring(ds.field('parameters'), parameter)
+        expression = parameter_expression if expression is None else expression & parameter_expression
+
+    df = dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+    for column in pickle_columns:
+        if column in df.columns:
+            df[column] = [None if v is None else pickle.loads(v) for v in df[column]]
+    for column in json_columns:
+        if column in df.columns:
+            df[column] = [json.loads(v) if isinstance(v, str) else None for v in df[column]]
+
+    df.set_index(INDEX_COLUMN, inplace=True)
+    df.index.name = None
+
+    if 'geometry' in df.columns:
+        df['geometry'] = shapely.from_wkb(df['geometry'].to_numpy(dtype=object))
+
+    return df
+
+
+class LoadedCatalogs(object):
+    """Process wide, size bounded LRU of service catalogs that have already been loaded from the cache.
+
+    Entries are keyed on (provider, service) and are only returned while the cache file they were loaded from
+    is unchanged (same path and mtime). The number of catalogs kept is set by the `CATALOG_MEMORY_CACHE_SIZE`
+    setting (0 disables it).
+    """
+
+    def __init__(self, maxsize=None):
+        self._maxsize = maxsize
+        self._catalogs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._catalogs)
+
+    @property
+    def maxsize(self):
+        if self._maxsize is not None:
+            return self._maxsize
+        return get_settings().get('CATALOG_MEMORY_CACHE_SIZE', DEFAULT_MEMORY_CACHE_SIZE)
+
+    @staticmethod
+    def _file_version(path):
+        try:
+            return path, os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+
+    def get(self, key, path):
+        """Get the catalog loaded for `key` if `path` hasn't changed since it was loaded, otherwise None.
+        """
+        with self._lock:
+            entry = self._catalogs.get(key)
+            if entry is None:
+                return None
+
+            version, catalog_entries = entry
+            if version is None or version != self._file_version(path):
+                del self._catalogs[key]
+                return None
+
+            self._catalogs.move_to_end(key)
+
+        # shallow copy so callers can add/drop columns without changing the cached catalog
+        return catalog_entries.copy(deep=False)
+
+    def put(self, key, path, catalog_entries):
+        """Store the catalog loaded for `key` from the cache file at `path`.
+        """
+        if self.maxsize <= 0:
+            return
+
+        with self._lock:
+            self._catalogs[key] = self._file_version(path), catalog_entries
+            self._catalogs.move_to_end(key)
+            while len(self._catalogs) > self.maxsize:
+                self._catalogs.popitem(last=False)
+
+    def invalidate(self, key=None):
+        """Remove the catalog for `key`, or all catalogs if `key` is None.
+        """
+        with self._lock:
+            if key is None:
+                self._catalogs.clear()
+            else:
+                self._catalogs.pop(key, None)
+
+
+loaded_catalogs = LoadedCatalogs()
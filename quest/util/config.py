@@ -68,10 +68,10 @@ def update_settings(config={}):
     if 'BASE_DIR' in config.keys() or 'PROJECTS_DIR' in config.keys():
         get_db(reconnect=True)
 
-    # reload providers
+    # reload user providers
     if 'USER_SERVICES' in config.keys():
-        from ..plugins.plugins import load_providers
-        load_providers(update_cache=True)
+        from ..plugins.plugins import load_user_providers
+        load_user_providers(update_cache=True)
 
     return settings
 
@@ -1,10 +1,9 @@
 import os
 import re
 import warnings
-from uuid import uuid4, UUID
+from uuid import uuid4
 
 import shapely.geometry
-import geopandas as gpd
 import pandas as pd
 import numpy as np
 from geojson import LineString, Point, Polygon, Feature, FeatureCollection, MultiPolygon
@@ -101,18 +100,53 @@ def bbox2poly(x1, y1, x2, y2, reverse_order=False, as_geojson=False, as_shapely=
     return multi_polygon(polygons=[polygon(poly1), polygon(poly2)])
 
 
+# hex string of a version 4 uuid (i.e. `uuid4().hex`)
+UUID4_HEX_PATTERN = '[0-9a-f]{12}4[0-9a-f]{3}[89ab][0-9a-f]{15}'
+# dataset uris are uuid4 hex strings that start with 'd' (see `uuid('dataset')`)
+DATASET_URI_PATTERN = 'd[0-9a-f]{11}4[0-9a-f]{3}[89ab][0-9a-f]{15}'
+
+_uuid4_hex_re = re.compile(UUID4_HEX_PATTERN)
+_dataset_uri_re = re.compile(DATASET_URI_PATTERN)
+
+# lists with more uris than this are classified with vectorized pandas string methods
+CLASSIFY_URIS_VECTORIZE_SIZE = 1000
+
+
+def _classify_uri(uri):
+    """Get the UriType of a single uri."""
+    if uri.startswith('svc://'):
+        return UriType.SERVICE
+    if uri.startswith('pub://'):
+        return UriType.PUBLISHER
+    if _dataset_uri_re.fullmatch(uri):
+        return UriType.DATASET
+    return UriType.COLLECTION
+
+
+def _classify_uri_series(uris):
+    """Get the UriType of each uri in a pandas Series of strings."""
+    conditions = [
+        uris.str.startswith('svc://'),
+        uris.str.startswith('pub://'),
+        uris.str.fullmatch(DATASET_URI_PATTERN),
+    ]
+    choices = [UriType.SERVICE, UriType.PUBLISHER, UriType.DATASET]
+    return np.select(conditions, choices, default=UriType.COLLECTION).astype(object)
+
+
 def classify_uris(uris, grouped=True, as_dataframe=True, require_same_type=False, exclude=None, raise_if_empty=True):
     """Converts a list of uris into a pandas dataframe.
 
     Notes:
-        Classified by resource type.
+        Classified by resource type. Small lists of uris are classified in pure Python, so calling this with
+        `as_dataframe=False` doesn't touch pandas at all.
 
     Args:
         uris (list or string): List of Quest uris to classify into the following types: 'collections', 'services',
         'publishers', or 'datasets'.
         grouped (bool): If True returns
         Pandas GroupBy object (see: https://pandas.pydata.org/pandas-docs/stable/groupby.html)
-        as_dataframe (bool): If True returns a Pandas DataFrame
+        as_dataframe (bool): If True returns a Pandas DataFrame, otherwise a dict of lists of uris keyed on type.
         require_same_type (bool): If True raises a `ValueError` if uris of more than one type are passed in.
         exclude (list or string): List of uri types to not allow. If a uri of an excluded type is passed in
         then a `ValueError` will be raised.
@@ -120,41 +154,37 @@ def classify_uris(uris, grouped=True, as_dataframe=True, require_same_type=False
     Returns:
         A pandas dataframe.
     """
-    uris = listify(uris)
-
-    df = pd.DataFrame(uris, columns=['uri'])
-    df['type'] = UriType.COLLECTION
-
-    uuid_idx = df['uri'].apply(is_uuid)
-    service_idx = df['uri'].str.startswith('svc://')
-    publish_idx = df['uri'].str.startswith('pub://')
-    dataset_idx = uuid_idx & df['uri'].str.startswith('d')
-
-    df['type'][service_idx] = UriType.SERVICE
-    df['type'][publish_idx] = UriType.PUBLISHER
-    df['type'][dataset_idx] = UriType.DATASET
-    df.set_index('uri', drop=False, inplace=True)
+    uris = listify(uris) or []
 
-    grouped_df = df.groupby('type')
+    if raise_if_empty and not uris:
+        raise ValueError('At least one uri must be specified.')
 
-    if raise_if_empty:
-        if df.empty:
-            raise ValueError('At least one uri must be specified.')
+    if len(uris) > CLASSIFY_URIS_VECTORIZE_SIZE:
+        types = _classify_uri_series(pd.Series(uris, dtype=object))
+        uri_types = set(pd.unique(types))
+    else:
+        types = [_classify_uri(uri) for uri in uris]
+        uri_types = set(types)
 
     if exclude is not None:
-        for uri_type in exclude:
-            if uri_type in grouped_df.groups:
+        for uri_type in listify(exclude):
+            if uri_type in uri_types:
                 raise ValueError('Uris for {0} are not allowed.'.format(uri_type))
 
-    if require_same_type and len(grouped_df.groups.keys()) > 1:
+    if require_same_type and len(uri_types) > 1:
         raise ValueError('All uris must be of the same type')
 
     if not as_dataframe:
-        groups = {k: list(v) for k, v in grouped_df.groups.items()}
+        groups = {uri_type: [] for uri_type in sorted(uri_types)}
+        for uri, uri_type in zip(uris, types):
+            groups[uri_type].append(uri)
         return groups
 
+    df = pd.DataFrame({'uri': pd.Series(uris, dtype=object), 'type': pd.Series(types, dtype=object)})
+    df.set_index('uri', drop=False, inplace=True)
+
     if grouped:
-        return grouped_df
+        return df.groupby('type')
 
     return df
 
@@ -180,20 +210,25 @@ def construct_service_uri(provider, service, catalog_id=None):
 
 
 def convert_nodata_to_nans(xarr):
-    """
+    """Replace the nodata values in a raster DataArray with NaNs.
+
+    Notes:
+        Uses `DataArray.where`, so for lazily loaded arrays only the selected data is read (and cast to float).
 
     Args:
-        xarr:
+        xarr (xarray.DataArray): raster with a `nodata` (or `nodatavals`) attribute.
 
     Returns:
-
+        A DataArray with NaNs in place of nodata values.
     """
     nodata_attr = [k for k in xarr.attrs.keys() if k.lower().startswith('nodata')][0]
     nodata = xarr.attrs[nodata_attr]
+    if isinstance(nodata, (tuple, list)):
+        nodata = nodata[0]
     if nodata:
-        if str(xarr.dtype).startswith('int') or str(xarr.dtype).startswith('uint'):
-            xarr.values = xarr.values.astype(np.float32)
-        xarr.values[xarr.values == nodata] = np.nan
+        attrs = xarr.attrs
+        xarr = xarr.where(xarr != nodata)
+        xarr.attrs = attrs
     return xarr
 
 
@@ -250,25 +285,15 @@ def is_remote_uri(path):
 def is_uuid(uuid):
     """Check if string is a uuid4.
 
-    Notes:
-        source: https://gist.github.com/ShawnMilo/7777304
-
     Args:
         uuid (int): A universal unique identifier.
 
     Returns:
         If the uuid is version 4 then true, else false otherwise.
     """
-    try:
-        val = UUID(uuid, version=4)
-    except ValueError:
-        # If it's a value error, then the string is not a valid UUID.
-        return False
-
-    # If the uuid_string is a valid hex code, but an invalid uuid4,
-    # the UUID.__init__ will convert it to a valid uuid4.
-    # This is bad for validation purposes.
-    return val.hex == uuid
+    # equivalent to `UUID(uuid, version=4).hex == uuid`, which rejects hex strings that UUID would have to
+    # coerce into a valid uuid4, but without constructing a UUID
+    return isinstance(uuid, str) and _uuid4_hex_re.fullmatch(uuid) is not None
 
 
 def listify(liststr, delimiter=','):
@@ -330,6 +355,8 @@ def to_geodataframe(feature_collection):
     Returns:
         A GeoPandas Dataframe.
     """
+    import geopandas as gpd
+
     features = {}
     for feature in feature_collection['features']:
         data = feature['properties']
@@ -339,6 +366,7 @@ def to_geodataframe(feature_collection):
         })
 
         features[feature['id']] = data
+
     return gpd.GeoDataFrame.from_dict(features, orient='index')
 
 
@@ -0,0 +1,168 @@
+"""Shared writer for the rasters that Quest produces.
+
+Rasters are written as cloud optimized GeoTIFFs (COGs): tiled and compressed, with internal overviews stored
+ahead of the full resolution data, so windowed reads and reads at a lower resolution only touch the blocks they
+need. The creation options and overviews are set with the `RASTER_CREATION_OPTIONS`, `RASTER_OVERVIEW_LEVELS`
+and `RASTER_OVERVIEW_RESAMPLING` settings.
+
+rasterio is only imported when a raster is written.
+"""
+import os
+
+from .config import get_settings
+
+DEFAULT_CREATION_OPTIONS = {
+    'tiled': True,
+    'blockxsize': 512,
+    'blockysize': 512,
+    'compress': 'deflate',
+    'interleave': 'pixel',
+    'bigtiff': 'if_safer',
+}
+DEFAULT_OVERVIEW_LEVELS = [2, 4, 8, 16, 32, 64]
+DEFAULT_OVERVIEW_RESAMPLING = 'nearest'
+
+# profile keys that don't apply to a tiled, compressed GeoTIFF
+_STRIPPED_PROFILE_KEYS = ['blockxsize', 'blockysize', 'tiled', 'compress', 'interleave', 'predictor', 'photometric']
+
+
+def get_creation_options():
+    """Get the GeoTIFF creation options for rasters written by Quest (defaults updated with the
+    `RASTER_CREATION_OPTIONS` setting).
+    """
+    options = dict(DEFAULT_CREATION_OPTIONS)
+    options.update({k.lower(): v for k, v in (get_settings().get('RASTER_CREATION_OPTIONS') or {}).items()})
+    return options
+
+
+def get_overview_levels(width, height, block_size=None):
+    """Get the overview decimation factors for a raster, stopping once an overview fits in a single block.
+
+    Args:
+        width (int): width of the raster in pixels.
+        height (int): height of the raster in pixels.
+        block_size (int, optional): size of the blocks of the raster.
+
+    Returns:
+        A list of decimation factors (empty if the raster is smaller than a block).
+    """
+    levels = get_settings().get('RASTER_OVERVIEW_LEVELS', DEFAULT_OVERVIEW_LEVELS) or []
+    block_size = block_size or get_creation_options()['blockxsize']
+
+    factors = []
+    size = max(width, height)
+    for factor in sorted(levels):
+        if size <= block_size * (factors[-1] if factors else 1):
+            break
+        factors.append(factor)
+    return factors
+
+
+def cog_profile(profile, **kwargs):
+    """Update a rasterio profile so that it writes a tiled, compressed GeoTIFF.
+
+    Args:
+        profile (dict): rasterio profile (i.e. from `dataset.profile`).
+        kwargs: profile values to set (i.e. height, width, transform, dtype). These take precedence over the
+            creation options.
+
+    Returns:
+        A new profile.
+    """
+    profile = {k: v for k, v in profile.items() if k not in _STRIPPED_PROFILE_KEYS}
+    profile.update(get_creation_options())
+    profile.update(kwargs)
+    profile['driver'] = 'GTiff'
+
+    # GeoTIFF blocks have to be a multiple of 16, so small rasters are written with a single small block
+    for size, key in [(profile.get('width'), 'blockxsize'), (profile.get('height'), 'blockysize')]:
+        if size is not None and size < profile[key]:
+            profile[key] = max(16, -(-size // 16) * 16)
+
+    return profile
+
+
+def finish_cog(tmp_path, file_path, resampling=None):
+    """Build the overviews of a tiled GeoTIFF and copy it to `file_path` with the overviews first.
+
+    Args:
+        tmp_path (string): path to a GeoTIFF written with a `cog_profile` profile. It is removed once copied.
+        file_path (string): path of the COG to write.
+        resampling (string, optional): resampling method used to build the overviews. Defaults to the
+            `RASTER_OVERVIEW_RESAMPLING` setting.
+
+    Returns:
+        file_path
+    """
+    import rasterio
+    import rasterio.shutil
+    from rasterio.enums import Resampling
+
+    resampling = resampling or get_settings().get('RASTER_OVERVIEW_RESAMPLING', DEFAULT_OVERVIEW_RESAMPLING)
+
+    with rasterio.open(tmp_path, 'r+') as dst:
+        factors = get_overview_levels(dst.width, dst.height, dst.block_shapes[0][1])
+        if factors:
+            dst.build_overviews(factors, Resampling[resampling])
+            dst.update_tags(ns='rio_overview', resampling=resampling)
+
+    options = get_creation_options()
+    with rasterio.open(tmp_path) as tmp:
+        options.update(blockxsize=tmp.block_shapes[0][1], blockysize=tmp.block_shapes[0][0])
+    rasterio.shutil.copy(tmp_path, file_path, driver='GTiff', copy_src_overviews=True, **options)
+    os.remove(tmp_path)
+
+    return file_path
+
+
+def to_cog(file_path, resampling=None):
+    """Rewrite a GeoTIFF in place as a COG with internal overviews.
+
+    Args:
+        file_path (string): path to the GeoTIFF to rewrite.
+        resampling (string, optional): resampling method used to build the overviews. Defaults to the
+            `RASTER_OVERVIEW_RESAMPLING` setting.
+
+    Returns:
+        file_path
+    """
+    import rasterio
+
+    tmp_path = file_path + '.tmp.tif'
+    with rasterio.open(file_path) as src:
+        profile = cog_profile(src.profile)
+        with rasterio.open(tmp_path, 'w', **profile) as dst:
+            for _, window in dst.block_windows(1):
+                dst.write(src.read(window=window), window=window)
+            dst.update_tags(**src.tags())
+            dst.colorinterp = src.colorinterp
+
+    return finish_cog(tmp_path, file_path, resampling=resampling)
+
+
+def write_raster(file_path, array, profile, indexes=None, resampling=None):
+    """Write an array as a COG.
+
+    Args:
+        file_path (string): path of the GeoTIFF to write.
+        array (numpy.ndarray): array of shape (bands, rows, cols) or (rows, cols) to write.
+        profile (dict): rasterio profile for the raster (crs, transform, nodata, etc.).
+        indexes (int or list, optional): band indexes to write the array to.
+        resampling (string, optional): resampling method used to build the overviews.
+
+    Returns:
+        file_path
+    """
+    import rasterio
+
+    count, height, width = (1,) + array.shape if array.ndim == 2 else array.shape
+    profile = cog_profile(profile, count=count, height=height, width=width, dtype=str(array.dtype))
+    if indexes is None and array.ndim == 2:
+        indexes = 1
+
+    os.makedirs(os.path.dirname(os.path.abspath(file_path)), exist_ok=True)
+    tmp_path = file_path + '.tmp.tif'
+    with rasterio.open(tmp_path, 'w', **profile) as dst:
+        dst.write(array, indexes=indexes)
+
+    return finish_cog(tmp_path, file_path, resampling=resampling)
@@ -0,0 +1,69 @@
+"""Shared keep-alive HTTP sessions for provider plugins.
+
+One `requests.Session` is kept per provider so connections are reused across downloads (and threads). Each
+session retries idempotent requests that fail with a connection error or a transient status code.
+"""
+import threading
+import urllib.error
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from .config import get_settings
+
+DEFAULT_RETRIES = 2
+DEFAULT_POOL_SIZE = 10
+RETRY_BACKOFF_FACTOR = 0.5
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# errors that are worth retrying a whole download for
+TRANSIENT_ERRORS = (
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+    urllib.error.URLError,
+    ConnectionError,
+    TimeoutError,
+)
+
+_sessions = {}
+_lock = threading.Lock()
+
+
+def get_retries():
+    """Get the number of times a failed request (or download) is retried from the `DOWNLOAD_RETRIES` setting.
+    """
+    return get_settings().get('DOWNLOAD_RETRIES', DEFAULT_RETRIES)
+
+
+def get_session(name, pool_size=DEFAULT_POOL_SIZE):
+    """Get the shared session for `name` (usually a provider name), creating it if needed.
+
+    Args:
+        name (string): name the session is shared under.
+        pool_size (int): maximum number of connections kept open per host.
+
+    Returns:
+        A `requests.Session`.
+    """
+    with _lock:
+        session = _sessions.get(name)
+        if session is None:
+            retry = Retry(total=get_retries(), backoff_factor=RETRY_BACKOFF_FACTOR,
+                          status_forcelist=RETRY_STATUS_CODES, raise_on_status=False)
+            adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry)
+            session = requests.Session()
+            session.mount('http://', adapter)
+            session.mount('https://', adapter)
+            _sessions[name] = session
+
+    return session
+
+
+def close_sessions():
+    """Close all of the shared sessions.
+    """
+    with _lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
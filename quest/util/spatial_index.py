@@ -0,0 +1,64 @@
+import os
+
+import numpy as np
+import shapely
+from shapely.strtree import STRtree
+
+
+class CatalogSpatialIndex(object):
+    """STR packed R-tree over the bounding boxes of the geometries in a service catalog.
+
+    Only the bounds of each geometry are persisted, so the index can be loaded without unpickling any shapely
+    objects. The tree itself is packed lazily on the first query and reused for the lifetime of the object.
+
+    Positions returned by `query` are row positions in the catalog the index was built from, so an index is only
+    valid for the exact catalog (and row order) that it was built with.
+    """
+
+    def __init__(self, bounds):
+        self.bounds = np.asarray(bounds, dtype=float).reshape(-1, 4)
+        self._tree = None
+        self._positions = None
+
+    def __len__(self):
+        return len(self.bounds)
+
+    @classmethod
+    def from_geometries(cls, geometries):
+        """Build an index from a sequence (or GeoSeries) of shapely geometries. Missing geometries are skipped.
+        """
+        geometries = np.array([g if isinstance(g, shapely.Geometry) else None for g in geometries], dtype=object)
+        return cls(shapely.bounds(geometries))
+
+    @classmethod
+    def load(cls, path):
+        """Load an index that was written with `save`.
+        """
+        return cls(np.load(path, allow_pickle=False))
+
+    def save(self, path):
+        """Write the index bounds to `path` as a `.npy` file.
+        """
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            np.save(f, self.bounds, allow_pickle=False)
+
+    @property
+    def tree(self):
+        if self._tree is None:
+            valid = ~np.isnan(self.bounds).any(axis=1)
+            self._positions = np.flatnonzero(valid)
+            self._tree = STRtree(shapely.box(*self.bounds[valid].T))
+        return self._tree
+
+    def query(self, geometry):
+        """Get the positions of all catalog entries whose bounding box intersects `geometry`.
+
+        Args:
+            geometry (shapely.geometry): geometry to query the index with (i.e. a bbox polygon).
+
+        Returns:
+            A sorted numpy array of candidate row positions. Candidates still need an exact intersection test.
+        """
+        candidates = self.tree.query(geometry)
+        return np.sort(self._positions[candidates])
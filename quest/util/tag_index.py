@@ -0,0 +1,179 @@
+import json
+import os
+
+import numpy as np
+
+# metadata fields that are unusable as tags (i.e. unique for every catalog entry)
+EXCLUDED_TAG_FIELDS = ['location', 'coverages']
+
+# version of the file format written by `CatalogTagIndex.save`, files written with other versions are rebuilt
+FORMAT_VERSION = 2
+
+
+def _tag_key(value):
+    """Convert a metadata value into the (type, JSON compatible scalar) key it is indexed under, or raise TypeError.
+
+    The type is part of the key so that values that compare equal across types (i.e. `True` and `1`) are kept apart.
+    """
+    if value is None:
+        return 'null', None
+    if isinstance(value, (bool, np.bool_)):
+        return 'bool', bool(value)
+    if isinstance(value, str):
+        return 'str', value
+    if isinstance(value, (int, float, np.number)):
+        value = value.item() if isinstance(value, np.number) else value
+        return ('null', None) if value != value else ('number', value)
+    if hasattr(value, 'isoformat'):
+        return 'datetime', value.isoformat()
+    raise TypeError('{} values are not indexed'.format(type(value).__name__))
+
+
+class CatalogTagIndex(object):
+    """Inverted index from (tag, value) to the row positions of the catalog entries that have that value.
+
+    Tags are the fields of the catalog entry metadata. Nested dicts are indexed as multi-index tags where the keys
+    are joined with ':' (see `get_tags`). The items of list values are listed as values of the tag (as `get_tags`
+    always has), but filters on tags with list values can't be answered by the index.
+
+    Like `CatalogSpatialIndex`, positions are row positions in the catalog the index was built from, so an index
+    is only valid for the exact catalog (and row order) that it was built with.
+    """
+
+    def __init__(self, index, n_rows, unindexed=None):
+        self.index = index
+        self.n_rows = n_rows
+        self.unindexed = set(unindexed or [])
+
+    def __len__(self):
+        return self.n_rows
+
+    @classmethod
+    def from_metadata(cls, metadata, exclude=EXCLUDED_TAG_FIELDS):
+        """Build an index from a sequence of metadata dicts (i.e. the `metadata` column of a catalog).
+        """
+        exclude = set(exclude or [])
+        index = {}
+        unindexed = set()
+
+        def add(tag, value, position):
+            if isinstance(value, dict):
+                for k, v in value.items():
+                    add('{}:{}'.format(tag, k), v, position)
+                return
+            values = [value]
+            if isinstance(value, (list, tuple)):
+                unindexed.add(tag)
+                values = value
+            for v in values:
+                try:
+                    key = _tag_key(v)
+                except TypeError:
+                    unindexed.add(tag)
+                    continue
+                positions = index.setdefault(tag, {}).setdefault(key, [])
+                if not positions or positions[-1] != position:
+                    positions.append(position)
+
+        n_rows = 0
+        for position, record in enumerate(metadata):
+            n_rows += 1
+            for tag, value in (record or {}).items():
+                if tag not in exclude:
+                    add(tag, value, position)
+
+        unindexed.update(exclude)
+        index = {tag: {key: np.array(positions, dtype=np.int64) for key, positions in values.items()}
+                 for tag, values in index.items()}
+
+        return cls(index, n_rows, unindexed)
+
+    @classmethod
+    def load(cls, path):
+        """Load an index that was written with `save`.
+        """
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(str(data['header']))
+            if header.get('version') != FORMAT_VERSION:
+                raise ValueError('tag index was written with a different format version')
+            positions = np.split(data['positions'], data['offsets'][1:-1])
+
+        index = {}
+        for (tag, key), p in zip(header['keys'], positions):
+            index.setdefault(tag, {})[tuple(key)] = p
+
+        return cls(index, header['n_rows'], header['unindexed'])
+
+    def save(self, path):
+        """Write the index to `path` as a `.npz` file.
+        """
+        keys = [(tag, key) for tag, values in self.index.items() for key in values]
+        positions = [self.index[tag][key] for tag, key in keys]
+        offsets = np.cumsum([0] + [len(p) for p in positions])
+        header = json.dumps({'version': FORMAT_VERSION, 'keys': keys, 'n_rows': self.n_rows,
+                             'unindexed': sorted(self.unindexed)})
+
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            np.savez(f, header=np.array(header),
+                     positions=np.concatenate(positions) if positions else np.array([], dtype=np.int64),
+                     offsets=offsets)
+
+    def tags(self):
+        """Get the values of each tag.
+
+        Returns:
+            A dict keyed by tag of lists of values (in the order they first occur in the catalog).
+        """
+        return {tag: [value for _, value in values] for tag, values in self.index.items()}
+
+    def can_query(self, tag):
+        """Check if filters on `tag` can be answered by the index.
+        """
+        parts = str(tag).split(':')
+        return not any(':'.join(parts[:i]) in self.unindexed for i in range(1, len(parts) + 1))
+
+    def query(self, tag, value):
+        """Get the positions of the catalog entries where `tag` equals `value`.
+
+        Like the `search_catalog` filters, numbers match bools that they are equal to (i.e. `1` matches `True`).
+
+        Returns:
+            A sorted numpy array of row positions.
+        """
+        try:
+            key = _tag_key(value)
+        except TypeError:
+            raise ValueError('{} values can not be queried'.format(type(value).__name__))
+
+        keys = [key]
+        if key[0] == 'bool':
+            keys.append(('number', int(key[1])))
+        elif key[0] == 'number' and key[1] in (0, 1):
+            keys.append(('bool', bool(key[1])))
+
+        values = self.index.get(tag, {})
+        matches = [values[k] for k in keys if k in values]
+        if not matches:
+            return np.array([], dtype=np.int64)
+        return matches[0] if len(matches) == 1 else np.union1d(*matches)
+
+    def query_all(self, filters):
+        """Get the positions of the catalog entries that match all `filters` that the index can answer.
+
+        Args:
+            filters (dict): tag, value pairs to match.
+
+        Returns:
+            A sorted numpy array of row positions, or None if none of the filters can be answered by the index.
+        """
+        positions = None
+        for tag, value in filters.items():
+            if not self.can_query(tag):
+                continue
+            try:
+                matches = self.query(tag, value)
+            except ValueError:
+                continue
+            positions = matches if positions is None else np.intersect1d(positions, matches, assume_unique=True)
+        return positions
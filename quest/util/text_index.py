@@ -0,0 +1,149 @@
+import os
+import re
+import sqlite3
+from contextlib import closing
+
+import numpy as np
+import pandas as pd
+
+# catalog columns that are indexed on their own (for the `display_name` and `description` filters)
+TEXT_INDEX_COLUMNS = ['display_name', 'description']
+
+# version of the index schema, indexes built with other versions are not used
+FORMAT_VERSION = 2
+
+# the trigram tokenizer matches substrings of at least this many characters
+MIN_TERM_LENGTH = 3
+
+# terms with regex special characters are matched as regexes by the `search_catalog` filters
+_regex_chars_re = re.compile(r'[.^$*+?{}\[\]\\|()]')
+
+# text of missing values (i.e. of columns that other services' catalogs don't have when they are combined)
+_MISSING_VALUE_TEXT = ['nan', 'NaT', 'None']
+
+
+def _text(value):
+    """Convert a catalog value into the text that is indexed for the `display_name` and `description` filters.
+    """
+    if isinstance(value, str):
+        return value
+    if value is None or value != value:
+        return ''
+    return str(value)
+
+
+def _document(catalog_entries):
+    """Get the text of each catalog entry that `search_terms` are matched against.
+
+    This is `str()` of every column, which is what the `search_terms` filter of `search_catalog` searches.
+    """
+    columns = [catalog_entries[column].apply(str).tolist() for column in catalog_entries.columns]
+    columns.append(catalog_entries.index.astype(str).tolist())
+    return ['\n'.join(values) for values in zip(*columns)]
+
+
+def has_text_index_support():
+    """Check if the SQLite library has the FTS5 trigram tokenizer (SQLite >= 3.34) needed for the text index.
+    """
+    try:
+        with closing(sqlite3.connect(':memory:')) as conn:
+            conn.execute("CREATE VIRTUAL TABLE t USING fts5(a, tokenize='trigram case_sensitive 1')")
+    except sqlite3.OperationalError:
+        return False
+    return True
+
+
+class CatalogTextIndex(object):
+    """SQLite FTS5 full-text index over the text of a service catalog.
+
+    Each catalog entry is indexed with `str()` of all of its columns (the text `search_terms` are matched against)
+    and with its `display_name` and `description`. The index uses the trigram tokenizer (case sensitive), so a
+    search term matches at least the catalog entries that a literal substring search of those columns would
+    match. Terms shorter than `MIN_TERM_LENGTH` characters, containing regex special characters, or that could
+    match the text of a missing value can't be answered by the index. Results are ranked with bm25.
+
+    Like `CatalogSpatialIndex`, positions are row positions in the catalog the index was built from, so an index
+    is only valid for the exact catalog (and row order) that it was built with.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with closing(self._connect()) as conn:
+            info = dict(conn.execute('SELECT key, value FROM info').fetchall())
+        if info.get('version') != FORMAT_VERSION:
+            raise ValueError('text index was built with a different format version')
+        self.n_rows = info['n_rows']
+
+    def __len__(self):
+        return self.n_rows
+
+    def _connect(self):
+        return sqlite3.connect('file:{}?mode=ro'.format(self.path), uri=True)
+
+    @classmethod
+    def build(cls, path, catalog_entries):
+        """Build an index from a (labeled) catalog and write it to `path`.
+        """
+        columns = ', '.join(['document'] + TEXT_INDEX_COLUMNS)
+        rows = zip(
+            range(len(catalog_entries)),
+            _document(catalog_entries),
+            *[[_text(v) for v in catalog_entries[column]] if column in catalog_entries.columns
+              else [''] * len(catalog_entries)
+              for column in TEXT_INDEX_COLUMNS]
+        )
+
+        # build in a temporary file so readers never see a partially written index
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = path + '.tmp'
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        conn = sqlite3.connect(tmp_path)
+        try:
+            conn.execute('PRAGMA journal_mode = OFF')
+            conn.execute('PRAGMA synchronous = OFF')
+            conn.execute("CREATE VIRTUAL TABLE catalog USING fts5({}, content='', "
+                         "tokenize='trigram case_sensitive 1')".format(columns))
+            conn.executemany('INSERT INTO catalog (rowid, {}) VALUES (?, ?, ?, ?)'.format(columns), rows)
+            conn.execute("INSERT INTO catalog (catalog) VALUES ('optimize')")
+            conn.execute('CREATE TABLE info (key TEXT PRIMARY KEY, value)')
+            conn.execute("INSERT INTO info VALUES ('n_rows', ?)", (len(catalog_entries),))
+            conn.execute("INSERT INTO info VALUES ('version', ?)", (FORMAT_VERSION,))
+            conn.commit()
+        finally:
+            conn.close()
+        os.replace(tmp_path, path)
+
+        return cls(path)
+
+    @staticmethod
+    def can_search(term):
+        """Check if `term` can be searched for with the index.
+        """
+        return (isinstance(term, str) and len(term) >= MIN_TERM_LENGTH and _regex_chars_re.search(term) is None
+                and not any(term in text for text in _MISSING_VALUE_TEXT))
+
+    def search(self, terms, columns=None):
+        """Get the catalog entries that contain any of `terms`.
+
+        Args:
+            terms (string or list): search terms.
+            columns (list, optional): only search these `TEXT_INDEX_COLUMNS` (defaults to the text of all of the
+                columns of the catalog entries).
+
+        Returns:
+            A pandas Series of bm25 ranks (lower is more relevant) indexed by sorted row position, or None if any of
+            the terms can't be searched for with the index.
+        """
+        terms = [terms] if isinstance(terms, str) else list(terms)
+        if not terms or not all(self.can_search(term) for term in terms):
+            return None
+
+        query = ' OR '.join('"{}"'.format(term.replace('"', '""')) for term in terms)
+        query = '{{{}}} : ({})'.format(' '.join(columns or ['document']), query)
+
+        with closing(self._connect()) as conn:
+            rows = conn.execute('SELECT rowid, rank FROM catalog WHERE catalog MATCH ?', (query,)).fetchall()
+
+        positions, ranks = zip(*rows) if rows else ((), ())
+        return pd.Series(np.array(ranks, dtype=float), index=np.array(positions, dtype=np.int64)).sort_index()
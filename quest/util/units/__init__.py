@@ -1,13 +1,163 @@
+import functools
+import hashlib
+import json
 import os
 
-from pint import UnitRegistry
+import numpy as np
 
+UNITS_DIR = os.path.dirname(__file__)
+UNIT_DEFINITION_FILES = ['default_units.txt', 'constants_en.txt']
+UNIT_LIST_CACHE_FILE = 'units.json'
 
+
+@functools.lru_cache(maxsize=None)
 def unit_registry():
-    file_path = os.path.join(os.path.dirname(__file__), 'default_units.txt')
+    """Get the UnitRegistry built from `default_units.txt`.
+
+    Notes:
+        Building the registry takes about a second, so it is only built once and shared.
+
+    Returns:
+        A `pint.UnitRegistry`.
+    """
+    from pint import UnitRegistry
+
+    file_path = os.path.join(UNITS_DIR, 'default_units.txt')
     return UnitRegistry(file_path)
 
 
-def unit_list():
+def _unit_definitions_version():
+    """Hash of the unit definition files and the pint version, used to invalidate the cached unit list."""
+    try:
+        from importlib.metadata import version
+        pint_version = version('pint')
+    except ImportError:  # python < 3.8
+        import pkg_resources
+        pint_version = pkg_resources.get_distribution('pint').version
+
+    sha = hashlib.sha1(pint_version.encode())
+    for filename in UNIT_DEFINITION_FILES:
+        with open(os.path.join(UNITS_DIR, filename), 'rb') as f:
+            sha.update(f.read())
+    return sha.hexdigest()
+
+
+def _read_unit_list_cache(path, definitions_version):
+    try:
+        with open(path) as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if cache.get('version') != definitions_version:
+        return None
+    return cache.get('units')
+
+
+def _write_unit_list_cache(path, definitions_version, units):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump({'version': definitions_version, 'units': units}, f)
+    os.replace(tmp_path, path)
+
+
+@functools.lru_cache(maxsize=None)
+def unit_list(use_cache=True):
+    """Get the names of all of the units in the unit registry.
+
+    Args:
+        use_cache (bool): If True the list is read from (or written to) a file in the cache directory so that the
+            unit registry doesn't have to be built to get it.
+
+    Returns:
+        A list of unit names.
+    """
+    from ..misc import get_cache_dir
+
+    cache_file = os.path.join(get_cache_dir(), UNIT_LIST_CACHE_FILE)
+    if use_cache:
+        definitions_version = _unit_definitions_version()
+        units = _read_unit_list_cache(cache_file, definitions_version)
+        if units is not None:
+            return units
+
+    reg = unit_registry()
+    unit_type = type(reg.A)
+    units = [u for u in dir(reg) if isinstance(getattr(reg, u), unit_type)]
+
+    if use_cache:
+        try:
+            _write_unit_list_cache(cache_file, definitions_version, units)
+        except OSError:
+            pass
+
+    return units
+
+
+def get_target_units(from_units, to_units):
+    """Get the units that data in `from_units` is converted to when `to_units` is requested.
+
+    Notes:
+        If `from_units` is a rate (e.g. 'ft**3/s') and `to_units` is not, then the time units of `from_units` are
+        kept (e.g. 'm**3' becomes 'm**3/s').
+
+    Args:
+        from_units (string): units of the data.
+        to_units (string): requested units.
+
+    Returns:
+        The units to convert to.
+    """
+    if '/' in from_units and '/' not in to_units:
+        return to_units + from_units[from_units.find('/'):]
+    return to_units
+
+
+@functools.lru_cache(maxsize=1024)
+def conversion_factors(from_units, to_units):
+    """Get the scale and offset that convert values from `from_units` to `to_units`.
+
+    Returns:
+        A tuple (scale, offset) so that converted = values * scale + offset, or None if the conversion is not
+        linear (e.g. logarithmic units).
+    """
     reg = unit_registry()
-    return [u for u in dir(reg) if isinstance(getattr(reg, u), type(reg.A))]
\ No newline at end of file
+    offset, scale = (reg.convert(v, src=from_units, dst=to_units) for v in (0.0, 1.0))
+    scale -= offset
+
+    # make sure the conversion is linear before reducing it to a scale and offset
+    if not np.isclose(reg.convert(2.0, src=from_units, dst=to_units), 2 * scale + offset):
+        return None
+    return scale, offset
+
+
+def convert_units(values, from_units, to_units):
+    """Convert an array of values between units.
+
+    Args:
+        values (scalar, numpy.ndarray, numpy.ma.MaskedArray, or pandas.Series): values to convert.
+        from_units (string): units of `values`.
+        to_units (string): units to convert to.
+
+    Returns:
+        The converted values, of the same type as `values`.
+    """
+    if from_units == to_units:
+        return values
+
+    factors = conversion_factors(from_units, to_units)
+    if factors is None:
+        reg = unit_registry()
+        converted = reg.Quantity(np.asarray(values), from_units).to(to_units).magnitude
+        if hasattr(values, 'index'):
+            return values.__class__(converted, index=values.index, name=getattr(values, 'name', None))
+        if isinstance(values, np.ma.MaskedArray):
+            return np.ma.masked_array(converted, mask=np.ma.getmask(values))
+        return converted
+
+    scale, offset = factors
+    converted = values * scale
+    if offset:
+        converted = converted + offset
+    return converted
@@ -2,11 +2,12 @@ import os
 import subprocess
 
 import rasterio
+import rasterio.windows
 import xarray as xr
 
 from quest.plugins import IoBase
 from quest.static import DataType
-from quest.util import convert_nodata_to_nans
+from quest.util import convert_nodata_to_nans, listify
 
 
 class RasterGdal(IoBase):
@@ -18,26 +19,80 @@ class RasterGdal(IoBase):
         self.description = 'IO for raster datasets using xarray or rasterio/gdal.'
         self.iotype = 'raster'
 
-    def open(self, path, fmt, with_nodata=False, isel_band=None):
-        "Open raster and return in requested format"
-
+    def open(self, path, fmt, with_nodata=False, isel_band=None, window=None, bbox=None, bands=None,
+             out_shape=None):
+        """Open raster and return in requested format.
+
+        Only the requested bands and window of the raster are read.
+
+        Args:
+            path (string): path of the raster file.
+            fmt (string): one of 'xarray' (default), 'rasterio' or 'array'.
+            with_nodata (bool): if True nodata values are masked (a masked array for 'array', NaNs for 'xarray').
+            isel_band (int): index of a single band to select (xarray only).
+            window (tuple or rasterio.windows.Window): ((row_start, row_stop), (col_start, col_stop)) to read.
+            bbox (tuple): (xmin, ymin, xmax, ymax) in the coordinates of the raster to read. Ignored if a window
+                is given.
+            bands (int or list): 1-based index (or list of indexes) of the bands to read.
+            out_shape (tuple): (rows, cols) to resample the data to when reading. Reading at a lower resolution
+                uses the raster's overviews if it has them ('array' only).
+        """
         if fmt is None or fmt.lower() == 'xarray':
+            if out_shape is not None:
+                raise ValueError('out_shape is only supported when fmt is "array"')
+
+            # xarray reads lazily, so select the subset before anything is loaded
             xarr = xr.open_rasterio(path, parse_coordinates=True)
+            if bands is not None:
+                xarr = xarr.sel(band=bands)
             if isel_band is not None:
-                xarr = xarr.isel(band=0)
+                xarr = xarr.isel(band=isel_band)
+            if window is not None:
+                (row_start, row_stop), (col_start, col_stop) = self._window_slices(window)
+                xarr = xarr.isel(y=slice(row_start, row_stop), x=slice(col_start, col_stop))
+            elif bbox is not None:
+                xmin, ymin, xmax, ymax = bbox
+                y = slice(ymax, ymin) if xarr.y[0] > xarr.y[-1] else slice(ymin, ymax)
+                xarr = xarr.sel(x=slice(xmin, xmax), y=y)
             if with_nodata:
                 xarr = convert_nodata_to_nans(xarr)
             return xarr
 
-        raster_data = self.read(path)
         if fmt.lower() == 'rasterio':
-            return raster_data
+            return self.read(path)
 
         if fmt.lower() == 'array':
-            return raster_data.read()
+            with rasterio.open(path) as src:
+                window = self._get_window(src, window, bbox)
+                indexes = bands if bands is None or isinstance(bands, int) else listify(bands)
+                if out_shape is not None and not isinstance(indexes, int):
+                    n_bands = src.count if indexes is None else len(indexes)
+                    out_shape = (n_bands,) + tuple(out_shape)
+                return src.read(indexes=indexes, window=window, out_shape=out_shape, masked=with_nodata)
 
         raise NotImplementedError('format %s not recognized' % fmt)
 
+    @staticmethod
+    def _window_slices(window):
+        if isinstance(window, rasterio.windows.Window):
+            return window.toranges()
+        return window
+
+    def _get_window(self, src, window=None, bbox=None):
+        """Get the window of `src` to read from a window or a bbox (or None to read the whole raster)."""
+        if window is not None:
+            if isinstance(window, rasterio.windows.Window):
+                return window
+            return rasterio.windows.Window.from_slices(*window, height=src.height, width=src.width)
+
+        if bbox is not None:
+            full_window = rasterio.windows.Window(0, 0, src.width, src.height)
+            window = rasterio.windows.from_bounds(*bbox, transform=src.transform)
+            window = window.round_offsets(op='floor').round_lengths(op='ceil')
+            return window.intersection(full_window)
+
+        return None
+
     def read(self, path):
         "Read raster using rasterio"
         return rasterio.open(path)
@@ -1,5 +1,7 @@
 import json
 
+import pandas as pd
+
 from quest.static import DataType
 from quest_io_plugins.xyHdf5 import XYHdf5
 
@@ -13,14 +15,14 @@ class TsHdf5(XYHdf5):
         self.description = 'HDF5 IO for Timeseries datasets'
         self.iotype = 'timeseries'
 
-    def open(self, path, fmt=None):
-        dataframe = self.read(path)
+    def open(self, path, fmt=None, start=None, end=None, columns=None):
+        dataframe = self.read(path, start=start, end=end, columns=columns)
 
         if fmt is None or fmt.lower() == 'dataframe':
             return dataframe
 
         # convert index to datetime in case it is a PeriodIndex
-        dataframe.index = dataframe.index.to_datetime()
+        dataframe.index = pd.to_datetime(dataframe.index)
         jstr = json.loads(dataframe.to_json(date_format='iso'))
         d = dict()
         d['data'] = {k: sorted(v.items()) for k, v in jstr.items()}
@@ -36,9 +38,8 @@ class TsHdf5(XYHdf5):
 
     def visualize_options(self, path, fmt='json'):
         """visualation options for timeseries datasets"""
-        df = self.read(path)
-        start = df.index[0].strftime('%Y-%m-%d %H:%M:%S')
-        end = df.index[-1].strftime('%Y-%m-%d %H:%M:%S')
+        start, end = (None if t is None else pd.Timestamp(t).strftime('%Y-%m-%d %H:%M:%S')
+                      for t in self.get_index_bounds(path))
 
         schema = {
             "title": "Timeseries Vizualization Options",
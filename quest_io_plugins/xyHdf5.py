@@ -10,19 +10,53 @@ from quest.util import setattr_on_dataframe
 
 
 class XYHdf5(IoBase):
+    """HDF5 IO for XY datasets.
+
+    Dataframes are written in the PyTables `table` format (chunked and compressed, with an indexed index
+    column), so that a range of the index or a subset of the columns can be read without loading the whole
+    dataset. The bounds of the index are stored as attributes along with the metadata. Files written in the
+    `fixed` format (or dataframes that can't be stored as a table) are still supported, but are always read
+    in full.
+    """
     name = 'xy-hdf5'
+    key = 'dataframe'
+    complevel = 5
+    complib = 'zlib'
 
     def register(self):
         """Register plugin by setting description and io type."""
         self.description = 'Hdf5 for XY datasets '
         self.iotype = 'XYdata'
 
-    def read(self, path):
-        """Read metadata and dataframe from HDF5 store."""
-
-        with pd.HDFStore(path) as h5store:
-            dataframe = h5store.get('dataframe')
-            setattr_on_dataframe(dataframe, 'metadata', h5store.get_storer('dataframe').attrs.metadata)
+    def read(self, path, start=None, end=None, columns=None):
+        """Read metadata and dataframe from HDF5 store.
+
+        Args:
+            path (string): path of the HDF5 file.
+            start (optional): only read rows with an index greater than or equal to start.
+            end (optional): only read rows with an index less than or equal to end.
+            columns (list, optional): only read these columns.
+
+        Returns:
+            A pandas DataFrame with a `metadata` attribute.
+        """
+        with pd.HDFStore(path, mode='r') as h5store:
+            storer = h5store.get_storer(self.key)
+            if storer.is_table:
+                # the variables in the where clauses are looked up from this scope by HDFStore
+                where = []
+                if start is not None:
+                    where.append('index >= start')
+                if end is not None:
+                    where.append('index <= end')
+                dataframe = h5store.select(self.key, where=where or None, columns=columns)
+            else:
+                dataframe = h5store.get(self.key)
+                if start is not None or end is not None:
+                    dataframe = dataframe.loc[start:end]
+                if columns is not None:
+                    dataframe = dataframe[columns]
+            setattr_on_dataframe(dataframe, 'metadata', storer.attrs.metadata)
         return dataframe
 
     def write(self, file_path, dataframe, metadata):
@@ -30,14 +64,49 @@ class XYHdf5(IoBase):
         base, fname = os.path.split(file_path)
 
         os.makedirs(base, exist_ok=True)
-        with pd.HDFStore(file_path) as h5store:
-            h5store.put('dataframe', dataframe)
-            h5store.get_storer('dataframe').attrs.metadata = metadata
+        with pd.HDFStore(file_path, mode='w') as h5store:
+            try:
+                h5store.put(self.key, dataframe, format='table', complevel=self.complevel, complib=self.complib)
+            except (TypeError, ValueError) as e:
+                logger.info('dataframe cannot be stored as a table, using the fixed format instead: %s' % e)
+                if self.key in h5store:
+                    h5store.remove(self.key)
+                h5store.put(self.key, dataframe)
+            attrs = h5store.get_storer(self.key).attrs
+            attrs.metadata = metadata
+            attrs.index_bounds = self._get_index_bounds(dataframe)
 
         logger.info('file written to: %s' % file_path)
 
-    def open(self, path, fmt=None):
-        dataframe = self.read(path)
+    @staticmethod
+    def _get_index_bounds(dataframe):
+        if len(dataframe.index) == 0:
+            return None, None
+        try:
+            return dataframe.index.min(), dataframe.index.max()
+        except TypeError:
+            return dataframe.index[0], dataframe.index[-1]
+
+    def get_index_bounds(self, path):
+        """Get the first and last values of the index of a dataset without reading the data.
+
+        Args:
+            path (string): path of the HDF5 file.
+
+        Returns:
+            A tuple (start, end) of the smallest and largest index values, (None, None) if the dataset is empty.
+        """
+        with pd.HDFStore(path, mode='r') as h5store:
+            storer = h5store.get_storer(self.key)
+            bounds = getattr(storer.attrs, 'index_bounds', None)
+            if bounds is not None:
+                return tuple(bounds)
+
+        # files written before the bounds were stored
+        return self._get_index_bounds(self.read(path, columns=[]))
+
+    def open(self, path, fmt=None, start=None, end=None, columns=None):
+        dataframe = self.read(path, start=start, end=end, columns=columns)
 
         if fmt == None or fmt.lower() == 'dataframe':
             return dataframe
@@ -59,21 +128,15 @@ class XYHdf5(IoBase):
 
     def visualize(self, path, title, engine='mpl', start=None, end=None, **kwargs):
         """Visualize timeseries dataset."""
-        if engine is not 'mpl':
+        if engine != 'mpl':
             raise NotImplementedError
 
-        df = self.read(path)
+        df = self.read(path, start=start, end=end)
         parameter = df.metadata['parameter']
 
-        if start is None:
-            start = df.index[0]
-
-        if end is None:
-            end = df.index[-1]
-
         plt.style.use('ggplot')
         fig = plt.figure()
-        ax = df[parameter][start:end].plot(legend=True, figsize=(8, 6))
+        ax = df[parameter].plot(legend=True, figsize=(8, 6))
         ax.set_title(title)
         ax.set_ylabel(df.metadata['unit'])
         base, ext = os.path.splitext(path)
@@ -85,9 +148,7 @@ class XYHdf5(IoBase):
 
     def visualize_options(self, path, fmt='json'):
         """visualation options for timeseries datasets"""
-        df = self.read(path)
-        start = df.index[0]
-        end = df.index[-1]
+        start, end = self.get_index_bounds(path)
 
         schema = {
             "title": "XYDataset Vizualization Options",
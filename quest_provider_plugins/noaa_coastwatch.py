@@ -11,6 +11,9 @@ from quest.plugins import ProviderBase, TimePeriodServiceBase, load_plugins
 
 
 class NoaaServiceBase(TimePeriodServiceBase):
+    # download stores the requested station, parameter and period on the service
+    thread_safe = False
+
     BASE_URL = 'http://coastwatch.pfeg.noaa.gov/erddap/tabledap/'
     BASE_PATH = 'noaa'
 
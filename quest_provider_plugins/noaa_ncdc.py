@@ -12,6 +12,8 @@ BASE_PATH = 'ncdc'
 
 
 class NcdcServiceBase(TimePeriodServiceBase):
+    # download stores the requested station, parameter and period on the service
+    thread_safe = False
 
     @property
     def metadata(self):
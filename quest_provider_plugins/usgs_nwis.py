@@ -1,7 +1,9 @@
+import math
 import os
 
 import param
 import pandas as pd
+import requests
 import concurrent.futures
 from ulmo.usgs import nwis
 from functools import partial
@@ -85,12 +87,25 @@ class NwisServiceBase(TimePeriodServiceBase):
         return metadata
 
     def search_catalog(self, **kwargs):
-        func = partial(_nwis_catalog_entries, service=self.service_name)
+        return self._search_sites()
+
+    def search_catalog_changes(self, since=None, etag=None, **kwargs):
+        if since is None:
+            return None
+
+        # `modifiedSince` only has a resolution of days, so round the time since the last refresh up
+        days = math.ceil((pd.Timestamp.now(tz='UTC') - pd.Timestamp(since)) / pd.Timedelta(days=1))
+        return {'catalog_entries': self._search_sites(modifiedSince='P{}D'.format(max(days, 1)))}
+
+    def _search_sites(self, **kwargs):
+        func = partial(_nwis_catalog_entries, service=self.service_name, **kwargs)
         with concurrent.futures.ProcessPoolExecutor() as executor:
             sites = executor.map(func, _states())
 
         sites = {k: v for d in sites for k, v in d.items()}
         df = pd.DataFrame.from_dict(sites, orient='index')
+        if df.empty:
+            return df
 
         for col in ['latitude', 'longitude']:
             df[col] = df['location'].apply(lambda x: float(x[col]))
@@ -103,9 +118,12 @@ class NwisServiceBase(TimePeriodServiceBase):
         return df
 
     def get_parameters(self, catalog_ids=None):
-        df = self.search_catalog()
+        if catalog_ids is None:
+            catalog_ids = self.search_catalog()
+        if isinstance(catalog_ids, pd.DataFrame):
+            catalog_ids = catalog_ids.index.tolist()
 
-        chunks = list(_chunks(df.index.tolist()))
+        chunks = list(_chunks(util.listify(catalog_ids)))
         func = partial(_site_info, service=self.service_name)
         with concurrent.futures.ProcessPoolExecutor(max_workers=None) as executor:
             data = executor.map(func, chunks)
@@ -204,8 +222,14 @@ def _chunks(l, n=100):
         yield l[i:i+n]
 
 
-def _nwis_catalog_entries(state, service):
-    return nwis.get_sites(state_code=state, service=service)
+def _nwis_catalog_entries(state, service, **kwargs):
+    try:
+        return nwis.get_sites(state_code=state, service=service, **kwargs)
+    except requests.HTTPError as e:
+        # the site service responds with a 404 when no sites match
+        if e.response is not None and e.response.status_code == 404:
+            return {}
+        raise
 
 
 def _nwis_parameters(site, service):
@@ -1,6 +1,9 @@
+import hashlib
 import logging
 import math
 import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from io import BytesIO
 from itertools import product
 
@@ -8,20 +11,20 @@ import cartopy.crs as ccrs
 import numpy as np
 import pandas as pd
 import param
-import requests
 import rasterio
 from imageio import imread
 from quest.static import ServiceType
-from requests.packages.urllib3.util.retry import Retry
-from requests.adapters import HTTPAdapter
 from shapely.geometry import box
 
 from quest.plugins import ProviderBase, SingleFileServiceBase
-from quest.util import listify
+from quest.util import listify, get_cache_dir, get_session
+from quest.util.raster import write_raster
 
 TILE_SIZE = 256
 MAX_ZOOM = 19
 WMTS_EPSG = 3857
+TILE_WORKERS = 8
+TILE_SESSION_NAME = 'wmts-tiles'
 
 log = logging.getLogger('quest')
 
@@ -241,10 +244,12 @@ class WMTSImageryService(SingleFileServiceBase):
         ymin_pixel, ymax_pixel = [index - y_pixel_offset for index in pixel_indices[1::2]]
         return xmin_pixel, ymin_pixel, xmax_pixel, ymax_pixel
 
-    @staticmethod
-    def _download_and_stitch_tiles(url, tile_indices, crop_bbox, zoom_level, max_tiles):
+    def _download_and_stitch_tiles(self, url, tile_indices, crop_bbox, zoom_level, max_tiles):
         """Download a set of WMTS tiles and stitch them into a single image.
 
+        Tiles are fetched concurrently over one pooled session and are kept in an on-disk tile cache so tiles that
+        have already been downloaded (i.e. by an overlapping request) are reused.
+
         Args:
             url (string, required):
                 url template for the WMTS service to get tiles from with `{X}` `{Y}`, and `{Z}` placeholders
@@ -280,38 +285,90 @@ class WMTSImageryService(SingleFileServiceBase):
         else:
             log.info("There are {} tiles to download.".format(total_number_of_tiles))
 
-        # calculate full image height and width (count is calculated on the first time in the loop)
+        # calculate full image height and width (count is calculated on the first tile)
         height = number_of_y_tiles * TILE_SIZE
         width = number_of_x_tiles * TILE_SIZE
         full_image = None
 
-        for x, y in product(x_range, y_range):
-            internet_status = requests.Session()
-            retries = Retry(total=10, backoff_factor=0.1, status_forcelist=[500, 502, 503, 504])
-            if 'https' in url:
-                internet_status.mount('https://', HTTPAdapter(max_retries=retries))
-            elif 'http' in url:
-                internet_status.mount('http://', HTTPAdapter(max_retries=retries))
-            output_feedback = internet_status.get(url.format(Z=zoom_level, X=x, Y=y), verify=True)
-            if output_feedback.status_code == 200:
-                image = imread(BytesIO(output_feedback.content))
-                image = np.moveaxis(image, -1, 0)  # move the bands from the last axis to the first.
+        session = get_session(TILE_SESSION_NAME, pool_size=TILE_WORKERS)
+        tile_cache_dir = self._get_tile_cache_dir(url)
+
+        def get_tile(indices):
+            x, y = indices
+            return x, y, self._get_tile(session, url, tile_cache_dir, x, y, zoom_level)
+
+        with ThreadPoolExecutor(max_workers=TILE_WORKERS) as executor:
+            for x, y, image in executor.map(get_tile, product(x_range, y_range)):
+                if image is None:
+                    continue
 
                 x_pixel_min, x_pixel_max = (x - xmin) * TILE_SIZE, (x - xmin + 1) * TILE_SIZE
                 y_pixel_min, y_pixel_max = (y - ymin) * TILE_SIZE, (y - ymin + 1) * TILE_SIZE
 
-                # initialize full image on first loop
+                # initialize full image on first tile
                 if full_image is None:
                     count, _, _ = image.shape
                     full_image = np.empty([count, height, width], dtype=np.uint8)
 
                 full_image[:, y_pixel_min:y_pixel_max, x_pixel_min:x_pixel_max] = image
 
+        if full_image is None:
+            raise ValueError('No tiles could be downloaded from {}'.format(url))
+
         if crop_bbox:
             xmin, ymin, xmax, ymax = crop_bbox
-            cropped_image = full_image[:, ymin:ymax, xmin:xmax]
+            full_image = full_image[:, ymin:ymax, xmin:xmax]
+
+        return full_image
+
+    @staticmethod
+    def _get_tile_cache_dir(url):
+        """Get the directory that tiles from the WMTS service with the `url` template are cached in.
+        """
+        url_hash = hashlib.sha1(url.encode()).hexdigest()[:16]
+        return os.path.join(get_cache_dir('wmts'), url_hash)
+
+    @staticmethod
+    def _get_tile(session, url, tile_cache_dir, x, y, zoom_level):
+        """Get a single tile as a band first array, from the tile cache if possible.
+
+        Args:
+            session (requests.Session, required):
+                session to download the tile with
+            url (string, required):
+                url template for the WMTS service to get tiles from with `{X}` `{Y}`, and `{Z}` placeholders
+            tile_cache_dir (string, required):
+                directory that tiles from `url` are cached in as z/x/y
+            x (int, required):
+                x index of the tile
+            y (int, required):
+                y index of the tile
+            zoom_level (int, required):
+                the zoom level of the WMTS tile indices
+
+        Returns:
+            A numpy array of the tile with the bands on the first axis, or None if the tile isn't available.
+        """
+        tile_path = os.path.join(tile_cache_dir, str(zoom_level), str(x), '{}.tile'.format(y))
+
+        if os.path.exists(tile_path):
+            with open(tile_path, 'rb') as f:
+                content = f.read()
+        else:
+            response = session.get(url.format(Z=zoom_level, X=x, Y=y), verify=True)
+            if response.status_code != 200:
+                return None
+            content = response.content
+
+            # write to a temporary file first so a partially written tile is never read from the cache
+            os.makedirs(os.path.dirname(tile_path), exist_ok=True)
+            tmp_path = '{}.{}.tmp'.format(tile_path, threading.get_ident())
+            with open(tmp_path, 'wb') as f:
+                f.write(content)
+            os.replace(tmp_path, tile_path)
 
-        return cropped_image
+        image = imread(BytesIO(content))
+        return np.moveaxis(image, -1, 0)  # move the bands from the last axis to the first.
 
     @staticmethod
     def _write_image_to_tif(array, bbox, file_path):
@@ -329,13 +386,9 @@ class WMTSImageryService(SingleFileServiceBase):
         bbox = ccrs.GOOGLE_MERCATOR.transform_points(ccrs.PlateCarree(), bbox[:, 0], bbox[:, 1]).reshape(6)
         bbox = bbox[0], bbox[1], bbox[3], bbox[4]
         count, height, width = array.shape
-        indexes = list(range(1, count + 1))
         transform = rasterio.transform.from_bounds(*bbox, width=width, height=height)
         crs = rasterio.crs.CRS.from_epsg(WMTS_EPSG)
-        with rasterio.open(file_path, 'w', driver='GTiff', height=height,
-                           width=width, count=count, dtype=array.dtype,
-                           crs=crs, transform=transform) as dst:
-            dst.write(array, indexes=indexes)
+        write_raster(file_path, array, {'crs': crs, 'transform': transform})
 
 
 class WMTSImageryProvider(ProviderBase):
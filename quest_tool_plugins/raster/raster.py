@@ -1,7 +1,7 @@
 import param
 
 from .rst_base import RstBase
-from quest.util import unit_list, unit_registry, setattr_on_dataframe
+from quest.util import unit_list, convert_units, get_target_units, setattr_on_dataframe
 
 
 class RstUnitConversion(RstBase):
@@ -19,18 +19,9 @@ class RstUnitConversion(RstBase):
         if 'file_path' in metadata:
             del metadata['file_path']
 
-        reg = unit_registry()
         from_units = metadata['unit']
-        if '/' in from_units and '/' not in self.to_units:
-            beg = from_units.find('/')
-            end = len(from_units)
-            default_time = from_units[beg:end]
-            to_units = self.to_units + default_time
-        else:
-            to_units = self.to_units
-        conversion = reg.convert(1, src=from_units, dst=to_units)
-        result = df.read()
-        result = result * conversion
+        to_units = get_target_units(from_units, self.to_units)
+        result = convert_units(df.read(), from_units, to_units)
         metadata.update({'unit': to_units})
         setattr_on_dataframe(df, 'metadata', metadata)
         df = result
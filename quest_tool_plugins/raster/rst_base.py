@@ -50,8 +50,7 @@ class RstBase(ToolBase):
             dataset_metadata=new_metadata,
         )
 
-        with rasterio.open(file_path, "w", **out_meta) as dest:
-            dest.write(out_image)
+        util.raster.write_raster(file_path, out_image, out_meta)
 
         return {'datasets': new_dset, 'catalog_entries': catalog_entry}
 
@@ -1,7 +1,14 @@
+import math
+
+import numpy as np
 import param
 import rasterio
+import rasterio.features
+import rasterio.io
 import rasterio.mask
 import rasterio.merge
+import rasterio.transform
+import rasterio.windows
 import geopandas as gpd
 from fiona.crs import from_epsg
 from shapely.geometry import box
@@ -25,6 +32,13 @@ class RstMerge(ToolBase):
                       bounds=(4, 4),
                       class_=float,
                       doc="""bounding box to clip the merged raster to in the form [xmin, ymin, xmax, ymax]""")
+    windowed = param.Boolean(default=False,
+                             doc="""merge block by block into a tiled GeoTIFF rather than building the whole
+                             mosaic in memory""")
+    block_size = param.Integer(default=512,
+                               bounds=(16, None),
+                               doc="""size in pixels of the square blocks used by the windowed merge
+                               (must be a multiple of 16)""")
 
     def _run_tool(self):
 
@@ -59,18 +73,6 @@ class RstMerge(ToolBase):
         profile = open_datasets[0].profile
         # hack to avoid nodata out of range of dtype error for NED datasets
         profile['nodata'] = -32768.0 if profile['nodata'] == -3.4028234663853e+38 else profile['nodata']
-        new_data, transform = rasterio.merge.merge(open_datasets, nodata=profile['nodata'])
-        for d in open_datasets:
-            d.close()
-        profile.pop('tiled', None)
-        profile.update(
-            height=new_data.shape[1],
-            width=new_data.shape[2],
-            transform=transform,
-            driver='GTiff'
-        )
-        with rasterio.open(file_path, 'w', **profile) as output:
-            output.write(new_data.astype(profile['dtype']))
 
         bbox = self.bbox
 
@@ -80,20 +82,113 @@ class RstMerge(ToolBase):
             geo = geo.to_crs(crs=profile['crs'])
             bbox = geo.geometry
 
-            with rasterio.open(file_path, 'r') as merged:
-                new_data, transform = rasterio.mask.mask(dataset=merged, shapes=bbox, all_touched=True, crop=True)
-
-            # profile.pop('tiled', None)
-            profile.update(
-                height=new_data.shape[1],
-                width=new_data.shape[2],
-                transform=transform,
-            )
-            with rasterio.open(file_path, 'w', **profile) as clipped:
-                clipped.write(new_data)
+        try:
+            if self.windowed:
+                self._merge_windowed(open_datasets, profile, file_path, bbox)
+            else:
+                self._merge_in_memory(open_datasets, profile, file_path, bbox)
+        finally:
+            for d in open_datasets:
+                d.close()
 
         with rasterio.open(file_path) as f:
             geometry = util.bbox2poly(f.bounds.left, f.bounds.bottom, f.bounds.right, f.bounds.top, as_shapely=True)
-        update_metadata(catalog_entry, quest_metadata={'geometry': geometry.to_wkt()})
+        update_metadata(catalog_entry, quest_metadata={'geometry': geometry.to_wkt()}, return_metadata=False)
 
         return {'datasets': new_dset, 'catalog_entries': catalog_entry}
+
+    def _merge_windowed(self, open_datasets, profile, file_path, clip_shapes=None):
+        """Merge the datasets block by block into a tiled GeoTIFF.
+
+        The output extent (the union of the datasets clipped to `clip_shapes`) is computed first, so only one
+        block of the output (`block_size` x `block_size` pixels) is held in memory at a time.
+        """
+        if self.block_size % 16 != 0:
+            raise ValueError('block_size must be a multiple of 16')
+
+        nodata = profile['nodata']
+        res_x, res_y = open_datasets[0].res
+
+        # the grid of the full mosaic (as computed by rasterio.merge.merge)
+        west = min(d.bounds.left for d in open_datasets)
+        south = min(d.bounds.bottom for d in open_datasets)
+        east = max(d.bounds.right for d in open_datasets)
+        north = max(d.bounds.top for d in open_datasets)
+        col_min, row_min = 0, 0
+        col_max = int(round((east - west) / res_x))
+        row_max = int(round((north - south) / res_y))
+
+        # snap the clipped extent outward to the grid of the full mosaic
+        if clip_shapes is not None:
+            xmin, ymin, xmax, ymax = clip_shapes.total_bounds
+            col_min = max(col_min, int(math.floor((xmin - west) / res_x)))
+            col_max = min(col_max, int(math.ceil((xmax - west) / res_x)))
+            row_min = max(row_min, int(math.floor((north - ymax) / res_y)))
+            row_max = min(row_max, int(math.ceil((north - ymin) / res_y)))
+            if col_max <= col_min or row_max <= row_min:
+                raise ValueError('bbox does not intersect the datasets')
+
+        transform = rasterio.transform.from_origin(west + col_min * res_x, north - row_min * res_y, res_x, res_y)
+        profile = util.raster.cog_profile(
+            profile,
+            height=row_max - row_min,
+            width=col_max - col_min,
+            transform=transform,
+            blockxsize=self.block_size,
+            blockysize=self.block_size,
+        )
+
+        tmp_path = file_path + '.tmp.tif'
+        with rasterio.open(tmp_path, 'w', **profile) as output:
+            for _, window in output.block_windows(1):
+                block = self._merge_block(open_datasets, window, transform, (res_x, res_y), nodata)
+
+                if clip_shapes is not None:
+                    outside = rasterio.features.geometry_mask(clip_shapes,
+                                                              out_shape=(window.height, window.width),
+                                                              transform=rasterio.windows.transform(window, transform),
+                                                              all_touched=True)
+                    block[:, outside] = nodata if nodata is not None else 0
+
+                output.write(block.astype(profile['dtype']), window=window)
+
+        util.raster.finish_cog(tmp_path, file_path)
+
+    @staticmethod
+    def _merge_block(open_datasets, window, transform, res, nodata):
+        """Merge the part of the datasets in `window` of the output grid.
+
+        `rasterio.merge.merge` computes the shape of its output from the block bounds, so rounding can make it a
+        pixel larger or smaller than the window. The block is cropped or padded (with nodata) to the window shape.
+        """
+        merged, _ = rasterio.merge.merge(open_datasets, bounds=rasterio.windows.bounds(window, transform), res=res,
+                                         nodata=nodata)
+        block = np.full((merged.shape[0], window.height, window.width),
+                        nodata if nodata is not None else 0, dtype=merged.dtype)
+        height, width = min(merged.shape[1], window.height), min(merged.shape[2], window.width)
+        block[:, :height, :width] = merged[:, :height, :width]
+        return block
+
+    @staticmethod
+    def _merge_in_memory(open_datasets, profile, file_path, clip_shapes=None):
+        """Merge the full mosaic in memory and then clip it to `clip_shapes`.
+        """
+        new_data, transform = rasterio.merge.merge(open_datasets, nodata=profile['nodata'])
+        new_data = new_data.astype(profile['dtype'])
+        profile.pop('tiled', None)
+        profile.update(
+            height=new_data.shape[1],
+            width=new_data.shape[2],
+            transform=transform,
+            driver='GTiff'
+        )
+
+        if clip_shapes is not None:
+            with rasterio.io.MemoryFile() as memfile:
+                with memfile.open(**profile) as merged:
+                    merged.write(new_data)
+                    new_data, transform = rasterio.mask.mask(dataset=merged, shapes=clip_shapes, all_touched=True,
+                                                             crop=True)
+            profile.update(transform=transform)
+
+        util.raster.write_raster(file_path, new_data, profile)
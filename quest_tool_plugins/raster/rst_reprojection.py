@@ -51,9 +51,10 @@ class RstReprojection(ToolBase):
         with rasterio.open(src_path) as src:
             # write out tif file
             subprocess.check_output(['gdalwarp', src_path, file_path, '-s_srs', src.crs.to_string(), '-t_srs', dst_crs])
+        util.raster.to_cog(file_path)
 
         with rasterio.open(file_path) as f:
             geometry = util.bbox2poly(f.bounds.left, f.bounds.bottom, f.bounds.right, f.bounds.top, as_shapely=True)
-        update_metadata(catalog_entry, quest_metadata={'geometry': geometry.to_wkt()})
+        update_metadata(catalog_entry, quest_metadata={'geometry': geometry.to_wkt()}, return_metadata=False)
 
         return {'datasets': new_dset, 'catalog_entries': catalog_entry}
@@ -1,6 +1,6 @@
 import param
 
-from quest.util import setattr_on_dataframe, unit_list, unit_registry
+from quest.util import setattr_on_dataframe, unit_list, convert_units, get_target_units
 
 from .ts_base import TsBase
 
@@ -55,17 +55,9 @@ class TsUnitConversion:  # (TsBase): TODO: Fix this to allow for multi-dimension
         if 'file_path' in metadata:
             del metadata['file_path']
 
-        reg = unit_registry()
         from_units = metadata['unit']
-        if '/' in from_units and '/' not in self.to_units:
-            beg = from_units.find('/')
-            end = len(from_units)
-            default_time = from_units[beg:end]
-            to_units = self.to_units + default_time
-        else:
-            to_units = self.to_units
-        conversion = reg.convert(1, src=from_units, dst=to_units)
-        df[df.columns[1]] = df[df.columns[1]] * conversion
+        to_units = get_target_units(from_units, self.to_units)
+        df[df.columns[1]] = convert_units(df[df.columns[1]], from_units, to_units)
         metadata.update({'unit': to_units})
         setattr_on_dataframe(df, 'metadata', metadata)
 
@@ -39,6 +39,7 @@ class WBTFillDepressions(ToolBase):
         )
 
         wbt.fill_depressions(elev_file, output=file_path)
+        util.raster.to_cog(file_path)
 
         quest_metadata = {
             'parameter': 'streams',
@@ -46,7 +47,7 @@ class WBTFillDepressions(ToolBase):
             'file_format': orig_metadata['file_format'],
         }
 
-        update_metadata(new_dset, quest_metadata=quest_metadata)
+        update_metadata(new_dset, quest_metadata=quest_metadata, return_metadata=False)
 
         return {'datasets': new_dset}
 
@@ -123,6 +124,7 @@ class WBTExtractStreamsWorkflow(ToolBase):
             threshold=self.stream_threshold,
             output=file_path,
         )
+        util.raster.to_cog(file_path)
 
         return {'datasets': new_dset}
 
@@ -231,6 +233,7 @@ class WBTWatershedDelineationWorkflow(ToolBase):
             pour_pts=point_shp,
             output=file_path,
         )
+        util.raster.to_cog(file_path)
 
         new_catalog_entries = raster_to_polygons(file_path)
 
@@ -241,6 +244,6 @@ class WBTWatershedDelineationWorkflow(ToolBase):
             'file_path': file_path,
         }
 
-        update_metadata(new_dset, quest_metadata=quest_metadata)
+        update_metadata(new_dset, quest_metadata=quest_metadata, return_metadata=False)
 
         return {'datasets': new_dset, 'catalog_entries': [new_catalog_entries, snapped_outlets, catalog_entry]}
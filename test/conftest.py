@@ -52,7 +52,7 @@ def get_or_generate_test_cache(update=False, skip=False):
             continue
         provider_plugin = provider_plugins[provider]
 
-        cache_file = os.path.join(quest.util.get_cache_dir(provider_plugin.name), service + '_catalog.p')
+        cache_file = provider_plugin.services[service].catalog_cache_file
         if update or not os.path.exists(cache_file):
             try:
                 print('Updating test cache for service: {0}'.format(name))
@@ -98,7 +98,8 @@ def reset_settings(api, get_base_dir):
     test_settings = {'BASE_DIR': get_base_dir,
                      'CACHE_DIR': os.path.join('.cache', 'test_cache'),
                      'PROJECTS_DIR': 'projects',
-                     'USER_SERVICES': []
+                     'USER_SERVICES': [],
+                     'CATALOG_CACHE_TTL': 0,
                      }
 
     api.update_settings(test_settings)
@@ -1,4 +1,9 @@
+import json
+import time
+
 import pytest
+import pandas as pd
+from shapely.geometry import Point
 
 from quest.static import GeomType
 from data import SERVICES_CATALOG_COUNT, CACHED_SERVICES
@@ -19,6 +24,88 @@ def catalog_entry(request):
     return request.param
 
 
+class FakeProvider(object):
+    def __init__(self, name, delay=0, error=None):
+        self.name = name
+        self.delay = delay
+        self.error = error
+
+    def search_catalog(self, service, update_cache=False, **kwargs):
+        time.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        uri = 'svc://{}:{}/01'.format(self.name, service)
+        return pd.DataFrame({'display_name': ['01']}, index=[uri])
+
+
+def test_search_catalog_partial_results(api, monkeypatch):
+    providers = {
+        'fast': FakeProvider('fast'),
+        'slow': FakeProvider('slow', delay=2),
+        'broken': FakeProvider('broken', error=ValueError('bad request')),
+    }
+    monkeypatch.setattr('quest.api.catalog.load_providers', lambda names: {names: providers[names]})
+    uris = ['svc://fast:a', 'svc://slow:a', 'svc://broken:a', 'svc://fast:b']
+
+    start = time.time()
+    catalog_entries, errors = api.search_catalog(uris, timeout=0.5, return_errors=True)
+    assert time.time() - start < 1.5
+    assert catalog_entries == ['svc://fast:a/01', 'svc://fast:b/01']
+    assert errors == {
+        'svc://slow:a': 'TimeoutError: no response after 0.5 seconds',
+        'svc://broken:a': 'ValueError: bad request',
+    }
+
+    with pytest.raises(ValueError):
+        api.search_catalog(['svc://fast:a', 'svc://broken:a'], raise_on_error=True)
+
+
+def test_search_catalog_pages(api, monkeypatch):
+    catalog_entries = pd.DataFrame({
+        'display_name': ['c', 'a', 'b', 'a'],
+        'elevation': [1.0, float('nan'), 3.0, 4.0],
+        'geometry': [Point(-90, 30), Point(-91, 31), None, Point(-92, 32)],
+    }, index=['svc://test:svc/0{}'.format(i) for i in range(4)])
+    provider = FakeProvider('test')
+    provider.search_catalog = lambda service, **kwargs: catalog_entries.copy()
+    monkeypatch.setattr('quest.api.catalog.load_providers', lambda names: {names: provider})
+
+    assert api.search_catalog('svc://test:svc', limit=2) == ['svc://test:svc/00', 'svc://test:svc/01']
+    assert api.search_catalog('svc://test:svc', limit=2, offset=1) == ['svc://test:svc/01', 'svc://test:svc/02']
+    assert api.search_catalog('svc://test:svc', cursor='svc://test:svc/01') == ['svc://test:svc/02',
+                                                                                'svc://test:svc/03']
+
+    page = api.search_catalog('svc://test:svc', sort_by='display_name', limit=3, as_dataframe=True)
+    assert page['display_name'].tolist() == ['a', 'a', 'b']
+    assert api.search_catalog('svc://test:svc', sort_by='display_name', cursor=page.index[-1]) == ['svc://test:svc/00']
+
+    features = json.loads(''.join(api.search_catalog('svc://test:svc', as_stream='geojson', limit=3)))
+    assert [f['id'] for f in features['features']] == ['svc://test:svc/00', 'svc://test:svc/01', 'svc://test:svc/02']
+    assert features['features'][0]['geometry'] == {'type': 'Point', 'coordinates': [-90.0, 30.0]}
+    assert features['features'][1]['properties'] == {'display_name': 'a', 'elevation': None}
+    assert features['features'][2]['geometry'] is None
+
+    lines = ''.join(api.search_catalog('svc://test:svc', as_stream='ndjson')).splitlines()
+    assert [json.loads(line)['id'] for line in lines] == catalog_entries.index.tolist()
+
+    # invalid stream formats are rejected before anything is searched
+    with pytest.raises(ValueError):
+        api.search_catalog('svc://test:svc', as_stream='csv')
+
+
+def test_search_catalog_description_filter(api, monkeypatch):
+    catalog_entries = pd.DataFrame({
+        'display_name': ['gage', 'lake'],
+        'description': ['lake level gage', None],
+    }, index=['svc://test:svc/00', 'svc://test:svc/01'])
+    provider = FakeProvider('test')
+    provider.search_catalog = lambda service, **kwargs: catalog_entries.copy()
+    monkeypatch.setattr('quest.api.catalog.load_providers', lambda names: {names: provider})
+
+    assert api.search_catalog('svc://test:svc', filters={'description': 'lake'}) == ['svc://test:svc/00']
+    assert api.search_catalog('svc://test:svc', filters={'display_name': 'lake'}) == ['svc://test:svc/01']
+
+
 @pytest.mark.slow
 def test_add_datasets(api, catalog_entry):
     b = api.add_datasets('col1', catalog_entry)
@@ -27,6 +114,21 @@ def test_add_datasets(api, catalog_entry):
     assert b == c
 
 
+def test_add_datasets_from_dataframe(api):
+    uris = ['svc://usgs-nwis:iv/0{}'.format(i) for i in range(1000, 1100)]
+    catalog_entries = pd.DataFrame({'name': uris, 'service': 'svc://usgs-nwis:iv'}, index=uris)
+    datasets = api.add_datasets('col1', catalog_entries)
+    assert len(datasets) == 100
+
+    metadata = api.get_datasets(as_dataframe=True).loc[datasets]
+    assert set(metadata['catalog_entry']) == set(uris)
+    assert (metadata['status'] == 'not staged').all()
+    assert (metadata['collection'] == 'col1').all()
+
+    with pytest.raises(ValueError):
+        api.add_datasets('not_a_collection', catalog_entries)
+
+
 def test_search_catalog_with_no_uris(api):
     catalog_entries = api.search_catalog()
     assert catalog_entries == []
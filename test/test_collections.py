@@ -43,3 +43,19 @@ def test_update_collection(api):
     c = api.update_metadata('test1', metadata=metadata)
     assert c['test1']['metadata']['display_name'] == 'New Name'
     assert c['test1']['metadata']['new_field'] == 'test'
+
+
+def test_update_many_collections(api):
+    api.new_collection('test1')
+    api.new_collection('test2')
+    quest_metadata = {'description': 'shared'}
+
+    uris = api.update_metadata(['test1', 'test2'], display_name=['one', 'two'],
+                               quest_metadata=quest_metadata, return_metadata=False)
+    assert uris == ['test1', 'test2']
+    assert quest_metadata == {'description': 'shared'}
+
+    c = api.get_metadata(['test1', 'test2'])
+    assert c['test1']['display_name'] == 'one'
+    assert c['test2']['display_name'] == 'two'
+    assert c['test2']['description'] == 'shared'
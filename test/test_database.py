@@ -0,0 +1,50 @@
+import os
+import sqlite3
+import tempfile
+
+from pony.orm import db_session
+
+from quest.database import init_db, migrations
+
+
+def _indexes(db):
+    with db_session:
+        return {r[0] for r in db.execute("SELECT name FROM sqlite_master WHERE type = 'index'")}
+
+
+def test_new_database_is_stamped():
+    folder_obj = tempfile.TemporaryDirectory()
+    db = init_db(os.path.join(folder_obj.name, 'metadata.db'))
+    try:
+        with db_session:
+            assert db.execute('PRAGMA user_version').fetchone()[0] == migrations.SCHEMA_VERSION
+            assert db.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+        assert 'idx_dataset__status' in _indexes(db)
+    finally:
+        db.disconnect()
+
+
+def test_migrate_unversioned_database():
+    folder_obj = tempfile.TemporaryDirectory()
+    dbpath = os.path.join(folder_obj.name, 'metadata.db')
+
+    # create the tables and then drop the indexes to get the original (version 0) schema
+    init_db(dbpath).disconnect()
+    connection = sqlite3.connect(dbpath)
+    for column in ['status', 'catalog_entry', 'datatype', 'source']:
+        connection.execute('DROP INDEX "idx_dataset__{}"'.format(column))
+    connection.execute('PRAGMA user_version = 0')
+    connection.commit()
+    connection.close()
+
+    assert migrations.migrate(dbpath) == migrations.BASE_SCHEMA_VERSION
+    connection = sqlite3.connect(dbpath)
+    assert migrations.get_schema_version(connection) == migrations.SCHEMA_VERSION
+    connection.close()
+
+    db = init_db(dbpath)
+    try:
+        assert {'idx_dataset__status', 'idx_dataset__catalog_entry', 'idx_dataset__datatype',
+                'idx_dataset__source', 'idx_dataset__collection'} <= _indexes(db)
+    finally:
+        db.disconnect()
@@ -76,6 +76,20 @@ def test_get_datasets_with_query(api):
     assert len(datasets) == expected
 
 
+def test_get_datasets_with_filters(api):
+    uris = ['svc://usgs-nwis:iv/0{}'.format(i) for i in range(1000, 1015)]
+    catalog_entries = DataFrame({'name': uris, 'service': 'svc://usgs-nwis:iv'}, index=uris)
+    api.new_collection('col2')
+    col1 = api.add_datasets('col1', catalog_entries.iloc[:10])
+    col2 = api.add_datasets('col2', catalog_entries.iloc[10:])
+
+    assert sorted(api.get_datasets(filters={'collection': 'col2'})) == sorted(col2)
+    assert sorted(api.get_datasets(filters={'collection': 'col1', 'status': DatasetStatus.NOT_STAGED})) == sorted(col1)
+    assert api.get_datasets(filters={'catalog_entry': uris[12]}) == [col2[2]]
+    assert api.get_datasets(filters={'collection': 'not_found'}) == []
+    assert api.get_datasets(filters={'collection': 'col2', 'status': DatasetStatus.DOWNLOADED}) == []
+
+
 def test_new_dataset(api):
     new_dataset = api.new_dataset(CATALOG_ENTRY, 'col1')
     datasets = api.get_datasets()
@@ -0,0 +1,21 @@
+import ast
+import os
+import subprocess
+import sys
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+
+# modules that are slow to import and should only be imported when they are needed
+DEFERRED_MODULES = ['distributed', 'dask', 'tornado', 'geopandas', 'pint', 'ulmo', 'pyarrow', 'rasterio',
+                    'pbr.packaging', 'quest.util.catalog_cache', 'quest.util.text_index']
+
+
+def _import_quest():
+    return subprocess.run([sys.executable, '-c', 'import sys, quest; print(sorted(sys.modules))'],
+                          cwd=os.path.dirname(base_path), stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                          universal_newlines=True, check=True)
+
+
+def test_heavy_imports_are_deferred():
+    modules = set(ast.literal_eval(_import_quest().stdout))
+    assert not modules.intersection(DEFERRED_MODULES)
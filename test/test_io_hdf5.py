@@ -0,0 +1,27 @@
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from quest.plugins import load_plugins
+
+
+def test_timeseries_range_read():
+    io = load_plugins('io', 'timeseries-hdf5')['timeseries-hdf5']
+    index = pd.date_range('2000-01-01', periods=1000, freq='15min')
+    df = pd.DataFrame({'streamflow': np.arange(1000.0), 'qualifiers': 'A'}, index=index)
+    metadata = {'parameter': 'streamflow', 'unit': 'ft**3/s'}
+
+    folder_obj = tempfile.TemporaryDirectory()
+    path = os.path.join(folder_obj.name, 'ts.h5')
+    io.write(path, df, metadata)
+
+    assert io.get_index_bounds(path) == (index[0], index[-1])
+
+    actual = io.open(path, start='2000-01-02', end='2000-01-02 01:00', columns=['streamflow'])
+    assert actual.metadata == metadata
+    assert actual.columns.tolist() == ['streamflow']
+    assert actual.index.tolist() == index[96:101].tolist()
+
+    assert io.visualize_options(path)['properties']['end']['default'] == '2000-01-11 09:45:00'
@@ -0,0 +1,86 @@
+import os
+import tempfile
+
+import numpy as np
+import pytest
+import rasterio.transform
+import rasterio.windows
+
+import quest
+from quest.plugins import load_plugins
+
+NODATA = -9999.0
+
+
+@pytest.fixture(scope='module')
+def raster_path():
+    band = np.arange(48 * 64, dtype='float32').reshape(48, 64)
+    data = np.stack([band, band * 2])
+    data[:, 0, 0] = NODATA
+    profile = {
+        'crs': 'EPSG:32615',
+        'transform': rasterio.transform.from_origin(1000.0, 2000.0, 10.0, 10.0),
+        'nodata': NODATA,
+    }
+
+    folder_obj = tempfile.TemporaryDirectory()
+    path = os.path.join(folder_obj.name, 'raster.tif')
+    quest.util.raster.write_raster(path, data, profile)
+    yield path
+    folder_obj.cleanup()
+
+
+@pytest.fixture
+def io():
+    return load_plugins('io', 'raster-gdal')['raster-gdal']
+
+
+def _expected(band=1):
+    data = np.arange(48 * 64, dtype='float32').reshape(48, 64) * band
+    data[0, 0] = NODATA
+    return data
+
+
+def test_open_array(io, raster_path):
+    data = io.open(raster_path, fmt='array')
+    assert data.shape == (2, 48, 64)
+    np.testing.assert_array_equal(data[1], _expected(2))
+
+    # windows can be given as ranges or as a rasterio Window
+    data = io.open(raster_path, fmt='array', window=((10, 20), (5, 15)))
+    np.testing.assert_array_equal(data[0], _expected()[10:20, 5:15])
+    data = io.open(raster_path, fmt='array', window=rasterio.windows.Window(5, 10, 10, 10))
+    np.testing.assert_array_equal(data[0], _expected()[10:20, 5:15])
+
+    # bboxes are snapped outward to whole pixels and clipped to the raster
+    data = io.open(raster_path, fmt='array', bbox=(1100.0, 1800.0, 1200.0, 1900.0), bands=2)
+    np.testing.assert_array_equal(data, _expected(2)[10:20, 10:20])
+    data = io.open(raster_path, fmt='array', bbox=(1595.0, 1400.0, 1700.0, 1525.0), bands=[1])
+    np.testing.assert_array_equal(data, _expected()[None, 47:, 59:])
+
+    assert io.open(raster_path, fmt='array', out_shape=(24, 32)).shape == (2, 24, 32)
+    assert io.open(raster_path, fmt='array', bands=1, out_shape=(24, 32)).shape == (24, 32)
+
+
+def test_open_array_with_nodata(io, raster_path):
+    data = io.open(raster_path, fmt='array', with_nodata=True, window=((0, 2), (0, 2)))
+    assert isinstance(data, np.ma.MaskedArray)
+    assert data.mask[:, 0, 0].all()
+    assert not data.mask[:, 1, 1].any()
+
+
+def test_open_xarray(io, raster_path):
+    xarr = io.open(raster_path, fmt='xarray', window=((10, 20), (5, 15)))
+    assert xarr.shape == (2, 10, 10)
+    np.testing.assert_array_equal(xarr.values[0], _expected()[10:20, 5:15])
+
+    xarr = io.open(raster_path, fmt='xarray', bbox=(1100.0, 1800.0, 1200.0, 1900.0), bands=2)
+    np.testing.assert_array_equal(xarr.values, _expected(2)[10:20, 10:20])
+
+    xarr = io.open(raster_path, fmt='xarray', isel_band=1, with_nodata=True)
+    assert xarr.shape == (48, 64)
+    assert np.isnan(xarr.values[0, 0])
+    np.testing.assert_array_equal(xarr.values.ravel()[1:], _expected(2).ravel()[1:])
+
+    with pytest.raises(ValueError):
+        io.open(raster_path, fmt='xarray', out_shape=(24, 32))
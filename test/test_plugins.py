@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from quest.plugins import get_plugin_manifest, load_plugins
+from quest.static import PluginType
+
+base_path = os.path.dirname(os.path.abspath(__file__))
+
+
+@pytest.mark.parametrize('namespace', [PluginType.PROVIDER, PluginType.IO, PluginType.TOOL])
+def test_manifest_matches_plugins(namespace):
+    manifest = get_plugin_manifest(namespace)
+    assert manifest
+
+    # only plugins whose dependencies are installed can be checked
+    for name, plugin in load_plugins(namespace).items():
+        assert plugin.__class__.__name__ == manifest[name]['class']
+        if namespace == PluginType.PROVIDER:
+            assert plugin.metadata == manifest[name]['metadata']
+
+
+def test_load_plugins_imports_only_requested():
+    script = '\n'.join([
+        'import sys',
+        'from quest.plugins import list_plugins, load_plugins',
+        'assert "usgs-nwis" in list_plugins("provider")',
+        'assert list(load_plugins("provider", "usgs-nwis")) == ["usgs-nwis"]',
+        'print(sorted(m for m in sys.modules if m.startswith("quest_provider_plugins.")))',
+    ])
+    output = subprocess.check_output([sys.executable, '-c', script], cwd=os.path.dirname(base_path))
+    assert output.decode().strip() == "['quest_provider_plugins.usgs_nwis']"
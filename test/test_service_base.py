@@ -0,0 +1,239 @@
+import pandas as pd
+import pytest
+
+import quest
+from quest.plugins import ProviderBase, ServiceBase
+
+
+class RefreshService(ServiceBase):
+    service_name = 'refresh'
+    _parameter_map = {'00060': 'streamflow'}
+
+    def __init__(self, *args, **kwargs):
+        super(RefreshService, self).__init__(*args, **kwargs)
+        self.calls = []
+        self.changes = None
+
+    def search_catalog(self, **kwargs):
+        self.calls.append('search_catalog')
+        return pd.DataFrame({
+            'display_name': ['a', 'b', 'c'],
+            'latitude': [30.0, 31.0, 32.0],
+            'longitude': [-90.0, -91.0, -92.0],
+            'state': ['MS', 'LA', 'TX'],
+        }, index=['01', '02', '03'])
+
+    def search_catalog_changes(self, since=None, etag=None, **kwargs):
+        self.calls.append(('search_catalog_changes', since, etag))
+        return self.changes
+
+
+class RefreshProvider(ProviderBase):
+    service_list = [RefreshService]
+    name = 'test-refresh'
+
+
+@pytest.fixture
+def service(monkeypatch, tmpdir):
+    monkeypatch.setattr(quest.util, 'get_cache_dir', lambda *args: str(tmpdir))
+    quest.util.catalog_cache.loaded_catalogs.invalidate()
+    service = RefreshProvider(update_frequency=None).services['refresh']
+    yield service
+    quest.util.catalog_cache.loaded_catalogs.invalidate()
+
+
+def test_incremental_refresh(service):
+    catalog_entries = service.search_catalog_wrapper()
+    assert service.calls == ['search_catalog']
+    assert len(catalog_entries) == 3
+    state = service._read_catalog_state()
+    assert state['watermark'] == state['updated']
+
+    changed = pd.DataFrame({'display_name': ['B', 'd'], 'latitude': [31.5, 33.0], 'longitude': [-91.5, -93.0],
+                            'state': ['LA', 'AL']}, index=['02', '04'])
+    service.changes = {'catalog_entries': changed, 'deleted': ['03'], 'etag': 'abc'}
+    catalog_entries = service.search_catalog_wrapper(update_cache=True)
+    assert service.calls[1] == ('search_catalog_changes', state['watermark'], None)
+    assert sorted(catalog_entries['display_name']) == ['B', 'a', 'd']
+    assert catalog_entries.loc['svc://test-refresh:refresh/04', 'metadata'] == {'state': 'AL'}
+    assert catalog_entries.loc['svc://test-refresh:refresh/04', 'parameters'] == 'streamflow'
+
+    # the patched catalog is what is cached
+    quest.util.catalog_cache.loaded_catalogs.invalidate()
+    assert sorted(service.search_catalog_wrapper()['display_name']) == ['B', 'a', 'd']
+    assert service._read_catalog_state()['etag'] == 'abc'
+
+    # a full refresh is run if the changes can't be determined
+    service.changes = None
+    service.search_catalog_wrapper(update_cache=True)
+    assert service.calls[-1] == 'search_catalog'
+    assert service._read_catalog_state()['etag'] is None
+
+
+def test_catalog_ttl(service, monkeypatch):
+    # cached catalogs only expire if a time to live is configured
+    assert RefreshProvider().update_frequency is None
+
+    service.search_catalog_wrapper()
+    assert not service.catalog_cache_expired
+
+    monkeypatch.setattr(RefreshService, 'catalog_ttl', '1h')
+    assert not service.catalog_cache_expired
+
+    state = service._read_catalog_state()
+    state['updated'] = (pd.Timestamp.now(tz='UTC') - pd.Timedelta(hours=2)).isoformat()
+    service._write_catalog_state(state)
+    assert service.catalog_cache_expired
+
+    service.changes = {'catalog_entries': None}
+    service.search_catalog_wrapper()
+    assert service.calls[-1][0] == 'search_catalog_changes'
+    assert not service.catalog_cache_expired
+
+
+def test_normalize_catalog_entries(service):
+    catalog_entries = pd.DataFrame({
+        'bbox': [(-91, 30, -90, 31), ['-92', '31', '-91', '32']],
+        'state': ['MS', None],
+        'elevation': [10.5, float('nan')],
+        'huc': [['0801', '0802'], pd.NaT],
+    }, index=['01', '02'])
+    catalog_entries = service._normalize_catalog_entries(catalog_entries)
+
+    assert catalog_entries.loc['01', 'geometry'].bounds == (-91, 30, -90, 31)
+    assert catalog_entries.loc['02', 'geometry'].bounds == (-92, 31, -91, 32)
+    assert catalog_entries.loc['01', 'metadata'] == {'state': 'MS', 'elevation': 10.5, 'huc': ['0801', '0802']}
+    assert catalog_entries.loc['02', 'metadata'] == {'state': None, 'elevation': None, 'huc': None}
+    assert catalog_entries['display_name'].tolist() == ['01', '02']
+    assert 'bbox' not in catalog_entries.columns
+
+
+def test_tag_index(service):
+    tags = service.get_tags()
+    assert tags == {'state': ['MS', 'LA', 'TX']}
+
+    catalog_entries = service.search_catalog_wrapper(state='LA')
+    assert catalog_entries.index.tolist() == ['svc://test-refresh:refresh/02']
+
+    catalog_entries = service.search_catalog_wrapper(state='TX', bbox=[-93, 31, -91, 33])
+    assert catalog_entries.index.tolist() == ['svc://test-refresh:refresh/03']
+    assert service.search_catalog_wrapper(state='TX', bbox=[-91, 29, -89, 31]).empty
+
+
+@pytest.mark.skipif(not quest.util.catalog_cache.has_columnar_support(), reason='pyarrow is not installed')
+@pytest.mark.usefixtures('reset_projects_dir', 'set_active_project')
+def test_datetime_tag_filter(api, service, monkeypatch):
+    catalog_entries = pd.DataFrame({
+        'display_name': ['a', 'b', 'c'],
+        'begin': pd.to_datetime(['2000-01-01', '2000-01-02', '2000-01-03']),
+    }, index=['01', '02', '03'])
+    monkeypatch.setattr(service, 'search_catalog', lambda **kwargs: catalog_entries.copy())
+    monkeypatch.setattr('quest.api.catalog.load_providers', lambda names: {names: service.provider})
+    assert service.cache_format == 'parquet'
+    service.search_catalog_wrapper()
+    assert service.get_tags()['begin'] == ['2000-01-01T00:00:00', '2000-01-02T00:00:00', '2000-01-03T00:00:00']
+
+    # filters are applied to the catalog as it is read back from the cache
+    uri = 'svc://test-refresh:refresh'
+    quest.util.catalog_cache.loaded_catalogs.invalidate()
+    assert api.search_catalog(uri, filters={'begin': pd.Timestamp('2000-01-02')}) == [uri + '/02']
+    indexed = api.search_catalog(uri, filters={'begin': '2000-01-02T00:00:00'})
+
+    monkeypatch.setattr(service, '_get_tag_index', lambda: None)
+    assert api.search_catalog(uri, filters={'begin': pd.Timestamp('2000-01-02')}) == [uri + '/02']
+    assert api.search_catalog(uri, filters={'begin': '2000-01-02T00:00:00'}) == indexed
+
+
+@pytest.mark.skipif(not quest.util.text_index.has_text_index_support(), reason='FTS5 trigram is not available')
+def test_text_index(service):
+    service.search_catalog_wrapper()
+
+    catalog_entries = service.search_catalog_wrapper(search_terms=['stream'])
+    assert sorted(catalog_entries['search_rank']) == [1, 2, 3]
+    assert service.search_catalog_wrapper(search_terms=['Mead']).empty
+
+    # terms that the index can't answer are left to `search_catalog`
+    catalog_entries = service.search_catalog_wrapper(search_terms=['MS'])
+    assert 'search_rank' not in catalog_entries.columns
+    assert len(catalog_entries) == 3
+
+    service.changes = {'catalog_entries': pd.DataFrame({'display_name': ['Lake Mead'], 'latitude': [36.0],
+                                                        'longitude': [-114.0], 'state': ['NV']}, index=['04'])}
+    service.search_catalog_wrapper(update_cache=True)
+    catalog_entries = service.search_catalog_wrapper(display_name='Mead')
+    assert catalog_entries.index.tolist() == ['svc://test-refresh:refresh/04']
+    assert service.search_catalog_wrapper(description='Mead').empty
+
+
+@pytest.mark.usefixtures('reset_projects_dir', 'set_active_project')
+def test_search_terms_match_unindexed(api, service, monkeypatch):
+    monkeypatch.setattr('quest.api.catalog.load_providers', lambda names: {names: service.provider})
+    service.search_catalog_wrapper()
+
+    # uris, metadata keys and regexes aren't in the full-text index
+    search_terms = [['test-refresh'], ['refresh/02'], ['state'], ['MS', 'TX'], ['stream'], ['Lou.*']]
+    indexed = [api.search_catalog('svc://test-refresh:refresh', filters={'search_terms': terms})
+               for terms in search_terms]
+    monkeypatch.setattr(service, '_get_text_index', lambda: None)
+    unindexed = [api.search_catalog('svc://test-refresh:refresh', filters={'search_terms': terms})
+                 for terms in search_terms]
+
+    assert indexed == unindexed
+    assert len(indexed[0]) == 3
+    assert indexed[1] == ['svc://test-refresh:refresh/02']
+
+    monkeypatch.undo()
+    monkeypatch.setattr('quest.api.catalog.load_providers', lambda names: {names: service.provider})
+    catalog_entries = api.search_catalog('svc://test-refresh:refresh', filters={'search_terms': ['refresh/02']},
+                                         as_dataframe=True)
+    assert catalog_entries['search_rank'].tolist() == [1]
+
+
+class FakeResponse(object):
+    def __init__(self, chunks):
+        self.chunks = chunks
+        self.chunk_sizes = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=None):
+        self.chunk_sizes.append(chunk_size)
+        return iter(self.chunks)
+
+
+class FakeSession(object):
+    def __init__(self, chunks):
+        self.response = FakeResponse(chunks)
+        self.urls = []
+
+    def get(self, url, **kwargs):
+        self.urls.append((url, kwargs))
+        return self.response
+
+
+def test_download_if_new(monkeypatch, tmpdir):
+    from quest.plugins.base import service_base
+
+    provider = RefreshProvider(update_frequency=None)
+    session = FakeSession([b'abc', b'def'])
+    monkeypatch.setattr(RefreshProvider, 'session', session)
+    service = service_base.SingleFileServiceBase(provider)
+
+    file_path = str(tmpdir.join('data.tif'))
+    service._download_if_new('https://example.com/data.tif', file_path)
+    with open(file_path, 'rb') as f:
+        assert f.read() == b'abcdef'
+    assert session.urls == [('https://example.com/data.tif', {'stream': True})]
+    assert session.response.chunk_sizes == [service_base.DOWNLOAD_CHUNK_SIZE]
+    assert not tmpdir.join('data.tif.part').exists()
+
+    # existing files aren't downloaded again
+    service._download_if_new('https://example.com/data.tif', file_path)
+    assert len(session.urls) == 1
@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+import rasterio
+import rasterio.merge
+import rasterio.transform
+import rasterio.windows
+
+from quest.plugins import load_plugins
+
+
+def _write_tile(path, data, west, north, res=1.0, nodata=-9999.0):
+    profile = {
+        'driver': 'GTiff',
+        'height': data.shape[0],
+        'width': data.shape[1],
+        'count': 1,
+        'dtype': 'float32',
+        'crs': 'EPSG:32615',
+        'transform': rasterio.transform.from_origin(west, north, res, res),
+        'nodata': nodata,
+    }
+    with rasterio.open(path, 'w', **profile) as f:
+        f.write(data.astype('float32'), 1)
+    return path
+
+
+@pytest.fixture
+def tiles(tmpdir):
+    # two overlapping tiles with a combined extent that isn't a multiple of the block size
+    left = np.arange(40 * 30, dtype='float32').reshape(40, 30)
+    right = -np.arange(40 * 30, dtype='float32').reshape(40, 30)
+    paths = [
+        _write_tile(str(tmpdir.join('left.tif')), left, 500000.0, 4000040.0),
+        _write_tile(str(tmpdir.join('right.tif')), right, 500020.0, 4000030.0),
+    ]
+    open_datasets = [rasterio.open(path) for path in paths]
+    yield open_datasets
+    for d in open_datasets:
+        d.close()
+
+
+@pytest.fixture
+def rst_merge():
+    return load_plugins('tool', 'raster-merge')['raster-merge']
+
+
+def test_rst_merge_windowed_matches_in_memory(rst_merge, tiles, tmpdir, monkeypatch):
+    assert not rst_merge.windowed
+
+    in_memory_path = str(tmpdir.join('in_memory.tif'))
+    rst_merge._merge_in_memory(tiles, dict(tiles[0].profile), in_memory_path)
+
+    windowed_path = str(tmpdir.join('windowed.tif'))
+    monkeypatch.setattr(rst_merge, 'block_size', 16)
+    rst_merge._merge_windowed(tiles, dict(tiles[0].profile), windowed_path)
+
+    with rasterio.open(in_memory_path) as expected, rasterio.open(windowed_path) as actual:
+        assert actual.shape == expected.shape == (50, 50)
+        assert actual.transform == expected.transform
+        assert actual.block_shapes == [(16, 16)]
+        np.testing.assert_array_equal(actual.read(1), expected.read(1))
+
+
+@pytest.mark.parametrize('pad', [-1, 1])
+def test_rst_merge_block_shape(rst_merge, tiles, monkeypatch, pad):
+    transform = rasterio.transform.from_origin(500000.0, 4000040.0, 1.0, 1.0)
+    window = rasterio.windows.Window(0, 0, 16, 16)
+    merge = rasterio.merge.merge
+
+    # rounding in `rasterio.merge.merge` can return a block a pixel smaller or larger than the window
+    def fake_merge(*args, **kwargs):
+        block, block_transform = merge(*args, **kwargs)
+        if pad < 0:
+            return block[:, :pad, :pad], block_transform
+        return np.pad(block, ((0, 0), (0, pad), (0, pad)), mode='edge'), block_transform
+
+    monkeypatch.setattr(rasterio.merge, 'merge', fake_merge)
+    block = rst_merge._merge_block(tiles, window, transform, (1.0, 1.0), -9999.0)
+
+    assert block.shape == (1, 16, 16)
+    expected = tiles[0].read(1)[:16, :16]
+    if pad < 0:
+        expected[15, :] = expected[:, 15] = -9999.0
+    np.testing.assert_array_equal(block[0], expected)
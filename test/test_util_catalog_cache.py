@@ -0,0 +1,102 @@
+import datetime
+import os
+import tempfile
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+import pytest
+from shapely.geometry import Point, box
+
+from quest.util import catalog_cache
+
+requires_pyarrow = pytest.mark.skipif(not catalog_cache.has_columnar_support(), reason='pyarrow is not installed')
+
+
+@pytest.fixture
+def cache_file():
+    folder_obj = tempfile.TemporaryDirectory()
+    catalog_entries = pd.DataFrame({
+        'display_name': ['a', 'b', 'c'],
+        'parameters': ['streamflow', 'gage_height', 'streamflow,gage_height'],
+        'metadata': [{'state': 'MS'}, {'state': 'TX', 'huc': {'region': '12'}}, None],
+        'geometry': [Point(-90, 32), box(-100, 30, -99, 31), None],
+    }, index=['01', '02', '03'])
+    path = os.path.join(folder_obj.name, 'svc_catalog.parquet')
+    catalog_cache.write_catalog_cache(path, catalog_entries)
+    yield path
+    folder_obj.cleanup()
+
+
+@requires_pyarrow
+def test_round_trip(cache_file):
+    catalog_entries = catalog_cache.read_catalog_cache(cache_file).sort_index()
+    assert catalog_entries.index.tolist() == ['01', '02', '03']
+    assert catalog_entries.loc['02', 'metadata'] == {'state': 'TX', 'huc': {'region': '12'}}
+    assert catalog_entries.loc['01', 'geometry'].equals(Point(-90, 32))
+    assert catalog_entries.loc['03', 'geometry'] is None
+
+
+@requires_pyarrow
+def test_round_trip_types():
+    metadata = [
+        {'begin': pd.Timestamp('2020-01-01'), 'date': datetime.date(2020, 1, 2), 'count': np.int64(3),
+         'elevation': np.float32(1.5), 'flag': np.bool_(True), 'codes': ('a', 'b')},
+        {'begin': pd.Timestamp('2020-01-01', tz='UTC'), 'other': Decimal('1.1')},
+    ]
+    catalog_entries = pd.DataFrame({'metadata': metadata, 'geometry': [None, None]}, index=[1, 2])
+
+    folder_obj = tempfile.TemporaryDirectory()
+    path = os.path.join(folder_obj.name, 'svc_catalog.parquet')
+    catalog_cache.write_catalog_cache(path, catalog_entries)
+    actual = catalog_cache.read_catalog_cache(path)
+    folder_obj.cleanup()
+
+    assert actual.index.tolist() == [1, 2]
+    for expected, value in zip(metadata, actual['metadata']):
+        assert value == expected
+        assert {k: type(v) for k, v in value.items()} == {k: type(v) for k, v in expected.items()}
+
+
+@requires_pyarrow
+def test_pushdown_and_projection(cache_file):
+    catalog_entries = catalog_cache.read_catalog_cache(cache_file, columns=['parameters'], bbox=(-91, 31, -89, 33))
+    assert catalog_entries.index.tolist() == ['01']
+    assert list(catalog_entries.columns) == ['parameters']
+
+    catalog_entries = catalog_cache.read_catalog_cache(cache_file, parameter='gage_height')
+    assert sorted(catalog_entries.index) == ['02', '03']
+
+
+def test_loaded_catalogs():
+    folder_obj = tempfile.TemporaryDirectory()
+    cache_file = os.path.join(folder_obj.name, 'svc_catalog.p')
+    open(cache_file, 'w').close()
+
+    loaded_catalogs = catalog_cache.LoadedCatalogs(maxsize=1)
+    catalog_entries = pd.DataFrame({'display_name': ['a']})
+
+    loaded_catalogs.put(('provider', 'svc1'), cache_file, catalog_entries)
+    assert loaded_catalogs.get(('provider', 'svc1'), cache_file).equals(catalog_entries)
+
+    # least recently used catalog is dropped
+    loaded_catalogs.put(('provider', 'svc2'), cache_file, catalog_entries)
+    assert loaded_catalogs.get(('provider', 'svc1'), cache_file) is None
+    assert len(loaded_catalogs) == 1
+
+    # catalogs are dropped when the cache file changes
+    os.utime(cache_file, ns=(0, 0))
+    assert loaded_catalogs.get(('provider', 'svc2'), cache_file) is None
+
+    loaded_catalogs.put(('provider', 'svc2'), cache_file, catalog_entries)
+    loaded_catalogs.invalidate()
+    assert len(loaded_catalogs) == 0
+
+
+def test_parse_ttl():
+    assert catalog_cache.parse_ttl(None) is None
+    assert catalog_cache.parse_ttl(0) is None
+    assert catalog_cache.parse_ttl(3600) == pd.Timedelta(hours=1)
+    assert catalog_cache.parse_ttl('12h') == pd.Timedelta(hours=12)
+    assert pd.Timestamp('2018-01-31') + catalog_cache.parse_ttl('M') == pd.Timestamp('2018-02-28')
+    assert pd.Timestamp('2018-01-31') + catalog_cache.parse_ttl('2W') == pd.Timestamp('2018-02-14')
@@ -1,5 +1,8 @@
 import os
 import tempfile
+
+import pytest
+
 import quest
 
 
@@ -145,3 +148,46 @@ def test_lisitfy():
     expected = [180]
     actual = quest.util.listify(expected[0])
     assert expected == actual
+
+
+def test_classify_uris():
+    dataset = quest.util.uuid('dataset')
+    uris = ['svc://provider:service/catalog_id', 'pub://provider:publisher', dataset, 'col1', 'c' + quest.util.uuid4().hex[1:]]
+
+    expected = {
+        'collections': ['col1', uris[4]],
+        'datasets': [dataset],
+        'publishers': ['pub://provider:publisher'],
+        'services': ['svc://provider:service/catalog_id'],
+    }
+    assert quest.util.classify_uris(uris, as_dataframe=False) == expected
+
+    df = quest.util.classify_uris(uris, grouped=False)
+    assert df.loc[dataset, 'type'] == 'datasets'
+    assert df['uri'].tolist() == uris
+
+    grouped = quest.util.classify_uris(uris)
+    assert grouped.get_group('services').uri.tolist() == ['svc://provider:service/catalog_id']
+
+    # large lists are classified with pandas and should give the same result
+    many_uris = uris * (quest.util.misc.CLASSIFY_URIS_VECTORIZE_SIZE // len(uris) + 1)
+    groups = quest.util.classify_uris(many_uris, as_dataframe=False)
+    assert {k: sorted(set(v)) for k, v in groups.items()} == {k: sorted(v) for k, v in expected.items()}
+
+    with pytest.raises(ValueError):
+        quest.util.classify_uris([])
+
+    with pytest.raises(ValueError):
+        quest.util.classify_uris(uris, exclude=['publishers'])
+
+    with pytest.raises(ValueError):
+        quest.util.classify_uris(uris, require_same_type=True)
+
+
+def test_is_uuid():
+    assert quest.util.is_uuid(quest.util.uuid('dataset'))
+    assert quest.util.is_uuid(quest.util.uuid4().hex)
+    assert not quest.util.is_uuid('col1')
+    # valid hex, but not a uuid4
+    assert not quest.util.is_uuid('0' * 32)
+    assert not quest.util.is_uuid(quest.util.uuid4().hex.upper())
@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+import rasterio
+import rasterio.enums
+import rasterio.transform
+
+import quest
+
+
+def test_get_overview_levels():
+    assert quest.util.raster.get_overview_levels(500, 400) == []
+    assert quest.util.raster.get_overview_levels(1000, 400) == [2]
+    assert quest.util.raster.get_overview_levels(10000, 6000) == [2, 4, 8, 16, 32]
+    assert quest.util.raster.get_overview_levels(10000, 6000, block_size=256) == [2, 4, 8, 16, 32, 64]
+
+
+def test_cog_profile():
+    profile = {'driver': 'HFA', 'tiled': False, 'blockysize': 1, 'nodata': -9999.0, 'width': 1000, 'height': 40}
+    profile = quest.util.raster.cog_profile(profile, dtype='float32')
+    assert profile['driver'] == 'GTiff'
+    assert profile['tiled'] is True
+    assert profile['compress'] == 'deflate'
+    assert profile['nodata'] == -9999.0
+    assert profile['dtype'] == 'float32'
+    assert (profile['blockxsize'], profile['blockysize']) == (512, 48)
+
+    profile = quest.util.raster.cog_profile(profile, blockxsize=256, blockysize=256)
+    assert (profile['blockxsize'], profile['blockysize']) == (256, 48)
+
+
+@pytest.fixture
+def data():
+    return (np.arange(900 * 1100) % 65536).astype('uint16').reshape(900, 1100)
+
+
+def _check_cog(path, data):
+    with rasterio.open(path) as f:
+        assert f.profile['tiled']
+        assert f.block_shapes == [(512, 512)]
+        assert f.compression == rasterio.enums.Compression.deflate
+        assert f.overviews(1) == [2, 4]
+        np.testing.assert_array_equal(f.read(1), data)
+        assert f.read(1, out_shape=(225, 275)).shape == (225, 275)
+
+
+def test_write_raster(data, tmpdir):
+    path = str(tmpdir.join('raster.tif'))
+    profile = {'crs': 'EPSG:4326', 'transform': rasterio.transform.from_origin(-90, 30, 0.001, 0.001), 'nodata': 0}
+    quest.util.raster.write_raster(path, data, profile)
+
+    _check_cog(path, data)
+    assert not tmpdir.join('raster.tif.tmp.tif').exists()
+
+
+def test_to_cog(data, tmpdir):
+    path = str(tmpdir.join('raster.tif'))
+    profile = {'driver': 'GTiff', 'height': 900, 'width': 1100, 'count': 1, 'dtype': 'uint16', 'crs': 'EPSG:4326',
+               'transform': rasterio.transform.from_origin(-90, 30, 0.001, 0.001)}
+    with rasterio.open(path, 'w', **profile) as f:
+        f.write(data, 1)
+        f.update_tags(source='test')
+
+    quest.util.raster.to_cog(path)
+
+    _check_cog(path, data)
+    with rasterio.open(path) as f:
+        assert f.tags()['source'] == 'test'
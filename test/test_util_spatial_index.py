@@ -0,0 +1,31 @@
+import os
+import tempfile
+
+from shapely.geometry import Point, box
+
+import quest
+
+
+def test_query_returns_candidate_positions():
+    geometries = [Point(0, 0), None, box(5, 5, 6, 6), Point(10, 10)]
+    index = quest.util.CatalogSpatialIndex.from_geometries(geometries)
+    assert len(index) == 4
+
+    bbox = quest.util.bbox2poly(-1, -1, 5.5, 5.5, as_shapely=True)
+    assert index.query(bbox).tolist() == [0, 2]
+
+    bbox = quest.util.bbox2poly(20, 20, 30, 30, as_shapely=True)
+    assert index.query(bbox).tolist() == []
+
+
+def test_save_and_load():
+    geometries = [Point(0, 0), box(5, 5, 6, 6)]
+    index = quest.util.CatalogSpatialIndex.from_geometries(geometries)
+
+    folder_obj = tempfile.TemporaryDirectory()
+    path = os.path.join(folder_obj.name, 'svc_sindex.npy')
+    index.save(path)
+    loaded = quest.util.CatalogSpatialIndex.load(path)
+
+    assert (loaded.bounds == index.bounds).all()
+    assert loaded.query(box(4, 4, 7, 7)).tolist() == [1]
@@ -0,0 +1,74 @@
+import os
+import tempfile
+
+import pandas as pd
+
+import quest
+
+METADATA = [
+    {'state': 'MS', 'huc': {'region': '08', 'subregion': '0801'}, 'elevation': 10, 'location': {'latitude': 32}},
+    {'state': 'TX', 'huc': {'region': '12', 'subregion': '1201'}, 'elevation': None, 'aliases': ['a', 'b']},
+    {'state': 'MS', 'huc': {'region': '08', 'subregion': '0802'}, 'begin': pd.Timestamp('2000-01-01'),
+     'aliases': ['b', 'c', 'c']},
+    {'active': True, 'flag': 1, 'huc': {'basins': ['a', 'b']}},
+    None,
+]
+
+
+def test_tags():
+    index = quest.util.CatalogTagIndex.from_metadata(METADATA)
+    assert len(index) == 5
+    assert index.tags() == {
+        'state': ['MS', 'TX'],
+        'huc:region': ['08', '12'],
+        'huc:subregion': ['0801', '1201', '0802'],
+        'huc:basins': ['a', 'b'],
+        'elevation': [10, None],
+        'aliases': ['a', 'b', 'c'],
+        'begin': ['2000-01-01T00:00:00'],
+        'active': [True],
+        'flag': [1],
+    }
+
+
+def test_bool_and_number_values():
+    index = quest.util.CatalogTagIndex.from_metadata([{'flag': True}, {'flag': 1}, {'flag': 0}, {'flag': False}])
+    tags = index.tags()['flag']
+    assert tags == [True, 1, 0, False]
+    assert [type(v) for v in tags] == [bool, int, int, bool]
+
+    # bools and numbers are matched the way `search_catalog` compares them
+    assert index.query('flag', True).tolist() == [0, 1]
+    assert index.query('flag', 1.0).tolist() == [0, 1]
+    assert index.query('flag', False).tolist() == [2, 3]
+
+
+def test_query():
+    index = quest.util.CatalogTagIndex.from_metadata(METADATA)
+    assert index.query('state', 'MS').tolist() == [0, 2]
+    assert index.query('state', 'AL').tolist() == []
+    assert index.query('elevation', 10.0).tolist() == [0]
+    assert index.query('begin', pd.Timestamp('2000-01-01')).tolist() == [2]
+    assert index.query_all({'state': 'MS', 'huc:subregion': '0802'}).tolist() == [2]
+
+    # filters on fields that aren't indexed are left for the caller to apply
+    assert not index.can_query('aliases')
+    assert not index.can_query('location:latitude')
+    assert not index.can_query('huc:basins')
+    assert index.query_all({'aliases': ['a', 'b']}) is None
+    assert index.query_all({'aliases': ['a', 'b'], 'huc:region': '12'}).tolist() == [1]
+
+
+def test_save_and_load():
+    index = quest.util.CatalogTagIndex.from_metadata(METADATA)
+
+    folder_obj = tempfile.TemporaryDirectory()
+    path = os.path.join(folder_obj.name, 'svc_tags.npz')
+    index.save(path)
+    loaded = quest.util.CatalogTagIndex.load(path)
+
+    assert len(loaded) == 5
+    assert loaded.tags() == index.tags()
+    assert loaded.query('active', True).tolist() == [3]
+    assert loaded.query('huc:region', '08').tolist() == [0, 2]
+    assert not loaded.can_query('aliases')
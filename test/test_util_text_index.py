@@ -0,0 +1,55 @@
+import os
+import tempfile
+
+import pandas as pd
+import pytest
+
+import quest
+
+requires_fts5 = pytest.mark.skipif(not quest.util.text_index.has_text_index_support(),
+                                   reason='SQLite FTS5 trigram tokenizer is not available')
+
+
+@pytest.fixture
+def text_index():
+    catalog_entries = pd.DataFrame({
+        'display_name': ['Mississippi River at Vicksburg', 'Big Black River', 'Lake Mead'],
+        'description': ['streamflow gage', None, 'reservoir'],
+        'parameters': ['streamflow', 'streamflow,gage_height', ''],
+        'metadata': [{'state': 'MS'}, {'state': 'MS', 'county': 'Warren'}, {'state': 'NV'}],
+    }, index=['07289000', '07290000', '09421500'])
+
+    folder_obj = tempfile.TemporaryDirectory()
+    yield quest.util.CatalogTextIndex.build(os.path.join(folder_obj.name, 'svc_text.sqlite'), catalog_entries)
+    folder_obj.cleanup()
+
+
+@requires_fts5
+def test_search(text_index):
+    assert len(text_index) == 3
+    assert text_index.search(['River']).index.tolist() == [0, 1]
+    assert text_index.search(['river']).index.tolist() == []
+    assert text_index.search(['Mead', 'Warren']).index.tolist() == [1, 2]
+    assert text_index.search('0742').index.tolist() == []
+    assert text_index.search('07289').index.tolist() == [0]
+
+    # the text of every column is searched, including metadata keys
+    assert text_index.search("'county'").index.tolist() == [1]
+
+    # only the given columns are searched
+    assert text_index.search('streamflow', columns=['description']).index.tolist() == [0]
+    assert text_index.search('streamflow').index.tolist() == [0, 1]
+
+    # matches are ranked
+    ranks = text_index.search('streamflow')
+    assert ranks[0] < ranks[1]
+
+
+@requires_fts5
+def test_unsearchable_terms(text_index):
+    assert text_index.search(['MS']) is None
+    assert text_index.search(['River', 'Lake.*']) is None
+    assert text_index.search([]) is None
+
+    # terms that could match the text of a missing value
+    assert text_index.search(['River', 'one']) is None
@@ -0,0 +1,42 @@
+import os
+
+import numpy as np
+import pandas as pd
+
+import quest
+
+
+def test_unit_registry_is_shared():
+    assert quest.util.unit_registry() is quest.util.unit_registry()
+
+
+def test_unit_list_cache(reset_projects_dir):
+    quest.util.unit_list.cache_clear()
+    units = quest.util.unit_list()
+    assert 'meter' in units
+    assert os.path.exists(os.path.join(quest.util.get_cache_dir(), quest.util.units.UNIT_LIST_CACHE_FILE))
+
+    quest.util.unit_list.cache_clear()
+    assert quest.util.unit_list() == units
+    assert quest.util.unit_list(use_cache=False) == units
+
+
+def test_convert_units():
+    values = np.array([0.0, 1.0, 10.0])
+    np.testing.assert_allclose(quest.util.convert_units(values, 'ft', 'm'), values * 0.3048)
+    np.testing.assert_allclose(quest.util.convert_units(values, 'degC', 'degF'), [32.0, 33.8, 50.0])
+
+    series = pd.Series(values, index=['a', 'b', 'c'])
+    converted = quest.util.convert_units(series, 'ft**3/s', 'm**3/s')
+    assert converted.index.tolist() == ['a', 'b', 'c']
+    np.testing.assert_allclose(converted, values * 0.028316846592)
+
+    masked = np.ma.masked_array(values, mask=[False, True, False])
+    converted = quest.util.convert_units(masked, 'ft', 'm')
+    assert converted.mask.tolist() == [False, True, False]
+
+
+def test_get_target_units():
+    assert quest.util.get_target_units('ft**3/s', 'm**3') == 'm**3/s'
+    assert quest.util.get_target_units('ft**3/s', 'm**3/day') == 'm**3/day'
+    assert quest.util.get_target_units('ft', 'm') == 'm'